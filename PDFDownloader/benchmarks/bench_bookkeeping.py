@@ -0,0 +1,284 @@
+# benchmarks/bench_bookkeeping.py
+"""
+Measures the bookkeeping cost of run_downloader as the status history
+grows, with downloads replaced by a no-op, so only the scheduling and
+status file work is timed. For each history size and status backend
+(xlsx, csv) it reports:
+  - load:       reading the status file at startup
+  - diff:       total time filtering the input against the history
+  - per item:   wall time of the run divided by the rows scheduled
+  - update:     median / max latency of one update_status call
+  - checkpoint: median / max time of one save_status_file call
+  - peak RSS:   peak memory of the run
+
+Each configuration starts with a synthetic status history of N attempted
+rows and an input with those N rows (unchanged, so they are skipped) plus
+--new-rows new ones, spread through the input.
+
+Every checkpoint rewrites the whole status file, so its time grows with N
+(xlsx: about 240 ms at 1k rows; a 10k-row history did not finish in
+120 s). When the status file was saved after every finished row, a run
+cost N x new rows: quadratic in the job size. run_downloader now saves at
+most every `checkpoint_interval` seconds; --checkpoint-interval 0 brings
+back the per-row saves, to measure the worst case.
+
+With --max-checkpoint-ms and/or --max-per-item-ms, a configuration whose
+median checkpoint or per-item time exceeds the budget (or that times out)
+fails the benchmark with exit code 1, so it can guard against regressions.
+
+Configurations run in fresh interpreters, one at a time, and are reported
+as timed out after --timeout seconds (large .xlsx histories take minutes
+just to write).
+
+Run from the PDFDownloader folder:
+    python -m benchmarks.bench_bookkeeping
+    python -m benchmarks.bench_bookkeeping --sizes 10000 100000 1000000 10000000 --backends csv
+    python -m benchmarks.bench_bookkeeping --backends csv --max-per-item-ms 5   # fail above 5 ms per row
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ---------------------
+# Constants
+# ---------------------
+BACKENDS = ["xlsx", "csv"]
+DEFAULT_SIZES = [10_000, 100_000]
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOSTS = 2_000
+
+
+def _link(i):
+    return f"https://www.company{i % HOSTS}.example.com/investors/annual-report-{i}.pdf"
+
+
+def synthetic_history(rows):
+    """
+    Returns a status DataFrame of `rows` attempted rows, with the columns
+    run_downloader records (links, host, elapsed time, bytes).
+    """
+    import pandas as pd
+
+    success = [i % 10 < 7 for i in range(rows)]
+    return pd.DataFrame({
+        "BRnum": [f"BR{i:08d}" for i in range(rows)],
+        "Status": ["Success" if ok else "Failure" for ok in success],
+        "Info": ["ok" if ok else "HTTP 404" for ok in success],
+        "Primary Link": [_link(i) for i in range(rows)],
+        "Secondary Link": ["-"] * rows,
+        "Host": [f"www.company{i % HOSTS}.example.com" for i in range(rows)],
+        "Elapsed": [0.5 + (i % 7) / 10 for i in range(rows)],
+        "Bytes": [200_000 if ok else 0 for ok in success],
+    })
+
+
+def synthetic_input(rows, new_rows, chunk_size=10_000):
+    """
+    Yields input chunks with the `rows` rows of synthetic_history plus
+    `new_rows` new rows spread evenly through them.
+    """
+    import pandas as pd
+
+    total = rows + new_rows
+    step = total / new_rows if new_rows else None
+    new_at = {int(k * step) for k in range(new_rows)} if step else set()
+    old = 0
+    for start in range(0, total, chunk_size):
+        brnums, links = [], []
+        for position in range(start, min(start + chunk_size, total)):
+            if position in new_at:
+                brnums.append(f"NEW{position:08d}")
+                links.append(_link(position))
+            else:
+                brnums.append(f"BR{old:08d}")
+                links.append(_link(old))
+                old += 1
+        yield pd.DataFrame({"BRnum": brnums, "Pdf_URL": links, "Report Html Address": [None] * len(brnums)})
+
+
+def noop_download(brnum, primary_url, secondary_url, output_folder, update_queue=None, max_workers=3, meta=None,
+                  **kwargs):
+    """
+    Stand-in for download_single_pdf that succeeds at once.
+    """
+    if meta is not None:
+        meta["elapsed"] = 0.0
+    return "Success", "no-op"
+
+
+def _timed(function, samples):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+    return wrapper
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB elsewhere
+
+
+def run_one(backend, rows, new_rows, workers, checkpoint_interval=None):
+    """
+    Runs one configuration in this process. Returns a dict of measurements
+    (seconds unless noted).
+    """
+    import pdf_downloader.downloader as downloader
+
+    samples = {"load": [], "diff": [], "update": [], "save": []}
+    for name, attr in (("load", "load_or_create_status_file"), ("diff", "diff_against_status"),
+                       ("update", "update_status"), ("save", "save_status_file")):
+        setattr(downloader, attr, _timed(getattr(downloader, attr), samples[name]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        status_file = os.path.join(tmp, f"status.{backend}")
+        start = time.perf_counter()
+        synthetic_history(rows).pipe(downloader.save_status_file, status_file)
+        setup = time.perf_counter() - start
+        samples["save"].clear()
+
+        options = {}
+        if checkpoint_interval is not None:
+            options["checkpoint_interval"] = checkpoint_interval
+        start = time.perf_counter()
+        downloader.run_downloader(
+            xlsx_paths=[],
+            output_folder=os.path.join(tmp, "pdfs"),
+            status_file=status_file,
+            dev_mode=False,
+            max_concurrent_workers=workers,
+            row_source=[synthetic_input(rows, new_rows)],
+            download_fn=noop_download,
+            landing_page_resolver=False,
+            dns_cache=False,
+            min_free_disk_mb=0,
+            **options
+        )
+        wall = time.perf_counter() - start
+
+    scheduled = len(samples["update"])
+    return {
+        "setup": setup,
+        "wall": wall,
+        "scheduled": scheduled,
+        "load": sum(samples["load"]),
+        "diff": sum(samples["diff"]),
+        "per_item": wall / scheduled if scheduled else None,
+        "update_median": statistics.median(samples["update"]) if samples["update"] else None,
+        "update_max": max(samples["update"], default=None),
+        "save_median": statistics.median(samples["save"]) if samples["save"] else None,
+        "save_max": max(samples["save"], default=None),
+        "saves": len(samples["save"]),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def measure(backend, rows, new_rows, workers, timeout, checkpoint_interval=None):
+    """
+    Runs one configuration in a fresh interpreter. Returns the run_one
+    dict, or None if it took longer than `timeout` seconds.
+    """
+    command = [
+        sys.executable, "-m", "benchmarks.bench_bookkeeping", "--child",
+        "--backends", backend, "--sizes", str(rows), "--new-rows", str(new_rows), "--workers", str(workers)
+    ]
+    if checkpoint_interval is not None:
+        command += ["--checkpoint-interval", str(checkpoint_interval)]
+    try:
+        result = subprocess.run(command, cwd=PROJECT_DIR, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+    if result.returncode != 0:
+        raise RuntimeError(f"{backend} with {rows} rows failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _ms(seconds):
+    return "n/a" if seconds is None else f"{seconds * 1000:.2f}"
+
+
+def over_budget(result, max_checkpoint_ms=None, max_per_item_ms=None):
+    """
+    Returns the budgets (as messages) that `result` (a run_one dict, or
+    None for a timeout) exceeds.
+    """
+    if result is None:
+        return ["timed out"] if max_checkpoint_ms is not None or max_per_item_ms is not None else []
+    failures = []
+    checks = (
+        ("checkpoint", result["save_median"], max_checkpoint_ms),
+        ("per item", result["per_item"], max_per_item_ms),
+    )
+    for name, seconds, budget_ms in checks:
+        if budget_ms is not None and seconds is not None and seconds * 1000 > budget_ms:
+            failures.append(f"{name} {seconds * 1000:.2f} ms > {budget_ms:.2f} ms")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bookkeeping cost of run_downloader by status history size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Rows in the status history")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS, help="Status file formats")
+    parser.add_argument("--new-rows", type=int, default=200, help="New rows scheduled per run")
+    parser.add_argument("--workers", type=int, default=8, help="Download workers")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds per configuration")
+    parser.add_argument(
+        "--checkpoint-interval", type=float, default=None,
+        help="Seconds between status file saves (default: run_downloader's; 0: after every row)"
+    )
+    parser.add_argument(
+        "--max-checkpoint-ms", type=float, default=None, help="Exit with 1 if a median checkpoint is slower"
+    )
+    parser.add_argument(
+        "--max-per-item-ms", type=float, default=None, help="Exit with 1 if the time per scheduled row is higher"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = run_one(args.backends[0], args.sizes[0], args.new_rows, args.workers, args.checkpoint_interval)
+        print(json.dumps(result))
+        return 0
+
+    failed = False
+    print(f"{args.new_rows} new rows per run, {args.workers} workers (times in ms)")
+    for backend in args.backends:
+        for rows in args.sizes:
+            result = measure(backend, rows, args.new_rows, args.workers, args.timeout, args.checkpoint_interval)
+            label = f"{backend:5s} {rows:>10d} rows"
+            failures = over_budget(result, args.max_checkpoint_ms, args.max_per_item_ms)
+            failed = failed or bool(failures)
+            if result is None:
+                print(f"{label}  timed out after {args.timeout:.0f} s")
+                if failures:
+                    print("    FAIL: timed out")
+                continue
+            rss = "n/a" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.0f} MB"
+            print(
+                f"{label}  load {_ms(result['load'])}  diff {_ms(result['diff'])}  "
+                f"per item {_ms(result['per_item'])}  "
+                f"update {_ms(result['update_median'])} / {_ms(result['update_max'])}  "
+                f"checkpoint {_ms(result['save_median'])} / {_ms(result['save_max'])} ({result['saves']}x)  "
+                f"peak RSS {rss}"
+            )
+            for failure in failures:
+                print(f"    FAIL: {failure}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
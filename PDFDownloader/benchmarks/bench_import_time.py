@@ -0,0 +1,98 @@
+# benchmarks/bench_import_time.py
+"""
+Measures the startup (import) cost of the entry points with `python -X importtime`.
+
+Each target module is imported in a fresh interpreter, several times, and the
+best cumulative import time is reported together with the heaviest modules it
+pulled in. Heavy dependencies that should be loaded lazily (pandas, requests,
+PyPDF2, openpyxl, tkinter) are flagged if they show up at import time.
+
+Run from the PDFDownloader folder:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --max-ms 150   # fail above 150 ms
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# ---------------------
+# Constants
+# ---------------------
+DEFAULT_TARGETS = ["cli", "main", "pdf_downloader.downloader"]
+LAZY_MODULES = ["pandas", "requests", "PyPDF2", "openpyxl", "tkinter"]
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module, python=sys.executable):
+    """
+    Imports `module` in a fresh interpreter with -X importtime.
+    Returns a list of (module_name, self_us, cumulative_us), in import order.
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def summarize(module, runs=5, top=10):
+    """
+    Returns (best_total_ms, heaviest, lazy_loaded) for `module` over `runs`
+    fresh interpreters:
+      - best_total_ms: fastest cumulative import time of `module`
+      - heaviest: the `top` modules with the highest self time (best run)
+      - lazy_loaded: modules from LAZY_MODULES that were imported
+    """
+    best = None
+    for _ in range(runs):
+        entries = measure_import(module)
+        total = next(cum for name, _, cum in entries if name == module)
+        if best is None or total < best[0]:
+            best = (total, entries)
+
+    total_us, entries = best
+    heaviest = sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+    loaded = {name for name, _, _ in entries}
+    lazy_loaded = [m for m in LAZY_MODULES if m in loaded]
+    return total_us / 1000, heaviest, lazy_loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the PDFDownloader entry points.")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="Modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per target (best is kept)")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest modules to list")
+    parser.add_argument("--max-ms", type=float, default=None, help="Exit with 1 if a target is slower")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.targets:
+        total_ms, heaviest, lazy_loaded = summarize(module, runs=args.runs, top=args.top)
+        print(f"{module}: {total_ms:.1f} ms (best of {args.runs})")
+        for name, self_us, cumulative_us in heaviest:
+            print(f"    {self_us / 1000:8.2f} ms self {cumulative_us / 1000:8.2f} ms cumulative  {name}")
+        if lazy_loaded:
+            print(f"    WARNING: loaded at import time: {', '.join(lazy_loaded)}")
+            failed = True
+        if args.max_ms is not None and total_ms > args.max_ms:
+            print(f"    FAIL: slower than {args.max_ms:.1f} ms")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# benchmarks/bench_replay.py
+"""
+Runs the downloader against a local replay of a recorded trace, so engine
+changes can be compared on the same (production-like) traffic profile:
+latency, redirect hops, status codes and body sizes.
+
+Record a trace during a real run, then replay it:
+    python cli.py --trace traces/run.jsonl ...
+    python -m benchmarks.bench_replay traces/run.jsonl --workers 16 --speed 4
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from pdf_downloader.downloader import run_downloader
+from pdf_downloader.trace import read_trace
+from tests.replay_server import build_plan, create_replay_app, write_replay_workbook
+
+
+def replay_run(trace_file, workers=3, speed=1.0, output_layout="flat", **downloader_options):
+    """
+    Replays `trace_file` through run_downloader in a temp folder.
+    Returns a dict with rows, success, fail, seconds and bytes.
+    """
+    from werkzeug.serving import make_server
+
+    plan = build_plan(read_trace(trace_file))
+    server = make_server("127.0.0.1", 0, create_replay_app(plan, speed=speed), threaded=True)
+    threading.Thread(target=server.serve_forever, name="ReplayServer", daemon=True).start()
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            workbook = tmp / "replay.xlsx"
+            write_replay_workbook(plan, f"http://127.0.0.1:{server.server_port}", workbook)
+
+            started = time.perf_counter()
+            run_downloader(
+                xlsx_paths=[str(workbook)],
+                output_folder=str(tmp / "pdfs"),
+                status_file=str(tmp / "status.xlsx"),
+                dev_mode=False,
+                max_concurrent_workers=workers,
+                output_layout=output_layout,
+                **downloader_options
+            )
+            seconds = time.perf_counter() - started
+
+            import pandas as pd
+            status = pd.read_excel(tmp / "status.xlsx")
+            downloaded = sum(p.stat().st_size for p in (tmp / "pdfs").rglob("*") if p.is_file())
+    finally:
+        server.shutdown()
+
+    return {
+        "rows": len(status),
+        "success": int((status["Status"] == "Success").sum()),
+        "fail": int((status["Status"] == "Failure").sum()),
+        "seconds": seconds,
+        "bytes": downloaded,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded trace through the downloader.")
+    parser.add_argument("trace", help="Trace file written with cli.py --trace")
+    parser.add_argument("--workers", type=int, default=3, help="Concurrent download workers")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay delays this many times faster")
+    parser.add_argument("--layout", default="flat", help="Output layout")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("PDFDownloaderLogger").setLevel(logging.ERROR)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    result = replay_run(args.trace, workers=args.workers, speed=args.speed, output_layout=args.layout)
+    print(
+        f"{result['rows']} rows ({result['success']} ok, {result['fail']} failed) in {result['seconds']:.2f} s: "
+        f"{result['rows'] / result['seconds']:.2f} rows/s, {result['bytes'] / result['seconds'] / 1e6:.2f} MB/s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
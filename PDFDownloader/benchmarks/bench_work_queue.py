@@ -0,0 +1,95 @@
+# benchmarks/bench_work_queue.py
+"""
+Measures the memory held per pending row by the lookahead window, in
+bytes per row, for:
+  - dataframe: the normalized DataFrame the window was kept in before
+    (deep memory usage, including the string objects)
+  - tuples:    one Python tuple of strings per row
+  - work_queue: the compact WorkQueue used by run_downloader
+
+Rows are synthetic but shaped like the input workbooks: a BRnum, a
+primary URL, a secondary URL on about half the rows, and hosts drawn
+from a limited pool.
+
+Run from the PDFDownloader folder:
+    python -m benchmarks.bench_work_queue
+    python -m benchmarks.bench_work_queue --rows 1000000 --hosts 20000
+"""
+
+import argparse
+import random
+import sys
+import tracemalloc
+
+from pdf_downloader.downloader import (
+    BRNUM_COL, HOST_COL, PRIMARY_LINK_COL, SECONDARY_LINK_COL, _column_values, normalize_link_columns
+)
+from pdf_downloader.work_queue import WorkQueue
+
+
+def synthetic_frame(rows, hosts, seed=0):
+    import pandas as pd
+
+    rng = random.Random(seed)
+    host_names = [f"www.company{i}.example.com" for i in range(hosts)]
+    primary = []
+    secondary = []
+    for i in range(rows):
+        host = rng.choice(host_names)
+        primary.append(f"https://{host}/investors/reports/{2006 + i % 15}/annual-report-{i}.pdf")
+        secondary.append(f"https://{host}/investors/report-{i}.html" if i % 2 else None)
+    return normalize_link_columns(pd.DataFrame({
+        BRNUM_COL: [f"BR{i:08d}" for i in range(rows)],
+        PRIMARY_LINK_COL: primary,
+        SECONDARY_LINK_COL: secondary,
+    }))
+
+
+def _traced(build):
+    # Returns (object, bytes still allocated after building it)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        obj = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return obj, after - before
+
+
+def measure(rows, hosts):
+    """
+    Returns {representation: bytes per row}.
+    """
+    df = synthetic_frame(rows, hosts)
+    columns = [_column_values(df, col) for col in (BRNUM_COL, PRIMARY_LINK_COL, SECONDARY_LINK_COL, HOST_COL)]
+    # Fresh str objects, so the tuples do not share the DataFrame's strings
+    plain = [[None if v is None else "".join(v) for v in values] for values in columns]
+
+    results = {"dataframe": int(df.memory_usage(deep=True).sum()) / rows}
+    tuples, size = _traced(lambda: [tuple(row) for row in zip(*plain)])
+    results["tuples"] = (size + sum(sys.getsizeof(v) for row in tuples for v in row if v is not None)) / rows
+    del tuples
+
+    work, size = _traced(lambda: WorkQueue.from_columns(*columns))
+    work.reorder(range(rows))
+    results["work_queue"] = work.nbytes() / rows
+    results["work_queue (traced)"] = size / rows
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory per pending row of the lookahead window.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic rows")
+    parser.add_argument("--hosts", type=int, default=5_000, help="Distinct hosts")
+    args = parser.parse_args(argv)
+
+    results = measure(args.rows, args.hosts)
+    print(f"{args.rows} rows, {args.hosts} hosts")
+    for name, per_row in results.items():
+        print(f"    {name:22s} {per_row:8.1f} bytes/row")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
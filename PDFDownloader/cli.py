@@ -0,0 +1,226 @@
+# cli.py
+
+import argparse
+import signal
+from queue import Queue
+
+from pdf_downloader.cancellation import CancelToken
+from pdf_downloader.dns_cache import DEFAULT_PREFETCH_ROWS
+from pdf_downloader.downloader import run_downloader, CHECKPOINT_INTERVAL, HEAD_TIMEOUT, GET_TIMEOUT
+from pdf_downloader.landing_page import LandingPageResolver
+from pdf_downloader.ordering import DEFAULT_EXPLORATION
+from pdf_downloader.storage import OUTPUT_LAYOUTS
+from utils.logging_setup import DEFAULT_MAX_MB, DEFAULT_RETENTION_MB, setup_logger
+from utils.terminal_progress import TerminalProgress
+
+
+def positive_int(value):
+    """
+    argparse type for counts that must be at least 1.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def build_parser():
+    """
+    Creates the argument parser for the headless downloader.
+    """
+    parser = argparse.ArgumentParser(
+        description="Download PDFs listed in .xlsx files, without the Tkinter UI."
+    )
+
+    # Inputs and outputs
+    parser.add_argument(
+        "xlsx_paths", nargs="*",
+        default=["data/GRI_2017_2020 (1).xlsx", "data/Metadata2006_2016.xlsx"],
+        help="Excel files with BRnum/Pdf_URL columns (default: the two files in data/)"
+    )
+    parser.add_argument("--output-folder", default="data/PDFs", help="Where PDFs are stored")
+    parser.add_argument("--status-file", default="data/DownloadedStatus.xlsx", help="Status file path")
+    parser.add_argument("--manifest-file", default="data/Manifest.csv", help="Manifest CSV path ('' to disable)")
+    parser.add_argument(
+        "--landing-page-cache", default="data/LandingPages.json",
+        help="JSON cache of landing pages resolved to PDFs ('' to disable)"
+    )
+    parser.add_argument(
+        "--triage-file", default="data/Triage.csv",
+        help="Link triage table written by --probe; full runs skip its dead links ('' to disable)"
+    )
+    parser.add_argument(
+        "--postprocess", metavar="DIR", default=None,
+        help="Extract page count, metadata and text of new PDFs, cached in DIR"
+    )
+    parser.add_argument("--content-store", default=None, help="Folder for deduplicated PDF content")
+    parser.add_argument("--layout", choices=OUTPUT_LAYOUTS, default="flat", help="Output layout")
+    parser.add_argument("--log-dir", default="logs", help="Log folder")
+    parser.add_argument("--log-max-mb", type=float, default=DEFAULT_MAX_MB, help="Rotate log files above this size")
+    parser.add_argument(
+        "--log-retention-mb", type=float, default=DEFAULT_RETENTION_MB,
+        help="Delete the oldest rotated logs beyond this total"
+    )
+    parser.add_argument("--log-json", action="store_true", help="Write logs as JSON lines (*.jsonl)")
+
+    # Performance knobs
+    parser.add_argument("--workers", type=int, default=3, help="Concurrent download workers")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows read per Excel chunk")
+    parser.add_argument("--lookahead-rows", type=int, default=10000, help="Rows ordered by host at a time")
+    parser.add_argument(
+        "--parallel-read", action=argparse.BooleanOptionalAction, default=None,
+        help="Parse each workbook in its own process (default: when there is more than one)"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible download order")
+    parser.add_argument("--head-timeout", type=float, default=HEAD_TIMEOUT, help="HEAD timeout in seconds")
+    parser.add_argument("--get-timeout", type=float, default=GET_TIMEOUT, help="GET timeout in seconds")
+    parser.add_argument(
+        "--bandwidth-limit", type=float, default=None, metavar="MB_PER_S",
+        help="Cap the combined download rate (MB/s)"
+    )
+    parser.add_argument(
+        "--host-bandwidth-limit", type=float, default=None, metavar="MB_PER_S",
+        help="Cap the download rate per host (MB/s)"
+    )
+    parser.add_argument(
+        "--exploration", type=float, default=DEFAULT_EXPLORATION,
+        help="Share of the schedule for hosts not seen in earlier runs (0-1)"
+    )
+    parser.add_argument(
+        "--no-host-history", action="store_true",
+        help="Do not rank hosts by their results in earlier runs"
+    )
+    parser.add_argument(
+        "--no-dns-cache", action="store_true",
+        help="Resolve every host with the system resolver (no shared DNS cache or prefetching)"
+    )
+    parser.add_argument(
+        "--dns-prefetch-rows", type=int, default=DEFAULT_PREFETCH_ROWS,
+        help="Upcoming rows whose hosts are resolved ahead of the workers (0 to disable)"
+    )
+    parser.add_argument(
+        "--checkpoint-interval", type=float, default=CHECKPOINT_INTERVAL,
+        help="Seconds between status file saves while rows finish (0: after every row)"
+    )
+    parser.add_argument("--min-free-disk-mb", type=int, default=5, help="Pause downloads below this free space")
+
+    # Limits and modes
+    parser.add_argument(
+        "--max-success", type=positive_int, default=None,
+        help="Stop after this many successful downloads (default: no limit)"
+    )
+    parser.add_argument(
+        "--no-landing-pages", action="store_true",
+        help="Do not look for PDF links on HTML pages behind secondary links"
+    )
+    parser.add_argument(
+        "--probe", action="store_true",
+        help="Only probe the links (one small request each) into --triage-file; download nothing"
+    )
+    parser.add_argument("--probe-workers", type=int, default=32, help="Concurrent probes with --probe")
+    parser.add_argument(
+        "--probe-method", choices=["range", "head"], default="range",
+        help="Probe with a 1 KB range GET (default) or a HEAD request"
+    )
+    parser.add_argument(
+        "--no-delta", action="store_true",
+        help="Skip attempted BRnums even if their links changed in the workbooks"
+    )
+    parser.add_argument("--revalidate", action="store_true", help="Re-check stored reports with conditional GETs")
+    parser.add_argument("--trace", metavar="FILE", default=None, help="Record every HTTP request to FILE for replay")
+    parser.add_argument("--profile", metavar="DIR", default=None, help="Write sampled per-thread profiles to DIR")
+    parser.add_argument("--profile-top", type=int, default=20, help="Hot functions to print with --profile")
+    parser.add_argument("--progress-interval", type=float, default=1.0, help="Seconds between progress lines")
+    parser.add_argument("--quiet", action="store_true", help="Do not print a progress line")
+
+    return parser
+
+
+def _mb_to_bytes(mb_per_s):
+    return int(mb_per_s * 1024 * 1024) if mb_per_s else None
+
+
+def main(argv=None):
+    """
+    Headless entry point: runs the downloader in the main thread and prints
+    a rate-limited progress line to stderr. Never imports tkinter.
+    The first Ctrl+C stops the run gracefully (running downloads are aborted
+    and the status file is saved); a second one exits immediately.
+    """
+    args = build_parser().parse_args(argv)
+
+    logger = setup_logger(
+        log_dir=args.log_dir,
+        max_mb=args.log_max_mb,
+        retention_mb=args.log_retention_mb,
+        json_lines=args.log_json
+    )
+    logger.info("=== Starting the PDF Download program (headless) ===")
+
+    update_queue = None
+    progress = None
+    if not args.quiet:
+        update_queue = Queue()
+        progress = TerminalProgress(
+            update_queue,
+            interval=args.progress_interval,
+            max_success=args.max_success
+        ).start()
+
+    cancel_token = CancelToken()
+
+    def _interrupt(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        cancel_token.cancel("Interrupted")
+
+    previous_handler = signal.signal(signal.SIGINT, _interrupt)
+
+    try:
+        run_downloader(
+            xlsx_paths=args.xlsx_paths,
+            output_folder=args.output_folder,
+            status_file=args.status_file,
+            dev_mode=args.max_success is not None,
+            max_concurrent_workers=args.workers,
+            update_queue=update_queue,
+            max_success=args.max_success or 0,
+            chunk_size=args.chunk_size,
+            lookahead_rows=args.lookahead_rows,
+            parallel_read=args.parallel_read,
+            seed=args.seed,
+            output_layout=args.layout,
+            min_free_disk_mb=args.min_free_disk_mb,
+            checkpoint_interval=args.checkpoint_interval,
+            manifest_file=args.manifest_file or None,
+            content_store=args.content_store,
+            revalidate=args.revalidate,
+            head_timeout=args.head_timeout,
+            get_timeout=args.get_timeout,
+            profile_dir=args.profile,
+            profile_top=args.profile_top,
+            cancel_token=cancel_token,
+            trace_file=args.trace,
+            bandwidth_limit=_mb_to_bytes(args.bandwidth_limit),
+            host_bandwidth_limit=_mb_to_bytes(args.host_bandwidth_limit),
+            dns_cache=not args.no_dns_cache,
+            dns_prefetch_rows=args.dns_prefetch_rows,
+            landing_page_resolver=not args.no_landing_pages and LandingPageResolver(args.landing_page_cache or None),
+            triage_file=args.triage_file or None,
+            probe=args.probe,
+            probe_workers=args.probe_workers,
+            probe_method=args.probe_method,
+            postprocess=args.postprocess,
+            host_history=not args.no_host_history,
+            exploration=args.exploration,
+            delta=not args.no_delta
+        )
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        if progress is not None:
+            progress.stop()
+
+    logger.info("=== PDF Download program completed ===")
+
+
+if __name__ == "__main__":
+    main()
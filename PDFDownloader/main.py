@@ -1,16 +1,19 @@
 # main.py (Refactored)
+import argparse
 import threading
 from queue import Queue
 
 import logging
-from ui.app import DownloadApp
+from pdf_downloader.cancellation import CancelToken
 from pdf_downloader.downloader import run_downloader
+from pdf_downloader.landing_page import LandingPageResolver
 from utils.logging_setup import setup_logger
 
 
-def run_downloader_in_thread(dev_mode_toggle, update_queue):
+def run_downloader_in_thread(dev_mode_toggle, update_queue, profile_dir=None, cancel_token=None):
     """
     Helper function to start the downloader in a separate thread.
+    Cancelling `cancel_token` makes it stop within about a second.
     """
     def downloader_thread():
         # Run the actual downloader logic
@@ -18,13 +21,17 @@ def run_downloader_in_thread(dev_mode_toggle, update_queue):
             xlsx_paths=["data/GRI_2017_2020 (1).xlsx", "data/Metadata2006_2016.xlsx"],
             output_folder="data/PDFs",
             status_file="data/DownloadedStatus.xlsx",
+            manifest_file="data/Manifest.csv",
             dev_mode=dev_mode_toggle,
             max_concurrent_workers=3,
             update_queue=update_queue,
-            max_success=10
+            max_success=10,
+            profile_dir=profile_dir,
+            cancel_token=cancel_token,
+            landing_page_resolver=LandingPageResolver(cache_file="data/LandingPages.json")
         )
 
-    thread = threading.Thread(target=downloader_thread, daemon=True)
+    thread = threading.Thread(target=downloader_thread, name="Downloader", daemon=True)
     thread.start()
     return thread
 
@@ -35,6 +42,10 @@ def main():
     """
     dev_mode_toggle = True  # Toggle for development mode
 
+    parser = argparse.ArgumentParser(description="PDF Downloader with UI.")
+    parser.add_argument("--profile", metavar="DIR", default=None, help="Write sampled per-thread profiles to DIR")
+    args = parser.parse_args()
+
     # 1. Setup logging
     logger = setup_logger(log_dir="logs")
     logger.info("=== Starting the PDF Download program (with UI) ===")
@@ -42,7 +53,8 @@ def main():
     # 2. Create a queue for UI updates
     update_queue = Queue()
 
-    # 3. Create the Tkinter app for downloads
+    # 3. Create the Tkinter app for downloads (tkinter is only loaded here)
+    from ui.app import DownloadApp
     app = DownloadApp(
         update_queue=update_queue,
         max_workers=3,
@@ -51,13 +63,17 @@ def main():
     )
 
     # 4. Start the downloader in a separate thread
-    downloader_t = run_downloader_in_thread(dev_mode_toggle, update_queue)
+    cancel_token = CancelToken()
+    downloader_t = run_downloader_in_thread(
+        dev_mode_toggle, update_queue, profile_dir=args.profile, cancel_token=cancel_token
+    )
 
     # 5. Run the UI main loop (blocks until window closes)
     app.mainloop()
 
-    logger.info("=== UI closed. Waiting for downloader thread to finish ===")
-    downloader_t.join()  # Ensure downloader finishes
+    logger.info("=== UI closed. Stopping the downloader ===")
+    cancel_token.cancel("UI closed")
+    downloader_t.join()  # Returns once running downloads are aborted and the status is saved
     logger.info("=== PDF Download program completed ===")
 
 
@@ -0,0 +1,83 @@
+# cancellation.py
+
+import itertools
+import logging
+import threading
+from contextlib import contextmanager
+
+
+class CancelToken:
+    """
+    Cooperative cancellation signal shared by run_downloader and its
+    workers. Work checks `cancelled` at safe points; code that blocks
+    (e.g. a socket read) registers an abort callback with on_cancel(),
+    which runs as soon as cancel() is called.
+
+    Example usage:
+        token = CancelToken()
+        threading.Thread(target=run_downloader, kwargs={..., "cancel_token": token}).start()
+        ...
+        token.cancel("UI closed")
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.reason = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self._ids = itertools.count()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason="Cancelled"):
+        """
+        Signals cancellation and runs the registered abort callbacks.
+        Only the first call has an effect.
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+
+        self.logger.info(f"Cancellation requested: {reason}")
+        for callback in callbacks:
+            self._run(callback)
+
+    def wait(self, timeout=None):
+        """
+        Blocks until cancelled or `timeout` seconds passed.
+        Returns True if cancelled.
+        """
+        return self._event.wait(timeout)
+
+    @contextmanager
+    def on_cancel(self, callback):
+        """
+        Runs `callback` if the token is cancelled while inside the block
+        (immediately, if it already is).
+        """
+        with self._lock:
+            already_cancelled = self._event.is_set()
+            if not already_cancelled:
+                callback_id = next(self._ids)
+                self._callbacks[callback_id] = callback
+        if already_cancelled:
+            self._run(callback)
+        try:
+            yield self
+        finally:
+            if not already_cancelled:
+                with self._lock:
+                    self._callbacks.pop(callback_id, None)
+
+    def _run(self, callback):
+        try:
+            callback()
+        except Exception as e:
+            self.logger.debug(f"Abort callback failed: {e}")
@@ -0,0 +1,245 @@
+# dns_cache.py
+
+import ipaddress
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------
+# Constants
+# ---------------------
+# Seconds a resolved address is reused when the lookup reports no TTL
+DEFAULT_TTL = 300
+# Seconds a failed lookup is remembered
+DEFAULT_NEGATIVE_TTL = 60
+# Upcoming rows whose hosts are resolved ahead of time
+DEFAULT_PREFETCH_ROWS = 200
+
+_system_getaddrinfo = socket.getaddrinfo
+
+# Installed caches, most recent last; a cache installed twice is listed twice
+_installed_caches = []
+_install_lock = threading.Lock()
+
+
+def system_lookup(host):
+    """
+    Resolves `host` with the system resolver. Returns (addrinfos, ttl);
+    the system resolver does not report TTLs, so ttl is None.
+    """
+    return _system_getaddrinfo(host, None, 0, socket.SOCK_STREAM), None
+
+
+class _Entry:
+    __slots__ = ("addrinfos", "error", "expires")
+
+    def __init__(self, addrinfos, error, expires):
+        self.addrinfos = addrinfos
+        self.error = error
+        self.expires = expires
+
+
+class DNSCache:
+    """
+    Shared, thread-safe cache of host name lookups. Addresses are kept for
+    the TTL reported by `lookup` (or `ttl` seconds), and failed lookups for
+    `negative_ttl` seconds, so a dead domain costs one lookup instead of
+    one per row. Concurrent lookups of the same host wait for a single
+    resolution.
+
+    install() routes socket.getaddrinfo through the cache, which covers
+    the connections of requests/urllib3; uninstall() restores it. Installs
+    are counted process-wide, so concurrent runs can each install a cache:
+    the most recently installed one still in use serves lookups, and the
+    system resolver is restored after the last uninstall. Numeric
+    addresses and unusual lookups (flags, datagram sockets, service names)
+    go straight to the system resolver.
+
+    `lookup(host)` returns (addrinfos, ttl or None) and raises
+    socket.gaierror for unknown hosts; tests pass a stub instead of the
+    default system_lookup.
+
+    Example usage:
+        cache = DNSCache().install()
+        DNSPrefetcher(cache).prefetch(["example.com", "example.org"])
+        ...
+        cache.uninstall()
+    """
+
+    def __init__(self, lookup=system_lookup, ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL, clock=time.monotonic):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.lookup = lookup
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+        self._lock = threading.Lock()
+        self._entries = {}                # host -> _Entry
+        self._pending = {}                # host -> threading.Event
+
+    # ---------------------
+    # Lookups
+    # ---------------------
+    def resolve(self, host):
+        """
+        Returns the addrinfos of `host` (from the cache if still valid).
+        Raises socket.gaierror for hosts that failed to resolve.
+        """
+        key = host.lower()
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires > self.clock():
+                    if entry.error is not None:
+                        self.negative_hits += 1
+                        raise socket.gaierror(*entry.error)
+                    self.hits += 1
+                    return entry.addrinfos
+                event = self._pending.get(key)
+                if event is None:
+                    event = self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Another thread is resolving this host; use its result
+            event.wait()
+
+        try:
+            addrinfos, ttl = self.lookup(host)
+            entry = _Entry(addrinfos, None, self.clock() + (ttl if ttl is not None else self.ttl))
+        except socket.gaierror as e:
+            entry = _Entry(None, e.args, self.clock() + self.negative_ttl)
+        except Exception as e:  # e.g. an invalid IDN or a broken stub; never leave the host pending
+            entry = _Entry(None, (socket.EAI_FAIL, str(e)), self.clock() + self.negative_ttl)
+
+        with self._lock:
+            self._entries[key] = entry
+            del self._pending[key]
+        event.set()
+
+        if entry.error is not None:
+            raise socket.gaierror(*entry.error)
+        return entry.addrinfos
+
+    def known(self, host):
+        """
+        Returns True if `host` resolved, False if it failed, and None if
+        it is not cached (or expired).
+        """
+        with self._lock:
+            entry = self._entries.get(host.lower())
+            if entry is None or entry.expires <= self.clock():
+                return None
+            return entry.error is None
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """
+        Drop-in replacement for socket.getaddrinfo backed by the cache.
+        """
+        if not self._cacheable(host, port, type, proto, flags):
+            return _system_getaddrinfo(host, port, family, type, proto, flags)
+
+        port = int(port) if port is not None else 0
+        results = []
+        for af, socktype, sproto, canonname, sockaddr in self.resolve(host):
+            if family and af != family:
+                continue
+            results.append((af, socktype, sproto, canonname, (sockaddr[0], port) + tuple(sockaddr[2:])))
+        if not results:
+            raise socket.gaierror(socket.EAI_FAMILY, f"No address of the requested family for {host}")
+        return results
+
+    @staticmethod
+    def _cacheable(host, port, type, proto, flags):
+        if not isinstance(host, str) or not host or flags or type not in (0, socket.SOCK_STREAM):
+            return False
+        if proto not in (0, socket.IPPROTO_TCP):
+            return False
+        if isinstance(port, str) and not port.isdigit():
+            return False
+        try:
+            ipaddress.ip_address(host.strip("[]"))
+            return False
+        except ValueError:
+            return True
+
+    # ---------------------
+    # Installation
+    # ---------------------
+    def install(self):
+        """
+        Routes socket.getaddrinfo through this cache. Returns self.
+        """
+        with _install_lock:
+            _installed_caches.append(self)
+            socket.getaddrinfo = self.getaddrinfo
+        return self
+
+    def uninstall(self):
+        """
+        Undoes one install() (a no-op if there is none), handing
+        socket.getaddrinfo back to the previous cache still installed, or
+        to the system resolver.
+        """
+        with _install_lock:
+            for i in range(len(_installed_caches) - 1, -1, -1):
+                if _installed_caches[i] is self:
+                    del _installed_caches[i]
+                    break
+            else:
+                return
+            if _installed_caches:
+                socket.getaddrinfo = _installed_caches[-1].getaddrinfo
+            else:
+                socket.getaddrinfo = _system_getaddrinfo
+
+    def summary(self):
+        return (
+            f"{len(self._entries)} hosts cached, {self.hits} hits, "
+            f"{self.negative_hits} negative hits, {self.misses} lookups"
+        )
+
+
+class DNSPrefetcher:
+    """
+    Resolves hosts ahead of time on a few background threads, in the order
+    given, so a worker that reaches a row finds its host already cached.
+    Hosts that are cached or already queued are skipped.
+    """
+
+    def __init__(self, cache, workers=8):
+        self.cache = cache
+        self.prefetched = 0
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="DNSPrefetch")
+
+    def prefetch(self, hosts):
+        """
+        Queues the lookups of `hosts` (None and repeated entries are skipped).
+        """
+        for host in hosts:
+            if not self.cache._cacheable(host, None, 0, 0, 0) or self.cache.known(host) is not None:
+                continue
+            with self._lock:
+                if host in self._queued:
+                    continue
+                self._queued.add(host)
+            self.prefetched += 1
+            self._executor.submit(self._resolve, host)
+
+    def _resolve(self, host):
+        try:
+            self.cache.resolve(host)
+        except OSError:
+            pass  # negative entry is cached
+        finally:
+            with self._lock:
+                self._queued.discard(host)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
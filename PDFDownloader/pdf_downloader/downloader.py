@@ -1,15 +1,35 @@
 # downloader.py (Refactored)
 
+import hashlib
 import logging
 import os
-import pandas as pd
-import requests
-import shutil
+import random
+import re
 import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from utils.xlsx_chunk_reader import read_xlsx_in_chunks
+from pdf_downloader.dns_cache import DEFAULT_PREFETCH_ROWS, DNSCache, DNSPrefetcher
+from pdf_downloader.landing_page import LandingPageResolver, looks_like_html
+from pdf_downloader.manifest import ContentStore, Manifest
+from pdf_downloader.ordering import (
+    DEFAULT_EXPLORATION, HostHistory, HostSpeedTracker, interleave_by_host, interleave_with_history
+)
+from pdf_downloader.postprocess import PostProcessor
+from pdf_downloader.storage import FlatLayout, make_output_layout
+from pdf_downloader.trace import TraceRecorder
+from pdf_downloader.triage import UNKNOWN, TriageTable, probe_url
+from pdf_downloader.work_queue import WorkQueue
+from pdf_downloader.transport import RequestsTransport, default_transport
+from utils.bandwidth_limiter import BandwidthLimiter
+from utils.disk_monitor import DiskSpaceMonitor
+from utils.profiler import start_profiler, finish_profiler
+
+# pandas, requests, PyPDF2 and the XLSX reader (openpyxl) are imported inside
+# the functions that use them, so importing this module stays cheap.
 
 # ---------------------
 # Constants
@@ -17,6 +37,55 @@ from utils.xlsx_chunk_reader import read_xlsx_in_chunks
 PRIMARY_LINK_COL = "Pdf_URL"
 SECONDARY_LINK_COL = "Report Html Address"
 BRNUM_COL = "BRnum"
+HOST_COL = "Host"
+LOCATION_COL = "Location"
+
+# Default request timeouts in seconds
+HEAD_TIMEOUT = 30
+GET_TIMEOUT = 60
+
+# Status columns kept for each successful fetch, used by revalidation
+URL_COL = "URL"
+ETAG_COL = "ETag"
+LAST_MODIFIED_COL = "Last-Modified"
+CONTENT_LENGTH_COL = "Content-Length"
+SHA256_COL = "SHA256"
+
+# Status columns kept for each finished row, used to rank hosts in later runs
+ELAPSED_COL = "Elapsed"
+BYTES_COL = "Bytes"
+
+# Status columns with the (normalized) links each row was attempted with,
+# compared against later editions of the workbooks
+PRIMARY_ATTEMPTED_COL = "Primary Link"
+SECONDARY_ATTEMPTED_COL = "Secondary Link"
+# Stored for a missing link (an empty cell would read back as "not recorded")
+MISSING_LINK = "-"
+
+# URL cleanup patterns, shared by the per-chunk (vectorized) and per-URL paths
+_ZERO_WIDTH_PATTERN = r"[\u200B-\u200F\u2060\uFEFF]"
+_INNER_SPACE_PATTERN = r"\s"
+_SCHEME_PATTERN = r"^[a-z][a-z0-9+.-]*://"
+_BARE_HOST_PATTERN = r"^(?://)?(?:www\.|[a-z0-9-]+(?:\.[a-z0-9-]+)+|\[[0-9a-f:]+\])(?::\d+)?(?:[/?#]|$)"
+_HTTP_URL_PATTERN = r"^https?://[^/?#\s]+"
+_HOST_PATTERN = r"^https?://(?:[^@/?#]*@)?(\[[^\]]+\]|[^/:?#]+)"
+_NULL_URL_STRINGS = ("", "nan", "none", "null", "n/a", "<na>")
+
+_ZERO_WIDTH_RE = re.compile(_ZERO_WIDTH_PATTERN)
+_INNER_SPACE_RE = re.compile(_INNER_SPACE_PATTERN)
+_SCHEME_RE = re.compile(_SCHEME_PATTERN, re.IGNORECASE)
+_BARE_HOST_RE = re.compile(_BARE_HOST_PATTERN, re.IGNORECASE)
+_HTTP_URL_RE = re.compile(_HTTP_URL_PATTERN, re.IGNORECASE)
+_HOST_RE = re.compile(_HOST_PATTERN, re.IGNORECASE)
+
+# Minimum seconds between two progress messages of one download
+PROGRESS_INTERVAL = 0.25
+
+# Minimum seconds between two status file saves while rows finish
+CHECKPOINT_INTERVAL = 5.0
+
+# Suffix of the hidden temp files downloads are streamed into
+PART_SUFFIX = ".part"
 
 # ---------------------
 # Public Entry Function
@@ -29,122 +98,766 @@ def run_downloader(
     max_concurrent_workers=1,
     update_queue=None,
     max_success=10,
-    chunk_size=1000
+    chunk_size=1000,
+    lookahead_rows=10000,
+    seed=None,
+    output_layout="flat",
+    min_free_disk_mb=5,
+    manifest_file=None,
+    content_store=None,
+    revalidate=False,
+    head_timeout=HEAD_TIMEOUT,
+    get_timeout=GET_TIMEOUT,
+    profile_dir=None,
+    profile_top=20,
+    cancel_token=None,
+    shutdown_timeout=1.0,
+    trace_file=None,
+    transport=None,
+    bandwidth_limit=None,
+    host_bandwidth_limit=None,
+    landing_page_resolver=True,
+    dns_cache=True,
+    dns_prefetch_rows=DEFAULT_PREFETCH_ROWS,
+    triage_file=None,
+    probe=False,
+    probe_workers=32,
+    probe_method="range",
+    parallel_read=None,
+    postprocess=None,
+    host_history=True,
+    exploration=DEFAULT_EXPLORATION,
+    delta=True,
+    row_source=None,
+    download_fn=None,
+    checkpoint_interval=CHECKPOINT_INTERVAL
 ):
     """
     Main function to:
-      1) Read chunks from multiple .xlsx files.
-      2) Combine & shuffle data.
+      1) Read chunks from multiple .xlsx files until `lookahead_rows` are pending.
+      2) Combine the data and interleave it by host (see interleave_by_host).
       3) Skip previously attempted entries.
       4) Concurrently download PDFs.
       5) Update a status file with results.
+
+    Hosts are weighted by the download speed observed so far in the run.
+    Pass `seed` to make the ordering reproducible (e.g. for benchmarking).
+
+    `output_layout` is a layout name ('flat', 'hash', 'prefix', 'zip', 'tar')
+    or a layout object from pdf_downloader.storage. The final location of
+    each PDF is recorded in the status file's LOCATION_COL.
+
+    New downloads are paused while the output disk has less than
+    `min_free_disk_mb` MB free, and resumed at twice that amount.
+
+    Every saved PDF is listed in `manifest_file` (BRnum, URL, size, SHA-256,
+    pages, location) if given. With a `content_store` folder, identical PDFs
+    are hardlinked to one stored copy instead of being kept twice.
+
+    With `revalidate=True`, BRnums that were downloaded before are checked
+    again with a conditional GET (If-None-Match / If-Modified-Since, from the
+    ETag and Last-Modified saved in the status file). Unchanged reports cost
+    one 304 response; changed ones replace the stored PDF. Archive layouts
+    cannot replace a PDF, so revalidation is ignored there.
+
+    `head_timeout` and `get_timeout` are the per-request timeouts in seconds.
+
+    With a `profile_dir`, every thread (this loop, the download workers and
+    e.g. the UI thread) is sampled during the run. Per-thread-group pstats
+    and collapsed-stack files are written to a timestamped subfolder, and
+    the `profile_top` hottest functions are printed at the end.
+
+    With a `cancel_token` (see pdf_downloader.cancellation), cancelling it
+    stops the run: no new rows are started, running downloads abort their
+    transfer (the partial temp file is deleted), and the status file is
+    saved once. Downloads that have not stopped after `shutdown_timeout`
+    seconds are not waited for. Cancelled rows are not recorded, so they
+    are tried again on the next run.
+
+    With a `trace_file`, every HTTP request is logged there as JSON lines
+    (timing, status, redirects, headers and size; see pdf_downloader.trace),
+    so the run can be replayed offline with tests/replay_server.py.
+
+    HTTP requests go through `transport` (see pdf_downloader.transport).
+    By default a RequestsTransport with a connection pool per host, sized
+    for `max_concurrent_workers`, is created for the run and closed after it.
+
+    `bandwidth_limit` caps the combined download rate in bytes/second, and
+    `host_bandwidth_limit` the rate of each host, so many workers can wait
+    on slow servers without exceeding the link budget. Pass a
+    utils.bandwidth_limiter.BandwidthLimiter instead of a number to change
+    the limits while the run is going. The time spent throttled is logged
+    at the end.
+
+    Secondary links that answer with an HTML landing page are resolved to
+    the PDF they link to (see pdf_downloader.landing_page). Pass a
+    LandingPageResolver to keep its cache across runs, or False to disable.
+
+    Host names are resolved through a shared DNSCache (pass one to set its
+    TTLs, or False to disable), which remembers failed lookups too. The
+    hosts of the next `dns_prefetch_rows` scheduled rows are resolved in
+    the background, so workers rarely wait on DNS. By default the cache is
+    only used with a RequestsTransport; other transports (e.g. the
+    FakeTransport of the tests) never touch the system resolver.
+
+    With `probe=True`, nothing is downloaded: every link of the pending rows
+    is classified with one lightweight request (see run_probe) into the
+    `triage_file` CSV. A later full run given the same `triage_file` skips
+    links classed dead (rows without a live link are recorded as failures
+    without a request) and starts the most expensive downloads first.
+
+    With `parallel_read` (default: when there is more than one workbook),
+    each workbook is parsed and its links normalized in its own process
+    (see utils.xlsx_parallel_reader), and this loop only schedules.
+
+    With `postprocess` (a PostProcessor or its cache folder), every fresh
+    download is handed to a process pool that extracts page count, metadata
+    and text (see pdf_downloader.postprocess). Results are cached by content
+    hash, so only new or changed PDFs are parsed. The run waits for the
+    queued PDFs before returning.
+
+    The host, seconds and bytes of each finished row are kept in the status
+    file. With `host_history`, a new run weights hosts by the successes per
+    worker-second they gave in earlier runs (see interleave_with_history),
+    on top of the speed seen in this run. Hosts without history get an
+    `exploration` share of the schedule.
+
+    The status file also keeps the links each row was attempted with. With
+    `delta`, a BRnum whose links changed in a newer edition of a workbook
+    is attempted again (see diff_against_status); a stored PDF is replaced
+    only if one of the new links works (never with archive layouts, which
+    keep the stored PDF). Rows recorded before these columns existed count
+    as unchanged.
+
+    The status file is an Excel workbook, or CSV if `status_file` ends in
+    '.csv' (much faster to save as it grows; see save_status_file). Every
+    save rewrites the whole history, so while rows finish it is saved at
+    most every `checkpoint_interval` seconds (0: after every row), and
+    always after each lookahead window and at the end of the run. Rows
+    lost to a crash in between are tried again by the next run, which
+    finds their PDFs already stored.
+
+    `row_source` (a list of iterators of DataFrame chunks, one per input)
+    replaces reading `xlsx_paths`, and `download_fn` (same signature as
+    download_single_pdf) replaces the download; benchmarks use them to
+    measure the bookkeeping alone (see benchmarks/bench_bookkeeping.py).
     """
 
+    if probe:
+        return run_probe(
+            xlsx_paths, triage_file, status_file=status_file, workers=probe_workers,
+            update_queue=update_queue, chunk_size=chunk_size, transport=transport,
+            timeout=head_timeout, method=probe_method, cancel_token=cancel_token, dns_cache=dns_cache,
+            parallel_read=parallel_read
+        )
+
     logger = logging.getLogger("PDFDownloaderLogger")
-    logger.info(f"Downloading PDFs from xlsx paths: {xlsx_paths}")
-    os.makedirs(output_folder, exist_ok=True)
+    owns_transport = transport is None
+    if dns_cache is True:
+        # Only the requests-based transport opens sockets the cache can serve
+        dns_cache = DNSCache() if owns_transport or isinstance(transport, RequestsTransport) else False
+    layout = prefetcher = disk_monitor = parallel_reader = df_status = resolver = None  # set as they start
+    finished = False
+    profiler = start_profiler(profile_dir)
+
+    # Everything started below is stopped in the finally block, also when the
+    # run raises: socket.getaddrinfo must not stay patched, and no background
+    # thread or parser process may outlive the run.
+    try:
+        logger.info(f"Downloading PDFs from xlsx paths: {xlsx_paths}")
+        os.makedirs(output_folder, exist_ok=True)
+        remove_stale_parts(output_folder)
+        layout = output_layout
+        if isinstance(output_layout, str):
+            layout = make_output_layout(output_folder, output_layout)
+
+        df_status = load_or_create_status_file(status_file)
+        success_count = 0
+        fail_count = 0
+        rng = random.Random(seed)
+        if owns_transport:
+            transport = RequestsTransport(pool_size=max_concurrent_workers)
+        attempt_options = {"head_timeout": head_timeout, "get_timeout": get_timeout, "transport": transport}
+        if trace_file:
+            attempt_options["trace"] = TraceRecorder(trace_file)
+        limiter = bandwidth_limit
+        if not isinstance(bandwidth_limit, BandwidthLimiter):
+            limiter = BandwidthLimiter(rate=bandwidth_limit, host_rate=host_bandwidth_limit)
+        if limiter.limited or limiter is bandwidth_limit:
+            attempt_options["limiter"] = limiter
+        resolver = landing_page_resolver
+        if resolver is True:
+            resolver = LandingPageResolver()
+        triage = TriageTable(triage_file) if triage_file else None
+        if dns_cache:
+            dns_cache.install()
+            if dns_prefetch_rows:
+                prefetcher = DNSPrefetcher(dns_cache)
+        host_speeds = HostSpeedTracker()
+        history = _load_host_history(df_status) if host_history else None
+        if history is not None:
+            logger.info(f"Host history: {history.summary()}")
+        disk_monitor = DiskSpaceMonitor(output_folder, min_free_mb=min_free_disk_mb).start()
+        manifest = Manifest(manifest_file) if manifest_file else None
+        poll_interval = 1.0 if cancel_token is None else 0.2  # notice a cancellation quickly
+        if isinstance(content_store, (str, os.PathLike)):
+            content_store = ContentStore(content_store)
+        if content_store is not None and not layout.keeps_files:
+            logger.warning("Content store is ignored with archive output layouts.")
+            content_store = None
+        if isinstance(postprocess, (str, os.PathLike)):
+            postprocess = PostProcessor(postprocess)
+        if postprocess is not None and not layout.keeps_files:
+            logger.warning("Post-processing is ignored with archive output layouts.")
+            postprocess = None
+        if delta and not layout.keeps_files:
+            logger.info("PDFs already in the archives are kept when their links change.")
+        if revalidate and not layout.keeps_files:
+            logger.warning("Revalidation is ignored with archive output layouts.")
+            revalidate = False
+
+        # The status file is saved at most every `checkpoint_interval` seconds
+        # while rows finish, since each save rewrites the whole history
+        next_checkpoint = 0.0
+
+        # Rows already attempted are skipped (only failures when revalidating)
+        skip_statuses = ["Failure"] if revalidate else ["Success", "Failure"]
+
+        if row_source is not None:
+            chunk_readers, parallel_reader = [iter(source) for source in row_source], None
+        else:
+            # Job-wide total for the progress views, from the workbooks' metadata
+            pending_rows = count_pending_rows(xlsx_paths, df_status, statuses=skip_statuses)
+            if pending_rows is not None:
+                _push_total(update_queue, pending_rows)
+
+            # Prepare chunk readers for each .xlsx
+            chunk_readers, parallel_reader = _open_chunk_readers(xlsx_paths, chunk_size, parallel_read)
+        download_fn = download_fn or download_single_pdf
+
+        # Continuously read chunks, combine, and process until no more data or dev_mode max met
+        while not _is_cancelled(cancel_token):
+            if dev_mode and success_count >= max_success:
+                logger.info("Reached dev_mode success limit. Exiting.")
+                break
+
+            # Combine chunks from each file until the lookahead window is full
+            combined_df = _read_lookahead(chunk_readers, lookahead_rows)
+
+            if combined_df.empty:
+                logger.info("No more chunk data. Stopping downloads.")
+                break
+
+            # Ensure needed columns exist; skip if missing
+            if BRNUM_COL not in combined_df.columns:
+                logger.warning(f"Missing column '{BRNUM_COL}' in chunk. Skipping chunk.")
+                continue
+
+            # Clean the link columns and extract the host (one vectorized pass,
+            # already done by the parser processes when reading in parallel)
+            if parallel_reader is None:
+                combined_df = normalize_link_columns(combined_df)
+
+            # Filter out any BRnum previously attempted (unless its links changed)
+            changed = set()
+            if delta:
+                combined_df, changed = diff_against_status(combined_df, df_status, statuses=skip_statuses)
+            else:
+                combined_df = exclude_already_attempted(combined_df, df_status, statuses=skip_statuses)
+            validators = _load_validators(df_status) if revalidate else {}
+            if combined_df.empty:
+                logger.debug("All rows in this chunk were already attempted. Moving on.")
+                continue
+
+            # Links found dead by a probe run are not tried again
+            costs = None
+            if triage is not None:
+                combined_df, dead_rows = _apply_triage(combined_df, triage)
+                for brnum, info, links in dead_rows:
+                    fail_count += 1
+                    df_status = update_status(df_status, brnum, "Failure", info, **_link_fields(links))
+                if dead_rows:
+                    logger.info(f"Skipped {len(dead_rows)} rows whose links were all dead when probed.")
+                    _push_counters(update_queue, success_count, fail_count)
+                    save_status_file(df_status, status_file)
+                if combined_df.empty:
+                    continue
 
-    df_status = load_or_create_status_file(status_file)
-    success_count = 0
-    fail_count = 0
+            # The window's rows move into a compact queue; the DataFrame is dropped
+            work = WorkQueue.from_columns(
+                _column_values(combined_df, BRNUM_COL),
+                _column_values(combined_df, PRIMARY_LINK_COL),
+                _column_values(combined_df, SECONDARY_LINK_COL),
+                _column_values(combined_df, HOST_COL)
+            )
+            del combined_df
+            if triage is not None:
+                costs = [triage.cost(work.primary[i] or work.secondary[i]) for i in range(len(work))]
+
+            # Spread the work across hosts, faster hosts more often (and hosts
+            # that were productive in earlier runs first)
+            if history is not None:
+                order = interleave_with_history(
+                    range(len(work)),
+                    work.hosts(),
+                    history,
+                    exploration=exploration,
+                    weights=host_speeds.weights(),
+                    rng=rng,
+                    costs=costs
+                )
+            else:
+                order = interleave_by_host(
+                    range(len(work)),
+                    work.hosts(),
+                    weights=host_speeds.weights(),
+                    rng=rng,
+                    costs=costs
+                )
+            work.reorder(order)
+            del order, costs
 
-    # Prepare chunk readers for each .xlsx
-    chunk_readers = [read_xlsx_in_chunks(path, chunk_size=chunk_size) for path in xlsx_paths]
+            # Concurrency for downloading each row. Only a small window of rows is
+            # submitted at a time, so new work can be held back while disk space is low.
+            executor = ThreadPoolExecutor(max_workers=max_concurrent_workers, thread_name_prefix="DLWorker")
+            drain_deadline = None
+            try:
+                futures_map = {}
+                max_in_flight = 2 * max_concurrent_workers
+                rows = iter(work)
+                rows_left = True
+                rows_pending = len(work)
+                limit_reached = False
+                prefetched_rows = 0
+
+                while not limit_reached:
+                    # On cancellation: drop queued work, give running downloads
+                    # `shutdown_timeout` seconds to abort, and record what finished
+                    if drain_deadline is None and _is_cancelled(cancel_token):
+                        logger.info(f"Cancelled; draining {len(futures_map)} in-flight downloads.")
+                        drain_deadline = time.monotonic() + shutdown_timeout
+                        rows_left = False
+                        for f_remaining in futures_map:
+                            f_remaining.cancel()
+                    if drain_deadline is not None and (not futures_map or time.monotonic() >= drain_deadline):
+                        break
+
+                    # Top up the in-flight window unless the disk monitor paused us
+                    while rows_left and len(futures_map) < max_in_flight and not disk_monitor.paused:
+                        row = next(rows, None)
+                        if row is None:
+                            rows_left = False
+                            break
+                        rows_pending -= 1
+                        brnum, primary_url, secondary_url, host = row
+                        if brnum is None or brnum == "":
+                            continue
+                        meta = {}
+                        future = executor.submit(
+                            download_fn,
+                            brnum,
+                            primary_url,
+                            secondary_url,
+                            output_folder,
+                            update_queue,
+                            max_concurrent_workers,
+                            meta=meta,
+                            layout=layout,
+                            content_store=content_store,
+                            revalidate=validators.get(brnum) if revalidate and brnum not in changed else None,
+                            replace=brnum in changed,
+                            cancel_token=cancel_token,
+                            landing_page_resolver=resolver or None,
+                            **attempt_options
+                        )
+                        futures_map[future] = (brnum, host, meta, (primary_url, secondary_url))
+
+                    # Resolve the hosts of the next rows (primary, then secondary)
+                    # before a worker needs them
+                    if prefetcher is not None:
+                        prefetch_end = min(len(work), len(work) - rows_pending + dns_prefetch_rows)
+                        if prefetch_end > prefetched_rows:
+                            prefetcher.prefetch(_upcoming_hosts(work, prefetched_rows, prefetch_end))
+                            prefetched_rows = prefetch_end
+
+                    if not futures_map:
+                        if not rows_left:
+                            break
+                        disk_monitor.wait_for_space(timeout=poll_interval)
+                        continue
+
+                    # Process results as they complete
+                    wait_timeout = poll_interval
+                    if drain_deadline is not None:
+                        wait_timeout = max(0.0, drain_deadline - time.monotonic())
+                    done, _ = wait(futures_map, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        this_brnum, this_host, this_meta, this_links = futures_map.pop(future)
+                        if future.cancelled():
+                            continue
+                        try:
+                            status, info = future.result()
+                        except Exception as e:
+                            logger.exception(f"Unhandled error for BRnum={this_brnum}: {e}")
+                            fail_count += 1
+                            df_status = update_status(df_status, this_brnum, "Failure", str(e), **_link_fields(this_links))
+                            _push_counters(update_queue, success_count, fail_count)
+                            if drain_deadline is None and time.monotonic() >= next_checkpoint:
+                                save_status_file(df_status, status_file)
+                                next_checkpoint = time.monotonic() + checkpoint_interval
+                            continue
+
+                        if status == "Cancelled":
+                            continue
+                        if "elapsed" in this_meta:
+                            host_speeds.record(this_host, this_meta.get("bytes", 0), this_meta["elapsed"])
+
+                        if status == "Success":
+                            success_count += 1
+                        else:
+                            fail_count += 1
+
+                        fields = _link_fields(this_links)
+                        if "bytes" in this_meta or status == "Failure":
+                            fields[HOST_COL] = this_host
+                            fields[ELAPSED_COL] = round(this_meta.get("elapsed", 0.0), 3)
+                            fields[BYTES_COL] = this_meta.get("bytes", 0)
+                        if status == "Success" and "location" in this_meta:
+                            fields[LOCATION_COL] = this_meta["location"]
+                        if status == "Success" and "sha256" in this_meta:
+                            fields[URL_COL] = this_meta["url"]
+                            fields[ETAG_COL] = this_meta.get("etag")
+                            fields[LAST_MODIFIED_COL] = this_meta.get("last_modified")
+                            fields[CONTENT_LENGTH_COL] = this_meta.get("content_length")
+                            fields[SHA256_COL] = this_meta["sha256"]
+                        df_status = update_status(df_status, this_brnum, status, info, **fields)
+                        if manifest is not None and status == "Success" and "sha256" in this_meta:
+                            manifest.add(this_brnum, this_meta)
+                        if postprocess is not None and status == "Success" and "sha256" in this_meta:
+                            postprocess.submit(this_brnum, layout.path_for(this_brnum), this_meta["sha256"])
+                        _push_counters(update_queue, success_count, fail_count)
+                        if drain_deadline is None and time.monotonic() >= next_checkpoint:
+                            save_status_file(df_status, status_file)
+                            next_checkpoint = time.monotonic() + checkpoint_interval
+
+                        # Cancel remaining tasks if dev_mode success limit reached
+                        if dev_mode and success_count >= max_success:
+                            logger.info("Reached dev_mode max success in mid-chunk. Cancelling remaining tasks.")
+                            for f_remaining in futures_map:
+                                if not f_remaining.done():
+                                    f_remaining.cancel()
+                            limit_reached = True
+                            break
+
+                    _push_queue(update_queue, rows_pending + sum(1 for f in futures_map if not (f.running() or f.done())))
+            finally:
+                # Downloads still running after a cancellation are not waited for
+                # (once the run closes an archive layout, it refuses their files)
+                executor.shutdown(wait=drain_deadline is None, cancel_futures=True)
+
+            if drain_deadline is not None:
+                break
+            save_status_file(df_status, status_file)
+            if resolver:
+                resolver.save()
+            next_checkpoint = time.monotonic() + checkpoint_interval
+
+            if dev_mode and success_count >= max_success:
+                break
+
+        if _is_cancelled(cancel_token):
+            logger.info("Downloads cancelled. Final status file saved.")
+        else:
+            logger.info("All downloads complete. Final status file saved.")
+        save_status_file(df_status, status_file)
+        if "limiter" in attempt_options:
+            logger.info(f"Bandwidth limiter: {limiter.summary()}")
+        finished = True
+    finally:
+        # Keep the rows recorded since the last checkpoint if the run raised,
+        # and the landing pages resolved so far (also when cancelled)
+        if not finished and df_status is not None:
+            save_status_file(df_status, status_file)
+        if resolver:
+            resolver.save()
+        if prefetcher is not None:
+            prefetcher.close()
+        if parallel_reader is not None:
+            parallel_reader.close()
+        if isinstance(postprocess, PostProcessor):
+            postprocess.close(wait=finished and not _is_cancelled(cancel_token))
+            logger.info(f"Post-processing: {postprocess.summary()}")
+        if dns_cache:
+            dns_cache.uninstall()
+            logger.info(f"DNS cache: {dns_cache.summary()}")
+        if disk_monitor is not None:
+            disk_monitor.stop()
+        if layout is not None:
+            layout.close()
+        if owns_transport and transport is not None:
+            transport.close()
+        finish_profiler(profiler, profile_dir, top=profile_top)
+
+
+def run_probe(
+    xlsx_paths,
+    triage_file,
+    status_file=None,
+    workers=32,
+    update_queue=None,
+    chunk_size=1000,
+    transport=None,
+    timeout=HEAD_TIMEOUT,
+    method="range",
+    cancel_token=None,
+    dns_cache=True,
+    parallel_read=None
+):
+    """
+    Triage run: sends one lightweight request to every primary and
+    secondary link of the rows not yet attempted (per `status_file`), with
+    `workers` concurrent probes, and appends status, class (pdf, html,
+    other, oversized, dead), content type, size and latency per URL to
+    `triage_file` (see pdf_downloader.triage). Only links that are gone
+    (404/410, unknown host) are classed dead; other errors are classed
+    unknown and tried normally by the full run. The probes are spread
+    across hosts. URLs already in the table are skipped, so an
+    interrupted probe resumes.
+    `method` is 'range' (GET of the first KB, closed early) or 'head'.
+    Progress is reported as ("counters", live, dead) messages.
+    Returns {class: count} for the whole table.
+    """
 
-    # Continuously read chunks, combine, and process until no more data or dev_mode max met
-    while True:
-        if dev_mode and success_count >= max_success:
-            logger.info("Reached dev_mode success limit. Exiting.")
-            break
+    logger = logging.getLogger("PDFDownloaderLogger")
+    if not triage_file:
+        raise ValueError("A probe run needs a triage_file to write to.")
+    triage = TriageTable(triage_file)
+    df_status = load_or_create_status_file(status_file) if status_file else None
+    owns_transport = transport is None
+    if dns_cache is True:
+        dns_cache = DNSCache() if owns_transport or isinstance(transport, RequestsTransport) else False
+    if owns_transport:
+        transport = RequestsTransport(pool_size=workers)
+    if dns_cache:
+        dns_cache.install()
+    parallel_reader = None
+
+    live_count = 0
+    dead_count = 0
+    started = time.monotonic()
+    # Undone in the finally block, also when the probe raises
+    try:
+        chunk_readers, parallel_reader = _open_chunk_readers(xlsx_paths, chunk_size, parallel_read)
+        logger.info(f"Probing links from {xlsx_paths} into {triage_file} ({method}, {workers} workers)")
 
-        # Combine the next chunk from each file
-        combined_df = pd.DataFrame()
-        for gen in chunk_readers:
-            try:
-                chunk_df = next(gen)
-                combined_df = pd.concat([combined_df, chunk_df], ignore_index=True)
-            except StopIteration:
-                pass
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Probe") as executor:
+            while not _is_cancelled(cancel_token):
+                combined_df = _read_lookahead(chunk_readers, chunk_size)
+                if combined_df.empty:
+                    break
+                if BRNUM_COL not in combined_df.columns:
+                    continue
+                if parallel_reader is None:
+                    combined_df = normalize_link_columns(combined_df)
+                if df_status is not None:
+                    combined_df = exclude_already_attempted(combined_df, df_status)
+
+                # One probe per distinct URL not in the table yet
+                pending = {}
+                for brnum, primary, secondary in zip(
+                    _column_values(combined_df, BRNUM_COL),
+                    _column_values(combined_df, PRIMARY_LINK_COL),
+                    _column_values(combined_df, SECONDARY_LINK_COL)
+                ):
+                    for url in (primary, secondary):
+                        if url and url not in triage and url not in pending:
+                            pending[url] = brnum
+
+                # Spread the probes across hosts, so one host does not get
+                # all concurrent requests (and answer them with 429/503)
+                items = list(pending.items())
+                urls = iter(interleave_by_host(items, [_url_host(url) for url, _ in items]))
+                futures = {}
+                while True:
+                    while len(futures) < 2 * workers and not _is_cancelled(cancel_token):
+                        item = next(urls, None)
+                        if item is None:
+                            break
+                        url, brnum = item
+                        futures[executor.submit(probe_url, url, transport, timeout, method)] = (url, brnum)
+                    if not futures:
+                        break
+                    done, _ = wait(futures, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url, brnum = futures.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:  # one bad URL must not abort the probe
+                            logger.warning(f"[BR{brnum}] Probe of {url} failed: {e}")
+                            result = {"URL": url, "Class": UNKNOWN, "Error": f"{type(e).__name__}: {e}"}
+                        triage.add(brnum, result)
+                        if result["Class"] == "dead":
+                            dead_count += 1
+                        else:
+                            live_count += 1
+                        _push_counters(update_queue, live_count, dead_count)
+    finally:
+        if parallel_reader is not None:
+            parallel_reader.close()
+        if dns_cache:
+            dns_cache.uninstall()
+        if owns_transport:
+            transport.close()
+
+    counts = triage.counts()
+    logger.info(
+        f"Probed {live_count + dead_count} links in {time.monotonic() - started:.1f} s "
+        f"({live_count} live, {dead_count} dead). Triage table: {counts}"
+    )
+    return counts
 
-        if combined_df.empty:
-            logger.info("No more chunk data. Stopping downloads.")
-            break
 
-        combined_df = combined_df.sample(frac=1.0).reset_index(drop=True)
+def remove_stale_parts(output_folder):
+    """
+    Deletes the temp files (.{name}.{id}.part) that a crashed run, or
+    downloads abandoned after a cancellation, left anywhere under
+    `output_folder`. Call it before downloads start; a concurrent run
+    writing to the same folder would lose its files in progress.
+    Returns the number of files removed.
+    """
+
+    logger = logging.getLogger("PDFDownloaderLogger")
+    removed = 0
+    for path in Path(output_folder).rglob(f".*{PART_SUFFIX}"):
+        try:
+            path.unlink()
+            removed += 1
+        except OSError as e:
+            logger.warning(f"Failed to remove stale temp file {path}: {e}")
+    if removed:
+        logger.info(f"Removed {removed} temp files left by an earlier run.")
+    return removed
+
+
+def _upcoming_hosts(work, start, end):
+    # Hosts of the rows at schedule positions [start, end): primary, then secondary
+    for position in range(start, end):
+        row = work.scheduled(position)
+        yield work.host(row)
+        yield _url_host(work.secondary[row])
+
+
+def _apply_triage(df, triage):
+    """
+    Blanks the links of `df` that `triage` classes as dead. Returns the
+    remaining rows and [(brnum, info, (primary, secondary))] for rows that
+    had links, all dead.
+    """
 
-        # Ensure needed columns exist; skip if missing
-        if BRNUM_COL not in combined_df.columns:
-            logger.warning(f"Missing column '{BRNUM_COL}' in chunk. Skipping chunk.")
+    df = df.copy()
+    primary = list(_column_values(df, PRIMARY_LINK_COL))
+    secondary = list(_column_values(df, SECONDARY_LINK_COL))
+    brnums = _column_values(df, BRNUM_COL)
+    keep = []
+    dead_rows = []
+    for i in range(len(df)):
+        links = [url for url in (primary[i], secondary[i]) if url]
+        dead = [url for url in links if triage.is_dead(url)]
+        if links and len(dead) == len(links):
+            reasons = "; ".join(_triage_reason(triage.get(url)) for url in dead)
+            dead_rows.append((brnums[i], f"Dead link (probe): {reasons}", (primary[i], secondary[i])))
             continue
+        keep.append(i)
+        if primary[i] in dead:
+            primary[i] = None
+        if secondary[i] in dead:
+            secondary[i] = None
 
-        # Clean the link columns
-        for link_col in [PRIMARY_LINK_COL, SECONDARY_LINK_COL]:
-            if link_col in combined_df.columns:
-                combined_df[link_col] = combined_df[link_col].astype(str).str.strip()
+    if PRIMARY_LINK_COL in df.columns:
+        df[PRIMARY_LINK_COL] = primary
+    if SECONDARY_LINK_COL in df.columns:
+        df[SECONDARY_LINK_COL] = secondary
+    return df.iloc[keep].reset_index(drop=True), dead_rows
 
-        # Filter out any BRnum previously attempted
-        combined_df = exclude_already_attempted(combined_df, df_status)
-        if combined_df.empty:
-            logger.debug("All rows in this chunk were already attempted. Moving on.")
-            continue
 
-        # Concurrency for downloading each row
-        with ThreadPoolExecutor(max_workers=max_concurrent_workers, thread_name_prefix="DLWorker") as executor:
-            futures_map = {}
-            for _, row in combined_df.iterrows():
-                brnum = row.get(BRNUM_COL)
-                if not brnum:
-                    continue
-                primary_url = row.get(PRIMARY_LINK_COL)
-                secondary_url = row.get(SECONDARY_LINK_COL)
-                future = executor.submit(
-                    download_single_pdf,
-                    brnum,
-                    primary_url,
-                    secondary_url,
-                    output_folder,
-                    update_queue,
-                    max_concurrent_workers
-                )
-                futures_map[future] = brnum
-
-            # Process results as they complete
-            for future in as_completed(futures_map):
-                this_brnum = futures_map[future]
-                try:
-                    status, info = future.result()
-                except Exception as e:
-                    logger.exception(f"Unhandled error for BRnum={this_brnum}: {e}")
-                    fail_count += 1
-                    df_status = update_status(df_status, this_brnum, "Failure", str(e))
-                    _push_counters(update_queue, success_count, fail_count)
-                    save_status_file(df_status, status_file)
-                    continue
+def _triage_reason(entry):
+    return entry["Error"] or f"HTTP {entry['Status']}"
 
-                if status == "Success":
-                    success_count += 1
-                else:
-                    fail_count += 1
 
-                df_status = update_status(df_status, this_brnum, status, info)
-                _push_counters(update_queue, success_count, fail_count)
-                save_status_file(df_status, status_file)
+def count_pending_rows(xlsx_paths, df_status, statuses=("Success", "Failure")):
+    """
+    Estimates the rows this run will process without reading the cells:
+    the row counts from the workbooks' metadata (see count_xlsx_rows),
+    minus the BRnums in `df_status` with one of `statuses`.
+    Returns None if a workbook could not be counted.
+    """
 
-                # Cancel remaining tasks if dev_mode success limit reached
-                if dev_mode and success_count >= max_success:
-                    logger.info("Reached dev_mode max success in mid-chunk. Cancelling remaining tasks.")
-                    for f_remaining in futures_map:
-                        if not f_remaining.done():
-                            f_remaining.cancel()
-                    break
+    from utils.xlsx_chunk_reader import count_xlsx_rows
+
+    logger = logging.getLogger("PDFDownloaderLogger")
+    started = time.perf_counter()
+    counts = [count_xlsx_rows(path) for path in xlsx_paths]
+    if any(count is None for count in counts):
+        return None
+
+    attempted = df_status.loc[df_status["Status"].isin(list(statuses)), "BRnum"].nunique()
+    pending = max(0, sum(counts) - attempted)
+    logger.info(
+        f"Pre-scan: {sum(counts)} rows in {len(counts)} workbooks, {attempted} already attempted, "
+        f"{pending} to process ({(time.perf_counter() - started) * 1000:.0f} ms)"
+    )
+    return pending
 
-        save_status_file(df_status, status_file)
 
-        if dev_mode and success_count >= max_success:
+def _is_cancelled(cancel_token):
+    return cancel_token is not None and cancel_token.cancelled
+
+
+def _open_chunk_readers(xlsx_paths, chunk_size, parallel_read=None):
+    """
+    Returns (chunk generators, one per path; the ParallelXlsxReader or
+    None). With `parallel_read` (default: more than one path) the chunks
+    come from parser processes, with normalize_link_columns applied.
+    """
+
+    if parallel_read is None:
+        parallel_read = len(xlsx_paths) > 1
+    if parallel_read:
+        from utils.xlsx_parallel_reader import ParallelXlsxReader
+        reader = ParallelXlsxReader(xlsx_paths, chunk_size=chunk_size, transform=normalize_link_columns).start()
+        return reader.readers(), reader
+
+    from utils.xlsx_chunk_reader import read_xlsx_in_chunks
+    return [read_xlsx_in_chunks(path, chunk_size=chunk_size) for path in xlsx_paths], None
+
+
+def _read_lookahead(chunk_readers, lookahead_rows):
+    """
+    Reads chunks round-robin from all readers until at least
+    `lookahead_rows` rows are collected or every reader is exhausted.
+    Returns one combined DataFrame (empty when there is no more data).
+    """
+
+    import pandas as pd
+
+    frames = []
+    pending_rows = 0
+    while pending_rows < lookahead_rows:
+        got_chunk = False
+        for gen in chunk_readers:
+            try:
+                chunk_df = next(gen)
+            except StopIteration:
+                continue
+            frames.append(chunk_df)
+            pending_rows += len(chunk_df)
+            got_chunk = True
+        if not got_chunk:
             break
 
-    logger.info("All downloads complete. Final status file saved.")
-    save_status_file(df_status, status_file)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
 
 
 # ---------------------
@@ -153,31 +866,131 @@ def run_downloader(
 def download_single_pdf(
     brnum, primary_url, secondary_url, output_folder,
     update_queue=None,
-    max_workers=3
+    max_workers=3,
+    meta=None,
+    layout=None,
+    content_store=None,
+    revalidate=None,
+    cancel_token=None,
+    landing_page_resolver=None,
+    replace=False,
+    **attempt_options
 ):
     """
     Tries a primary PDF link; if that fails, tries secondary.
+    The PDF is placed according to `layout` (default: flat in output_folder),
+    and nothing is downloaded if the layout already holds it. With a
+    `content_store`, duplicates are hardlinked to an already stored copy.
+    If `meta` is a dict, it receives the downloaded 'bytes', the final
+    'location' and the 'elapsed' seconds for the whole call, plus the
+    'url', 'size', 'sha256' and 'pages' of a fresh download and whether
+    it was a 'duplicate', and the response's 'etag', 'last_modified' and
+    'content_length'.
+
+    If `revalidate` is a dict of validators (see _load_validators) and the
+    PDF is already stored, it is re-fetched conditionally instead of skipped;
+    meta['not_modified'] is set when the stored copy is still current.
+
+    With `replace=True` (the row's links changed since it was stored), the
+    links are downloaded even if a PDF is stored. The stored copy is only
+    replaced on success; if both links fail it is kept, and the row still
+    counts as a success. Archive layouts cannot replace a member, so there
+    `replace` and `revalidate` are ignored and a stored PDF is kept.
+
+    If `cancel_token` is cancelled, the running attempt is aborted, the
+    secondary link is not tried and ("Cancelled", reason) is returned.
+
+    With a `landing_page_resolver` (pdf_downloader.landing_page), an HTML
+    page behind the secondary link is scanned for PDF links, and the best
+    candidates are tried (see _attempt_landing_page).
+
+    Remaining keyword arguments (`attempt_options`, e.g. head_timeout,
+    get_timeout, transport and limiter) are passed on to every attempt_download call.
+    `max_workers` is no longer used; worker IDs come from the thread name.
     Returns (status, info).
     """
 
+    if layout is None:
+        layout = FlatLayout(output_folder)
+
+    if cancel_token is not None:
+        attempt_options["cancel_token"] = cancel_token
+    if not layout.keeps_files:
+        # A second archive member would not supersede the first
+        replace = False
+        revalidate = None
+
+    started = time.monotonic()
+    stored = layout.locate(brnum) if replace else None
+    try:
+        status, info = _download_single_pdf(
+            brnum, primary_url, secondary_url, layout,
+            update_queue, meta, content_store, revalidate,
+            landing_page_resolver, replace, attempt_options
+        )
+        if stored and status == "Failure":
+            if meta is not None:
+                meta["location"] = stored
+            return ("Success", f"Links changed but failed, kept stored copy at {stored}: {info}")
+        return (status, info)
+    finally:
+        if meta is not None:
+            meta["elapsed"] = time.monotonic() - started
+
+
+def _download_single_pdf(
+    brnum, primary_url, secondary_url, layout,
+    update_queue, meta, content_store, revalidate,
+    resolver, replace, attempt_options
+):
+    """
+    Body of download_single_pdf (see there).
+    """
+
     logger = logging.getLogger("PDFDownloaderLogger")
     tname = threading.current_thread().name
-    worker_id = parse_thread_name_to_id(tname, max_workers=max_workers)
+    worker_id = parse_thread_name_to_id(tname)
+
+    # 0) Already stored by an earlier run (e.g. the status file was reset)?
+    location = layout.locate(brnum) if not replace else None
+    if location and revalidate is not None:
+        return _revalidate_stored(
+            brnum, primary_url, secondary_url, layout, location, revalidate,
+            update_queue, worker_id, meta, content_store, attempt_options
+        )
+    if location:
+        logger.info(f"[BR{brnum}] Already stored at {location}. Skipping download.")
+        if meta is not None:
+            meta["location"] = location
+        return ("Success", f"Already stored at {location}")
+    file_path = layout.path_for(brnum)
 
     # 1) Attempt primary URL
+    primary_url = normalize_url(primary_url)
+    secondary_url = normalize_url(secondary_url)
+
     primary_status, primary_info = None, None
-    if primary_url and primary_url.lower().startswith(("http://", "https://")):
-        _push_thread_update(update_queue, worker_id, f"Attempting {brnum} (primary)", 0)
+    if primary_url:
+        _push_thread_update(
+            update_queue, worker_id, f"Attempting {brnum} (primary)", 0,
+            brnum=brnum, host=_url_host(primary_url), phase="connecting"
+        )
         pstat, pinfo = attempt_download(
-            file_path=Path(output_folder) / f"{brnum}.pdf",
+            file_path=file_path,
             url=primary_url,
             brnum=brnum,
-            update_queue=update_queue
+            update_queue=update_queue,
+            meta=meta,
+            **attempt_options
         )
         if pstat == "Success":
+            _store_download(layout, brnum, file_path, meta, content_store)
             _push_thread_update(update_queue, worker_id, f"{brnum} => SUCCESS", 100)
             _push_thread_update(update_queue, worker_id, "Idle", 0)
             return ("Success", "Primary link OK")
+        elif pstat == "Cancelled":
+            _push_thread_update(update_queue, worker_id, "Idle", 0)
+            return (pstat, pinfo)
         else:
             primary_status, primary_info = pstat, pinfo
             logger.warning(f"Primary link failed for {brnum}, reason={pinfo}")
@@ -189,18 +1002,29 @@ def download_single_pdf(
 
     # 2) Attempt secondary URL
     secondary_status, secondary_info = None, None
-    if secondary_url and secondary_url.lower().startswith(("http://", "https://")):
-        _push_thread_update(update_queue, worker_id, f"Attempting {brnum} (secondary)", 0)
-        sstat, sinfo = attempt_download(
-            file_path=Path(output_folder) / f"{brnum}.pdf",
+    if secondary_url:
+        _push_thread_update(
+            update_queue, worker_id, f"Attempting {brnum} (secondary)", 0,
+            brnum=brnum, host=_url_host(secondary_url),
+            phase="retrying" if primary_url else "connecting"
+        )
+        sstat, sinfo = _attempt_landing_page(
+            file_path=file_path,
             url=secondary_url,
             brnum=brnum,
-            update_queue=update_queue
+            update_queue=update_queue,
+            meta=meta,
+            resolver=resolver,
+            attempt_options=attempt_options
         )
         if sstat == "Success":
+            _store_download(layout, brnum, file_path, meta, content_store)
             _push_thread_update(update_queue, worker_id, f"{brnum} => SUCCESS (secondary)", 100)
             _push_thread_update(update_queue, worker_id, "Idle", 0)
             return ("Success", f"Secondary link OK; primary failed: {primary_info}")
+        elif sstat == "Cancelled":
+            _push_thread_update(update_queue, worker_id, "Idle", 0)
+            return (sstat, sinfo)
         else:
             secondary_status, secondary_info = sstat, sinfo
             logger.warning(f"Secondary link failed for {brnum}, reason={sinfo}")
@@ -221,55 +1045,194 @@ def download_single_pdf(
     return (final_status, final_info)
 
 
+def _revalidate_stored(
+    brnum, primary_url, secondary_url, layout, location, validators,
+    update_queue, worker_id, meta, content_store, attempt_options
+):
+    """
+    Conditionally re-fetches an already stored PDF from the URL it was
+    downloaded from (or the primary/secondary link for older status rows).
+    The stored copy is only replaced if the server sends changed content,
+    and it is kept if the request fails. Returns (status, info).
+    """
+
+    logger = logging.getLogger("PDFDownloaderLogger")
+    url = normalize_url(validators.get("url")) or normalize_url(primary_url) or normalize_url(secondary_url)
+    if meta is not None:
+        meta["location"] = location
+    if not url:
+        return ("Success", f"Kept stored copy at {location}; no URL to revalidate")
+
+    _push_thread_update(
+        update_queue, worker_id, f"Revalidating {brnum}", 0,
+        brnum=brnum, host=_url_host(url), phase="connecting"
+    )
+    file_path = layout.path_for(brnum)
+    stat, info = attempt_download(
+        file_path=file_path,
+        url=url,
+        brnum=brnum,
+        update_queue=update_queue,
+        meta=meta,
+        validators=validators,
+        **attempt_options
+    )
+    _push_thread_update(update_queue, worker_id, "Idle", 0)
+
+    if stat == "Success":
+        _store_download(layout, brnum, file_path, meta, content_store)
+        return ("Success", "Updated; content changed since last download")
+    if stat == "NotModified":
+        if meta is not None:
+            meta["not_modified"] = True
+        return ("Success", f"Not modified; {info}")
+    if stat == "Cancelled":
+        return (stat, info)
+
+    logger.warning(f"Revalidation failed for {brnum}, keeping stored copy. Reason={info}")
+    return ("Success", f"Revalidation failed, kept stored copy: {info}")
+
+
+def _attempt_landing_page(file_path, url, brnum, update_queue, meta, resolver, attempt_options):
+    """
+    attempt_download for a link that may be an HTML landing page. A PDF
+    URL confirmed for this page by an earlier attempt (or run) is fetched
+    directly; otherwise, if the page turns out to be HTML, its best
+    candidate links are tried in order. Returns (status, info).
+    """
+
+    logger = logging.getLogger("PDFDownloaderLogger")
+    if resolver is None:
+        return attempt_download(file_path, url, brnum, update_queue=update_queue, meta=meta, **attempt_options)
+
+    known_pdf = resolver.lookup(url)
+    if known_pdf:
+        stat, info = attempt_download(file_path, known_pdf, brnum, update_queue=update_queue, meta=meta, **attempt_options)
+        if stat in ("Success", "Cancelled"):
+            return (stat, info if stat == "Cancelled" else f"Landing page resolved (cached) to {known_pdf}")
+        logger.info(f"[BR{brnum}] Cached PDF link {known_pdf} failed ({info}); rescanning {url}")
+        resolver.forget(url)
+
+    stat, info = attempt_download(
+        file_path, url, brnum, update_queue=update_queue, meta=meta, resolver=resolver, **attempt_options
+    )
+    if stat != "LandingPage":
+        return (stat, info)
+
+    reasons = []
+    for candidate in resolver.candidates(url):
+        cstat, cinfo = attempt_download(file_path, candidate, brnum, update_queue=update_queue, meta=meta, **attempt_options)
+        if cstat == "Success":
+            resolver.confirm(url, candidate)
+            logger.info(f"[BR{brnum}] Landing page {url} resolved to {candidate}")
+            return ("Success", f"Landing page resolved to {candidate}")
+        if cstat == "Cancelled":
+            return (cstat, cinfo)
+        reasons.append(f"{candidate}: {cinfo}")
+    return ("Failure", f"{info}; no candidate was a valid PDF ({'; '.join(reasons)})")
+
+
+def _store_download(layout, brnum, file_path, meta, content_store=None):
+    """
+    Hands a validated download to the layout (and content store, if any)
+    and records its location in `meta`.
+    """
+    duplicate = False
+    sha256 = meta.get("sha256") if meta is not None else None
+    if content_store is not None and layout.keeps_files and sha256:
+        duplicate = content_store.add(file_path, sha256)
+
+    location = layout.store(brnum, file_path)
+    if meta is not None:
+        meta["location"] = location
+        meta["duplicate"] = duplicate
+
+
 # ---------------------
 # Attempt Single Download
 # ---------------------
-def attempt_download(file_path, url, brnum, update_queue=None, thread_id="???"):
+def attempt_download(
+    file_path, url, brnum, update_queue=None, thread_id="???", meta=None, validators=None,
+    head_timeout=HEAD_TIMEOUT, get_timeout=GET_TIMEOUT, cancel_token=None, trace=None, transport=None,
+    limiter=None, resolver=None
+):
     """
     Download the PDF from `url` to `file_path` with checks:
       - Malformed URL
-      - Sufficient disk space
       - HEAD request (warn if fail)
-      - GET request (streamed)
+      - GET request (streamed into a temp file next to `file_path`)
       - Check PDF signature
       - Validate file with PyPDF2
+    The temp file replaces `file_path` only after it passed validation.
+    With `validators` ({'etag', 'last_modified', 'sha256'}) the GET is
+    conditional and the HEAD request is skipped; a 304 response or an
+    unchanged SHA-256 returns ("NotModified", reason) and leaves
+    `file_path` untouched.
+    Free disk space is watched by run_downloader's DiskSpaceMonitor.
+    If `cancel_token` is cancelled, the request is not started, or the
+    streamed read is interrupted (its socket is shut down), the temp file
+    is deleted and ("Cancelled", reason) is returned.
+    With a `trace` (pdf_downloader.trace.TraceRecorder), the timing, status,
+    redirects, headers and size of the HEAD and GET requests are recorded.
+    Requests are sent with `transport` (pdf_downloader.transport), by
+    default the shared RequestsTransport.
+    With a `limiter` (utils.bandwidth_limiter.BandwidthLimiter), every
+    received chunk waits for its share of the global and per-host rates.
+    With a `resolver` (pdf_downloader.landing_page.LandingPageResolver), an
+    HTML response is scanned for PDF links (up to resolver.scan_bytes) and
+    ("LandingPage", reason) is returned if any were found; the candidates
+    are then available from resolver.candidates(url).
+    If `meta` is a dict, the number of received bytes is added to meta['bytes'],
+    and on success the 'url', 'size', 'sha256', 'pages', 'etag',
+    'last_modified' and 'content_length' are set. The hash
+    is computed while streaming, so the file is never read twice for it.
     Returns ("Success", "") or ("Failure", reason).
     """
 
+    import requests
+
     logger = logging.getLogger("PDFDownloaderLogger")
     tname = threading.current_thread().name
-    worker_id = parse_thread_name_to_id(tname, max_workers=3)
+    worker_id = parse_thread_name_to_id(tname)
 
     # Basic sanity check on URL
     if not isinstance(url, str):
         return ("Failure", f"URL has invalid type: {type(url).__name__}.")
 
-    import re
-    url = re.sub(r"[\u200B-\u200F\uFEFF]", "", url.strip())  # remove zero-width chars
-
-    if not url.lower().startswith(("http://", "https://")):
+    url = normalize_url(url)
+    if url is None:
         return ("Failure", "URL is missing http/https protocol or malformed.")
 
-    # Check disk space
-    try:
-        disk_usage = shutil.disk_usage(file_path.parent)
-        free_space_mb = disk_usage.free / (1024 * 1024)
-        if free_space_mb < 5:
-            logger.warning(f"[BR{brnum}] Low disk space ({free_space_mb:.2f} MB).")
-            return ("Failure", "Insufficient disk space.")
-    except Exception as e:
-        logger.warning(f"[BR{brnum}] Could not check disk space: {e}")
-        return ("Failure", f"Disk space check error: {e}")
+    if _is_cancelled(cancel_token):
+        return ("Cancelled", cancel_token.reason)
+    if transport is None:
+        transport = default_transport()
+
+    # Conditional request headers when revalidating a stored copy
+    request_headers = {}
+    if validators:
+        if validators.get("etag"):
+            request_headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            request_headers["If-Modified-Since"] = validators["last_modified"]
 
-    # HEAD request (non-fatal if fails)
+    # HEAD request (non-fatal if fails; not needed when revalidating)
     head_ok = False
     head_resp = None
-    try:
-        head_resp = requests.head(url, timeout=30, allow_redirects=True)
-        head_resp.raise_for_status()
-        head_ok = True
-    except requests.exceptions.RequestException as e:
-        logger.warning(f"[BR{brnum}] HEAD request warning (non-fatal): {e}")
+    if validators is None:
+        head_trace = trace.start(brnum, "HEAD", url) if trace else None
+        head_error = None
+        try:
+            head_resp = transport.head(url, timeout=head_timeout)
+            if head_trace:
+                head_trace.response(head_resp)
+            head_resp.raise_for_status()
+            head_ok = True
+        except requests.exceptions.RequestException as e:
+            head_error = e
+            logger.warning(f"[BR{brnum}] HEAD request warning (non-fatal): {e}")
+        if head_trace:
+            head_trace.finish(error=head_error)
 
     if head_ok and head_resp is not None:
         content_type = head_resp.headers.get("Content-Type", "").lower()
@@ -282,67 +1245,232 @@ def attempt_download(file_path, url, brnum, update_queue=None, thread_id="???"):
                     logger.warning(f"[BR{brnum}] HEAD indicates a very small file.")
             except ValueError:
                 pass
-    else:
+    elif validators is None:
         logger.warning(f"[BR{brnum}] HEAD check skipped. Proceeding with GET.")
 
+    if _is_cancelled(cancel_token):
+        return ("Cancelled", cancel_token.reason)
+
     # GET request (streamed)
+    get_trace = trace.start(brnum, "GET", url) if trace else None
     try:
-        resp = requests.get(url, timeout=60, stream=True)
+        resp = transport.get(url, timeout=get_timeout, headers=request_headers or None)
+        if get_trace:
+            get_trace.response(resp)
         resp.raise_for_status()
     except requests.exceptions.RequestException as e:
+        if get_trace:
+            get_trace.finish(error=e)
         return ("Failure", f"GET request error: {e}")
 
-    # Write to file, checking PDF signature in the first chunk
+    if resp.status_code == 304:
+        resp.close()
+        if get_trace:
+            get_trace.finish()
+        logger.info(f"[BR{brnum}] Not modified since last download (304).")
+        return ("NotModified", "Server returned 304 Not Modified.")
+
+    host = _url_host(url) if limiter is not None else None
+
+    # Write to a temp file, checking PDF signature in the first chunk.
+    # Only a validated file is renamed to `file_path`, so an interrupted run
+    # never leaves a half-written PDF that looks real (its temp file is
+    # removed by the next run, see remove_stale_parts).
+    tmp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex[:8]}{PART_SUFFIX}")
     downloaded = 0
     chunk_size = 1024
     wrote_first_chunk = False
+    hasher = hashlib.sha256()
+    last_progress = 0.0
+    stream_error = None
+
+    # Expected size for the progress bar, from HEAD if it was usable
+    total_size = None
+    if head_ok and head_resp is not None and "Content-Length" in head_resp.headers:
+        try:
+            total_size = int(head_resp.headers["Content-Length"]) or None
+        except ValueError:
+            logger.warning(f"[BR{brnum}] Invalid Content-Length in HEAD response.")
+
+    # A cancellation shuts the socket down, so a read blocked on a slow
+    # server returns at once instead of after `get_timeout`
+    abort_guard = cancel_token.on_cancel(lambda: transport.abort(resp)) if cancel_token else nullcontext()
 
     try:
-        with open(file_path, "wb") as f:
-            for chunk in resp.iter_content(chunk_size=chunk_size):
-                if not chunk:
-                    continue
-                if not wrote_first_chunk:
-                    wrote_first_chunk = True
-                    if b"%PDF-" not in chunk[:20]:
-                        logger.warning(f"[BR{brnum}] First chunk missing %PDF- signature.")
-                        file_path.unlink(missing_ok=True)
-                        return ("Failure", "No %PDF- signature in the initial data.")
-                f.write(chunk)
-                downloaded += len(chunk)
-
-                # Update UI progress if we got Content-Length from HEAD
-                if head_ok and head_resp and "Content-Length" in head_resp.headers:
-                    try:
-                        total_size = int(head_resp.headers["Content-Length"])
-                        if total_size > 0:
-                            percent = int(downloaded * 100 / total_size)
-                            _push_thread_update(update_queue, worker_id, f"Downloading {brnum}", percent)
-                    except ValueError:
-                        logger.warning(f"[BR{brnum}] Invalid Content-Length in HEAD response.")
-
-    except OSError as e:
-        return ("Failure", f"File write error: {e}")
-
-    # Check file size
-    if file_path.stat().st_size == 0:
-        return ("Failure", "Downloaded file is zero bytes.")
-
-    # Validate PDF structure with PyPDF2
-    try:
-        import PyPDF2
-        with open(file_path, "rb") as pdf_file:
-            reader = PyPDF2.PdfReader(pdf_file)
-            _ = len(reader.pages)  # triggers PDF parsing
-    except Exception as e:
-        file_path.unlink(missing_ok=True)
-        logger.warning(f"[BR{brnum}] PyPDF2 parse error: {e}")
-        return ("Failure", f"PyPDF2 parse error: {e}")
+        try:
+            with abort_guard, open(tmp_path, "wb") as f:
+                chunks = resp.iter_content(chunk_size=chunk_size)
+                for chunk in chunks:
+                    if _is_cancelled(cancel_token):
+                        return ("Cancelled", cancel_token.reason)
+                    if not chunk:
+                        continue
+                    if get_trace:
+                        get_trace.add_bytes(len(chunk))
+                    if not wrote_first_chunk:
+                        wrote_first_chunk = True
+                        if get_trace:
+                            get_trace.data["pdf"] = b"%PDF-" in chunk[:20]
+                        if b"%PDF-" not in chunk[:20] and resolver is not None \
+                                and looks_like_html(resp.headers.get("Content-Type"), chunk):
+                            if resolver.scan(url, chunk, chunks, base_url=resp.url):
+                                return ("LandingPage", "Landing page instead of a PDF.")
+                            return ("Failure", "Landing page without PDF links.")
+                        if b"%PDF-" not in chunk[:20]:
+                            logger.warning(f"[BR{brnum}] First chunk missing %PDF- signature.")
+                            return ("Failure", "No %PDF- signature in the initial data.")
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    downloaded += len(chunk)
+                    if limiter is not None:
+                        limiter.throttle(len(chunk), host, cancel_token)
+                    if meta is not None:
+                        meta["bytes"] = meta.get("bytes", 0) + len(chunk)
+
+                    # Update UI progress, at most every PROGRESS_INTERVAL seconds
+                    now = time.monotonic()
+                    if update_queue and now - last_progress >= PROGRESS_INTERVAL:
+                        last_progress = now
+                        _push_download_progress(update_queue, worker_id, brnum, downloaded, total_size)
+
+            if update_queue and downloaded:
+                _push_download_progress(update_queue, worker_id, brnum, downloaded, total_size)
+
+        except (OSError, requests.exceptions.RequestException) as e:
+            stream_error = e
+            if _is_cancelled(cancel_token):
+                return ("Cancelled", cancel_token.reason)
+            return ("Failure", f"File write error: {e}")
+
+        # Check file size
+        if downloaded == 0:
+            return ("Failure", "Downloaded file is zero bytes.")
+
+        # Validate PDF structure with PyPDF2
+        try:
+            import PyPDF2
+            with open(tmp_path, "rb") as pdf_file:
+                reader = PyPDF2.PdfReader(pdf_file)
+                page_count = len(reader.pages)  # triggers PDF parsing
+        except Exception as e:
+            logger.warning(f"[BR{brnum}] PyPDF2 parse error: {e}")
+            return ("Failure", f"PyPDF2 parse error: {e}")
+
+        sha256 = hasher.hexdigest()
+        if validators and validators.get("sha256") == sha256:
+            logger.info(f"[BR{brnum}] Content unchanged since last download.")
+            return ("NotModified", "Content unchanged (same SHA-256).")
+
+        try:
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            return ("Failure", f"File write error: {e}")
+
+        if meta is not None:
+            meta.update(
+                url=url,
+                size=downloaded,
+                sha256=sha256,
+                pages=page_count,
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+                content_length=resp.headers.get("Content-Length")
+            )
+    finally:
+        resp.close()
+        tmp_path.unlink(missing_ok=True)
+        if get_trace:
+            get_trace.finish(error=stream_error)
 
     logger.info(f"[BR{brnum}] Successfully downloaded -> {file_path.name}")
     return ("Success", "")
 
 
+# ---------------------
+# URL Normalization
+# ---------------------
+def normalize_link_columns(df):
+    """
+    Cleans the link columns of a chunk in one vectorized pass:
+      - Removes zero-width characters and surrounding whitespace.
+      - Percent-encodes inner whitespace.
+      - Adds 'http://' to URLs that start with a bare host name.
+      - Turns 'nan'/'None'/empty and non-http(s) values into missing values.
+    Also adds a lower-cased HOST_COL taken from the primary link, falling
+    back to the secondary link. Returns the updated DataFrame.
+    """
+
+    import pandas as pd
+
+    df = df.copy()
+    hosts = pd.Series(pd.NA, index=df.index, dtype="string")
+
+    for link_col in [PRIMARY_LINK_COL, SECONDARY_LINK_COL]:
+        if link_col not in df.columns:
+            continue
+
+        urls = df[link_col].astype("string")
+        urls = urls.str.replace(_ZERO_WIDTH_PATTERN, "", regex=True).str.strip()
+        urls = urls.str.replace(_INNER_SPACE_PATTERN, "%20", regex=True)
+        urls = urls.mask(urls.str.lower().isin(_NULL_URL_STRINGS))
+
+        has_scheme = urls.str.contains(_SCHEME_PATTERN, case=False, regex=True).fillna(False)
+        bare_host = urls.str.contains(_BARE_HOST_PATTERN, case=False, regex=True).fillna(False)
+        repaired = "http://" + urls.str.lstrip("/")
+        urls = urls.mask(~has_scheme & bare_host, repaired)
+
+        is_http = urls.str.contains(_HTTP_URL_PATTERN, case=False, regex=True).fillna(False)
+        urls = urls.where(is_http)
+
+        df[link_col] = urls
+        hosts = hosts.fillna(urls.str.extract(_HOST_PATTERN, flags=re.IGNORECASE, expand=False).str.lower())
+
+    df[HOST_COL] = hosts
+    return df
+
+
+def normalize_url(url):
+    """
+    Per-URL counterpart of normalize_link_columns, for URLs that did not
+    come through a chunk (e.g. direct calls to download_single_pdf).
+    Returns the cleaned URL, or None if it is missing or not http(s).
+    """
+
+    if not isinstance(url, str):
+        return None
+
+    url = _ZERO_WIDTH_RE.sub("", url).strip()
+    url = _INNER_SPACE_RE.sub("%20", url)
+    if url.lower() in _NULL_URL_STRINGS:
+        return None
+
+    if not _SCHEME_RE.match(url) and _BARE_HOST_RE.match(url):
+        url = "http://" + url.lstrip("/")
+
+    if not _HTTP_URL_RE.match(url):
+        return None
+    return url
+
+
+def _url_host(url):
+    """
+    Returns the lower-cased host of an http(s) URL, or None.
+    """
+    match = _HOST_RE.match(url) if url else None
+    return match.group(1).lower() if match else None
+
+
+def _column_values(df, col):
+    """
+    Returns the values of `col` as a plain object array with None for
+    missing values, or a list of None if the column does not exist.
+    """
+    if col not in df.columns:
+        return [None] * len(df)
+    values = df[col].astype(object)
+    return values.where(values.notna(), None).to_numpy()
+
+
 # ---------------------
 # Failure Info Combining
 # ---------------------
@@ -390,17 +1518,23 @@ def combine_failure_info(
 # ---------------------
 def load_or_create_status_file(status_file):
     """
-    Reads or creates a status file (BRnum, Status, Info).
+    Reads or creates a status file (BRnum, Status, Info), Excel or CSV
+    (by extension, see save_status_file).
     Returns a pandas DataFrame.
     """
 
+    import pandas as pd
+
     logger = logging.getLogger("PDFDownloaderLogger")
     if not os.path.isfile(status_file):
         logger.info(f"Status file not found. Creating: {status_file}")
         return pd.DataFrame(columns=["BRnum", "Status", "Info"])
 
     try:
-        df = pd.read_excel(status_file)
+        if _is_csv(status_file):
+            df = pd.read_csv(status_file, dtype={"BRnum": object})
+        else:
+            df = pd.read_excel(status_file)
         required_cols = {"BRnum", "Status", "Info"}
         if not required_cols.issubset(df.columns):
             logger.warning(f"Status file missing columns. Recreating.")
@@ -411,61 +1545,195 @@ def load_or_create_status_file(status_file):
         return pd.DataFrame(columns=["BRnum", "Status", "Info"])
 
 
-def exclude_already_attempted(full_df, df_status):
+def exclude_already_attempted(full_df, df_status, statuses=("Success", "Failure")):
     """
-    Removes rows where BRnum is already 'Success' or 'Failure' in df_status.
+    Removes rows where BRnum already has one of `statuses` in df_status.
     Returns filtered DataFrame.
     """
 
     logger = logging.getLogger("PDFDownloaderLogger")
-    attempted = df_status[df_status["Status"].isin(["Success", "Failure"])]["BRnum"].unique()
+    attempted = df_status[df_status["Status"].isin(list(statuses))]["BRnum"].unique()
     filtered_df = full_df[~full_df[BRNUM_COL].isin(attempted)]
     removed_count = len(full_df) - len(filtered_df)
     logger.info(f"Skipping {removed_count} rows already attempted.")
     return filtered_df
 
 
-def update_status(df_status, brnum, new_status, info):
+def diff_against_status(full_df, df_status, statuses=("Success", "Failure")):
+    """
+    Compares the (normalized) rows of `full_df` with the rows of df_status
+    that have one of `statuses`, by BRnum:
+      - new:       BRnum not attempted yet
+      - changed:   attempted with other links than the row has now
+      - unchanged: attempted with the same links, or recorded before the
+                   links were kept (PRIMARY_ATTEMPTED_COL missing or empty)
+    Returns (the new and changed rows, set of changed BRnums).
+    """
+
+    import pandas as pd
+
+    logger = logging.getLogger("PDFDownloaderLogger")
+    attempted = df_status[df_status["Status"].isin(list(statuses))].drop_duplicates("BRnum", keep="last")
+    attempted = attempted.set_index("BRnum")
+    seen = full_df[BRNUM_COL].isin(attempted.index)
+
+    changed_mask = pd.Series(False, index=full_df.index)
+    if PRIMARY_ATTEMPTED_COL in attempted.columns and seen.any():
+        brnums = full_df.loc[seen, BRNUM_COL]
+        recorded = attempted[PRIMARY_ATTEMPTED_COL].notna() | attempted[SECONDARY_ATTEMPTED_COL].notna()
+        for link_col, attempted_col in ((PRIMARY_LINK_COL, PRIMARY_ATTEMPTED_COL),
+                                        (SECONDARY_LINK_COL, SECONDARY_ATTEMPTED_COL)):
+            current = _link_keys(full_df.loc[seen, link_col] if link_col in full_df.columns else None, brnums)
+            before = _link_keys(brnums.map(attempted[attempted_col]), brnums)
+            differs = (current != before) & brnums.map(recorded).fillna(False).astype(bool)
+            changed_mask.loc[seen] = changed_mask.loc[seen] | differs
+
+    result = full_df[~seen | changed_mask]
+    changed = set(full_df.loc[changed_mask, BRNUM_COL])
+    logger.info(
+        f"Delta: {int((~seen).sum())} new, {len(changed)} with changed links, "
+        f"{int(seen.sum()) - len(changed)} unchanged rows skipped."
+    )
+    return result, changed
+
+
+def _link_keys(values, like):
+    # Links as comparable strings ('' for missing), indexed like `like`
+    import pandas as pd
+    if values is None:
+        return pd.Series("", index=like.index)
+    values = values.astype(object).where(values.notna(), "").astype(str)
+    return values.where(values != MISSING_LINK, "")
+
+
+def _link_fields(links):
+    """
+    Status fields recording the links a row was attempted with.
+    """
+    primary_url, secondary_url = links
+    return {
+        PRIMARY_ATTEMPTED_COL: primary_url or MISSING_LINK,
+        SECONDARY_ATTEMPTED_COL: secondary_url or MISSING_LINK
+    }
+
+
+def _load_validators(df_status):
+    """
+    Returns {BRnum: {'url', 'etag', 'last_modified', 'sha256'}} for every
+    successful row in df_status, for conditional revalidation. Values that
+    were never recorded are None.
+    """
+
+    success = df_status[df_status["Status"] == "Success"]
+    columns = {
+        "url": URL_COL,
+        "etag": ETAG_COL,
+        "last_modified": LAST_MODIFIED_COL,
+        "sha256": SHA256_COL,
+    }
+    values = {key: _column_values(success, col) for key, col in columns.items()}
+
+    validators = {}
+    for i, brnum in enumerate(_column_values(success, BRNUM_COL)):
+        validators[brnum] = {key: values[key][i] for key in columns}
+    return validators
+
+
+def _load_host_history(df_status):
+    """
+    Builds a HostHistory from the rows of df_status that have a host and
+    elapsed time (recorded since these columns were added).
+    """
+    if HOST_COL not in df_status.columns or ELAPSED_COL not in df_status.columns:
+        return HostHistory()
+    return HostHistory.from_rows(
+        _column_values(df_status, HOST_COL),
+        _column_values(df_status, "Status"),
+        _column_values(df_status, ELAPSED_COL),
+        _column_values(df_status, BYTES_COL)
+    )
+
+
+def update_status(df_status, brnum, new_status, info, **fields):
     """
     Updates or appends a row for BRnum with (Status, Info).
+    Extra `fields` (e.g. Location=...) are stored in columns of the same
+    name, which are added to the status file when first used.
     Returns updated df_status.
     """
 
+    import pandas as pd
+
     logger = logging.getLogger("PDFDownloaderLogger")
     mask = (df_status["BRnum"] == brnum)
     if mask.any():
         logger.debug(f"Updating existing row: BRnum={brnum}, {new_status}, {info}")
-        df_status.loc[mask, "Status"] = new_status
-        df_status.loc[mask, "Info"] = info
+        for col, value in {"Status": new_status, "Info": info, **fields}.items():
+            if col not in df_status.columns:
+                df_status[col] = pd.Series(pd.NA, index=df_status.index, dtype=object)
+            elif df_status[col].dtype != object:
+                # Columns read back from Excel may be numeric (e.g. all empty)
+                df_status[col] = df_status[col].astype(object)
+            df_status.loc[mask, col] = value
     else:
         logger.debug(f"Appending new row: BRnum={brnum}, {new_status}, {info}")
-        new_row = pd.DataFrame([{"BRnum": brnum, "Status": new_status, "Info": info}])
+        new_row = pd.DataFrame([{"BRnum": brnum, "Status": new_status, "Info": info, **fields}])
         df_status = pd.concat([df_status, new_row], ignore_index=True)
     return df_status
 
 
 def save_status_file(df_status, status_file):
     """
-    Saves the DataFrame to an Excel status file.
+    Saves the DataFrame to the status file: Excel, or CSV if the name ends
+    in '.csv'. The whole file is rewritten on every checkpoint (see
+    run_downloader's `checkpoint_interval`), and writing an .xlsx file
+    costs far more per row than CSV, so large jobs should use a CSV
+    status file. CSV is written to a temp file first, so
+    a crash never leaves it half-written.
     """
 
     logger = logging.getLogger("PDFDownloaderLogger")
     try:
-        df_status.to_excel(status_file, index=False)
+        if _is_csv(status_file):
+            tmp_path = f"{status_file}.tmp"
+            df_status.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, status_file)
+        else:
+            df_status.to_excel(status_file, index=False)
         logger.debug(f"Saved status file with {len(df_status)} rows to: {status_file}")
     except Exception as e:
         logger.fatal(f"Failed to save status file {status_file}: {e}")
 
 
+def _is_csv(status_file):
+    return str(status_file).lower().endswith(".csv")
+
+
 # ---------------------
 # UI Update Helpers
 # ---------------------
-def _push_thread_update(update_queue, worker_id, status_text, progress_val):
+def _push_thread_update(update_queue, worker_id, status_text, progress_val, **details):
     """
     Pushes a worker's status update to the UI queue if available.
+    Keyword `details` (brnum, host, phase, bytes, total) are sent along as
+    a dict for the aggregate views (see utils.transfer_stats).
     """
     if update_queue:
-        update_queue.put(("thread_update", worker_id, status_text, progress_val))
+        if details:
+            update_queue.put(("thread_update", worker_id, status_text, progress_val, details))
+        else:
+            update_queue.put(("thread_update", worker_id, status_text, progress_val))
+
+
+def _push_download_progress(update_queue, worker_id, brnum, downloaded, total_size):
+    """
+    Pushes the bytes received so far for a running download.
+    """
+    percent = min(100, int(downloaded * 100 / total_size)) if total_size else 0
+    _push_thread_update(
+        update_queue, worker_id, f"Downloading {brnum}", percent,
+        phase="downloading", bytes=downloaded, total=total_size
+    )
 
 
 def _push_counters(update_queue, success_count, fail_count):
@@ -476,9 +1744,26 @@ def _push_counters(update_queue, success_count, fail_count):
         update_queue.put(("counters", success_count, fail_count))
 
 
-def parse_thread_name_to_id(thread_name, max_workers=3):
+def _push_total(update_queue, total):
+    """
+    Pushes the number of rows this run is expected to process to the UI queue if available.
+    """
+    if update_queue:
+        update_queue.put(("total", total))
+
+
+def _push_queue(update_queue, queued):
+    """
+    Pushes the number of rows waiting for a worker to the UI queue if available.
+    """
+    if update_queue:
+        update_queue.put(("queue", queued))
+
+
+def parse_thread_name_to_id(thread_name):
     """
-    Extracts an integer worker ID from a name like 'DLWorker_0', clamped to max_workers.
+    Extracts an integer worker ID from a name like 'DLWorker_0' (-> 1).
+    IDs are not limited, so every worker of a large pool keeps its own ID.
     Returns 1 if parsing fails.
     """
 
@@ -489,7 +1774,4 @@ def parse_thread_name_to_id(thread_name, max_workers=3):
     except ValueError:
         return 1
 
-    worker_id = suffix + 1
-    if worker_id > max_workers:
-        worker_id = max_workers
-    return worker_id
+    return suffix + 1
@@ -0,0 +1,256 @@
+# landing_page.py
+
+import codecs
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+# ---------------------
+# Constants
+# ---------------------
+# Bytes of a landing page scanned for links
+DEFAULT_SCAN_BYTES = 256 * 1024
+# Candidate links tried per landing page
+DEFAULT_MAX_CANDIDATES = 3
+# Longest unfinished tag carried over to the next chunk
+_MAX_TAG_CARRY = 4096
+
+_TAG_RE = re.compile(r"<(a|meta|link|iframe|embed|object)\b([^>]*)>", re.IGNORECASE)
+_ATTR_RE = re.compile(r"""([a-zA-Z_:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+_DOWNLOAD_ATTR_RE = re.compile(r"(?:^|\s)download(?:\s|/|$)", re.IGNORECASE)
+_ANCHOR_TEXT_RE = re.compile(r"([^<]{0,200})")
+_REFRESH_URL_RE = re.compile(r"""^\s*\d*\s*;?\s*url\s*=\s*['"]?([^'"]+)""", re.IGNORECASE)
+_PDF_PATH_RE = re.compile(r"\.pdf$", re.IGNORECASE)
+_REPORT_WORDS_RE = re.compile(
+    r"annual|report|sustainab|responsib|csr|esg|gri|integrated|rapport|bericht|informe|relazione",
+    re.IGNORECASE
+)
+
+# Base scores per kind of link; PDF-looking targets get PDF_BONUS on top
+KIND_SCORES = {"refresh": 5, "pdf-link": 8, "embed": 4, "href": 0, "canonical": 1}
+PDF_BONUS = 10
+PDF_IN_QUERY_BONUS = 6
+REPORT_WORD_BONUS = 2
+SAME_HOST_BONUS = 1
+DOWNLOAD_ATTR_BONUS = 2
+
+
+# ---------------------
+# Scanning
+# ---------------------
+class LinkScanner:
+    """
+    Incremental scanner for candidate PDF links in an HTML page. Feed it
+    the body chunk by chunk; tags split across chunks are carried over.
+    Collected:
+      - <a href> / <iframe src> / <embed src> / <object data> to PDF-looking URLs
+      - <meta http-equiv="refresh" content="0; url=...">
+      - <link rel="canonical"> and <link type="application/pdf">
+    ranked() scores them (see KIND_SCORES) and returns the best first.
+    """
+
+    def __init__(self, page_url):
+        self.page_url = page_url
+        self.page_host = urlsplit(page_url).hostname
+        self.scores = {}                  # url -> best score
+        self._carry = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, data):
+        text = self._carry + self._decoder.decode(data)
+        end = 0
+        for match in _TAG_RE.finditer(text):
+            self._tag(match.group(1).lower(), _attributes(match.group(2)), text, match.end())
+            end = match.end()
+
+        # Keep an unfinished tag for the next chunk
+        rest = text[end:]
+        start = rest.rfind("<")
+        self._carry = rest[start:] if start != -1 and ">" not in rest[start:] else ""
+        self._carry = self._carry[-_MAX_TAG_CARRY:]
+
+    def _tag(self, name, attrs, text, end):
+        if name == "a":
+            anchor = _ANCHOR_TEXT_RE.match(text, end).group(1)
+            self._add(attrs.get("href"), "href", anchor, "download" in attrs)
+        elif name == "meta" and attrs.get("http-equiv", "").lower() == "refresh":
+            refresh = _REFRESH_URL_RE.match(attrs.get("content", ""))
+            if refresh:
+                self._add(refresh.group(1), "refresh")
+        elif name == "link":
+            rel = attrs.get("rel", "").lower()
+            if attrs.get("type", "").lower() == "application/pdf":
+                self._add(attrs.get("href"), "pdf-link")
+            elif rel == "canonical":
+                self._add(attrs.get("href"), "canonical")
+        elif name in ("iframe", "embed", "object"):
+            self._add(attrs.get("src") or attrs.get("data"), "embed")
+
+    def _add(self, href, kind, text="", download=False):
+        if not href or href.startswith(("#", "javascript:", "mailto:", "tel:", "data:")):
+            return
+        url = urldefrag(urljoin(self.page_url, href.strip()))[0]
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or url == self.page_url:
+            return
+
+        pdf_path = bool(_PDF_PATH_RE.search(parts.path))
+        pdf_query = ".pdf" in parts.query.lower()
+        # Plain links and embeds only count when they look like a PDF
+        if kind in ("href", "embed") and not (pdf_path or pdf_query):
+            return
+
+        score = KIND_SCORES[kind]
+        if pdf_path:
+            score += PDF_BONUS
+        elif pdf_query:
+            score += PDF_IN_QUERY_BONUS
+        if _REPORT_WORDS_RE.search(parts.path) or _REPORT_WORDS_RE.search(text or ""):
+            score += REPORT_WORD_BONUS
+        if parts.hostname == self.page_host:
+            score += SAME_HOST_BONUS
+        if download:
+            score += DOWNLOAD_ATTR_BONUS
+        if score > self.scores.get(url, -1):
+            self.scores[url] = score
+
+    def ranked(self, limit=None):
+        """
+        Returns the candidate URLs, best first (ties in page order).
+        """
+        order = {url: i for i, url in enumerate(self.scores)}
+        urls = sorted(self.scores, key=lambda url: (-self.scores[url], order[url]))
+        return urls[:limit] if limit else urls
+
+
+def _attributes(text):
+    attrs = {}
+    for match in _ATTR_RE.finditer(text):
+        name = match.group(1).lower()
+        value = next((v for v in match.groups()[1:] if v is not None), "")
+        attrs.setdefault(name, value)
+    # Value-less <a download>
+    if "download" not in attrs and _DOWNLOAD_ATTR_RE.search(_ATTR_RE.sub(" ", text)):
+        attrs["download"] = ""
+    return attrs
+
+
+# ---------------------
+# Resolver
+# ---------------------
+class LandingPageResolver:
+    """
+    Finds the PDF behind an HTML landing page (typically the 'Report Html
+    Address' column). attempt_download hands it the response of a page
+    that is not a PDF; at most `scan_bytes` of it are read and scanned
+    with a LinkScanner, and the `max_candidates` best links are tried.
+
+    Results are cached per page URL: the candidates found, and the link
+    that turned out to be the PDF. With a `cache_file` (JSON), the cache
+    is kept across runs, so a rerun goes straight to the known PDF.
+
+    Example usage:
+        resolver = LandingPageResolver(cache_file="data/LandingPages.json")
+        run_downloader(..., landing_page_resolver=resolver)
+    """
+
+    def __init__(self, cache_file=None, scan_bytes=DEFAULT_SCAN_BYTES, max_candidates=DEFAULT_MAX_CANDIDATES):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.scan_bytes = scan_bytes
+        self.max_candidates = max_candidates
+        self._lock = threading.Lock()
+        self._cache = {}                  # page url -> {"pdf": url or None, "candidates": [...]}
+        self._dirty = False
+        if self.cache_file is not None and self.cache_file.is_file():
+            try:
+                with open(self.cache_file, encoding="utf-8") as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable landing page cache {self.cache_file}: {e}")
+
+    def scan(self, page_url, first_chunk, chunks, base_url=None):
+        """
+        Scans `first_chunk` and further `chunks` (an iterator of bytes) of
+        the page at `page_url`, stopping after `scan_bytes`. Relative links
+        are resolved against `base_url` (the URL after redirects, default
+        `page_url`). Caches and returns the ranked candidate URLs.
+        """
+        scanner = LinkScanner(base_url or page_url)
+        scanner.feed(first_chunk)
+        scanned = len(first_chunk)
+        if scanned < self.scan_bytes:
+            for chunk in chunks:
+                scanner.feed(chunk)
+                scanned += len(chunk)
+                if scanned >= self.scan_bytes:
+                    break
+
+        candidates = scanner.ranked(self.max_candidates)
+        self.logger.debug(f"Landing page {page_url}: {len(candidates)} candidates in {scanned} bytes")
+        with self._lock:
+            self._cache[page_url] = {"pdf": None, "candidates": candidates}
+            self._dirty = True
+        return candidates
+
+    def lookup(self, page_url):
+        """
+        Returns the PDF URL confirmed for `page_url`, or None.
+        """
+        with self._lock:
+            entry = self._cache.get(page_url)
+            return entry.get("pdf") if entry else None
+
+    def candidates(self, page_url):
+        with self._lock:
+            entry = self._cache.get(page_url)
+            return list(entry.get("candidates", [])) if entry else []
+
+    def confirm(self, page_url, pdf_url):
+        """
+        Records that `pdf_url` was the PDF behind `page_url`.
+        """
+        with self._lock:
+            entry = self._cache.setdefault(page_url, {"pdf": None, "candidates": []})
+            entry["pdf"] = pdf_url
+            self._dirty = True
+
+    def forget(self, page_url):
+        with self._lock:
+            if self._cache.pop(page_url, None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """
+        Writes the cache to `cache_file`, if any and if it changed.
+        """
+        if self.cache_file is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._cache, ensure_ascii=False)
+            self._dirty = False
+        try:
+            if self.cache_file.parent != Path(""):
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_file.with_name(self.cache_file.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            self.logger.warning(f"Failed to save landing page cache {self.cache_file}: {e}")
+
+
+def looks_like_html(content_type, first_chunk):
+    """
+    True if a response is an HTML page, by its Content-Type or first bytes.
+    """
+    if "html" in (content_type or "").lower():
+        return True
+    head = first_chunk[:256].lstrip().lower()
+    return head.startswith((b"<!doctype html", b"<html", b"<head", b"<meta", b"<!--"))
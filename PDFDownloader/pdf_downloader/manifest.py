@@ -0,0 +1,118 @@
+# manifest.py
+
+import csv
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+# ---------------------
+# Constants
+# ---------------------
+MANIFEST_COLUMNS = ["BRnum", "URL", "Size", "SHA256", "Pages", "Location", "Duplicate", "Downloaded"]
+
+
+# ---------------------
+# Manifest
+# ---------------------
+class Manifest:
+    """
+    Append-only CSV listing every saved PDF (see MANIFEST_COLUMNS).
+    Each entry is flushed immediately, so the manifest survives a killed run
+    and downstream consumers can verify files or sync incrementally
+    without rescanning the PDFs.
+    """
+
+    def __init__(self, path):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        if self.path.parent != Path(""):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def add(self, brnum, meta):
+        """
+        Appends one entry, taking URL/size/sha256/pages/location/duplicate
+        from the `meta` dict filled by download_single_pdf.
+        """
+        row = [
+            brnum,
+            meta.get("url", ""),
+            meta.get("size", ""),
+            meta.get("sha256", ""),
+            meta.get("pages", ""),
+            meta.get("location", ""),
+            meta.get("duplicate", False),
+            datetime.now().isoformat(timespec="seconds"),
+        ]
+        with self._lock:
+            try:
+                write_header = not self.path.exists()
+                with open(self.path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f)
+                    if write_header:
+                        writer.writerow(MANIFEST_COLUMNS)
+                    writer.writerow(row)
+            except OSError as e:
+                self.logger.fatal(f"Failed to write manifest {self.path}: {e}")
+
+
+def read_manifest(path):
+    """
+    Reads a manifest into a list of dicts (empty if the file is missing).
+    """
+    if not os.path.isfile(path):
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+# ---------------------
+# Content-Addressed Store
+# ---------------------
+class ContentStore:
+    """
+    Keeps one copy of each distinct PDF under root/ab/cd/{sha256}.pdf.
+    Saved files are hardlinked to their store object, so identical PDFs
+    under different BRnums take up disk space only once.
+    """
+
+    def __init__(self, root):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def object_path(self, sha256):
+        return self.root / sha256[:2] / sha256[2:4] / f"{sha256}.pdf"
+
+    def add(self, file_path, sha256):
+        """
+        Links `file_path` with the store object for `sha256`:
+          - New content: the object is created as a hardlink to the file.
+          - Known content: the file is atomically replaced by a hardlink
+            to the existing object.
+        Returns True if the content was already known (a duplicate).
+        If hardlinks are not supported, the file is left as it is.
+        """
+        file_path = Path(file_path)
+        obj = self.object_path(sha256)
+
+        with self._lock:
+            try:
+                if not obj.exists():
+                    obj.parent.mkdir(parents=True, exist_ok=True)
+                    os.link(file_path, obj)
+                    return False
+
+                if os.path.samefile(obj, file_path):
+                    return True
+
+                tmp_link = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex[:8]}.link")
+                os.link(obj, tmp_link)
+                os.replace(tmp_link, file_path)
+                return True
+            except OSError as e:
+                self.logger.warning(f"Content store could not link {file_path.name}: {e}")
+                return False
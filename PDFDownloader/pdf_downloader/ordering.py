@@ -0,0 +1,331 @@
+# ordering.py
+
+import heapq
+import random
+import threading
+from statistics import median
+
+# ---------------------
+# Constants
+# ---------------------
+MIN_HOST_WEIGHT = 0.25
+MAX_HOST_WEIGHT = 4.0
+# Share of the schedule given to hosts without history
+DEFAULT_EXPLORATION = 0.1
+# Pseudo-attempts at the overall success rate added to each host's record
+PRIOR_ATTEMPTS = 2
+# Shortest expected attempt, so instant successes do not dominate
+MIN_EXPECTED_SECONDS = 0.1
+
+
+# ---------------------
+# Host Speed Tracking
+# ---------------------
+class HostSpeedTracker:
+    """
+    Thread-safe record of the observed download speed (bytes/s) per host.
+    Fed from finished downloads; used to weight the host interleaving.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bytes = {}
+        self._seconds = {}
+
+    def record(self, host, nbytes, seconds):
+        """
+        Adds one finished download (successful or not) for `host`.
+        """
+        if not host or seconds <= 0:
+            return
+        with self._lock:
+            self._bytes[host] = self._bytes.get(host, 0) + nbytes
+            self._seconds[host] = self._seconds.get(host, 0.0) + seconds
+
+    def speed(self, host):
+        """
+        Returns the observed bytes/s for `host`, or None if never seen.
+        """
+        with self._lock:
+            if host not in self._seconds:
+                return None
+            return self._bytes[host] / self._seconds[host]
+
+    def weights(self):
+        """
+        Returns {host: weight}, where weight is the host's speed relative to
+        the median speed of all seen hosts, clamped to
+        [MIN_HOST_WEIGHT, MAX_HOST_WEIGHT]. Unseen hosts get weight 1.0.
+        """
+        with self._lock:
+            speeds = {h: self._bytes[h] / self._seconds[h] for h in self._seconds}
+
+        positive = [s for s in speeds.values() if s > 0]
+        if not positive:
+            return {h: MIN_HOST_WEIGHT if s == 0 else 1.0 for h, s in speeds.items()}
+
+        mid = median(positive)
+        return {
+            h: min(MAX_HOST_WEIGHT, max(MIN_HOST_WEIGHT, s / mid))
+            for h, s in speeds.items()
+        }
+
+
+# ---------------------
+# Host History
+# ---------------------
+class HostStats:
+    """
+    One host's record in a HostHistory: attempts, successes, median
+    seconds per attempt and median bytes per success (None if it never
+    succeeded).
+    """
+
+    __slots__ = ("attempts", "successes", "median_seconds", "median_bytes")
+
+    def __init__(self, attempts, successes, median_seconds, median_bytes):
+        self.attempts = attempts
+        self.successes = successes
+        self.median_seconds = median_seconds
+        self.median_bytes = median_bytes
+
+
+class HostHistory:
+    """
+    Per-host outcomes of earlier runs: attempts, success rate, median
+    seconds per attempt and median size of successful downloads, built
+    from the status file (see from_rows).
+
+    expected_yield() estimates the successes a worker gets per second
+    spent on a host. weights() turns that into interleaving weights, so
+    productive hosts are scheduled earlier and more often, which lets more
+    files finish within a time or `max_success` budget (see
+    interleave_with_history).
+
+    Example usage:
+        history = HostHistory.from_rows(hosts, statuses, seconds, sizes)
+        order = interleave_with_history(items, item_hosts, history, exploration=0.1)
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats or {}          # host -> HostStats
+        attempts = sum(s.attempts for s in self.stats.values())
+        successes = sum(s.successes for s in self.stats.values())
+        self.success_rate = successes / attempts if attempts else 0.5
+        seconds = [s.median_seconds for s in self.stats.values() if s.median_seconds is not None]
+        self.median_seconds = median(seconds) if seconds else None
+        speeds = [
+            s.median_bytes / s.median_seconds for s in self.stats.values()
+            if s.median_bytes and s.median_seconds
+        ]
+        self.bytes_per_second = median(speeds) if speeds else None
+
+    @classmethod
+    def from_rows(cls, hosts, statuses, seconds, sizes):
+        """
+        Builds the history from parallel sequences, one entry per finished
+        row: host, status ('Success' counts as a success), seconds spent
+        and bytes downloaded (None where unknown).
+        """
+        attempts = {}
+        successes = {}
+        durations = {}
+        byte_counts = {}
+        for host, status, elapsed, size in zip(hosts, statuses, seconds, sizes):
+            if not isinstance(host, str) or not host or not _is_number(elapsed):
+                continue
+            attempts[host] = attempts.get(host, 0) + 1
+            durations.setdefault(host, []).append(float(elapsed))
+            if status == "Success":
+                successes[host] = successes.get(host, 0) + 1
+                if _is_number(size):
+                    byte_counts.setdefault(host, []).append(float(size))
+
+        return cls({
+            host: HostStats(
+                count,
+                successes.get(host, 0),
+                median(durations[host]),
+                median(byte_counts[host]) if host in byte_counts else None
+            )
+            for host, count in attempts.items()
+        })
+
+    def __contains__(self, host):
+        return host in self.stats
+
+    def expected_yield(self, host):
+        """
+        Returns the expected successes per worker-second for `host`, or
+        None if the host has no history.
+
+        The success rate and the seconds per attempt both have
+        PRIOR_ATTEMPTS pseudo-attempts mixed in: at the overall success
+        rate, and at the time the host's median size takes at the overall
+        median speed (or the overall median seconds, for hosts that never
+        succeeded). Hosts with few samples thus stay near the average,
+        and the rate of a failing host falls toward 0 as failures pile up.
+        The failing share of a host's attempts is charged at least the
+        overall median seconds, so hosts that fail fast do not outrank
+        hosts that succeed.
+        """
+        stats = self.stats.get(host)
+        if stats is None:
+            return None
+        rate = (stats.successes + PRIOR_ATTEMPTS * self.success_rate) / (stats.attempts + PRIOR_ATTEMPTS)
+        prior_seconds = self.median_seconds
+        if stats.median_bytes and self.bytes_per_second:
+            prior_seconds = stats.median_bytes / self.bytes_per_second
+        seconds = (stats.attempts * stats.median_seconds + PRIOR_ATTEMPTS * prior_seconds) / (
+            stats.attempts + PRIOR_ATTEMPTS
+        )
+        seconds = max(seconds, (1 - rate) * self.median_seconds, MIN_EXPECTED_SECONDS)
+        return rate / seconds
+
+    def weights(self, hosts):
+        """
+        Returns {host: weight} for those of `hosts` with history: expected
+        yield relative to their median, clamped to
+        [MIN_HOST_WEIGHT, MAX_HOST_WEIGHT].
+        """
+        yields = {h: self.expected_yield(h) for h in set(hosts) if h in self.stats}
+        positive = [y for y in yields.values() if y > 0]
+        mid = median(positive) if positive else None
+        return {
+            host: min(MAX_HOST_WEIGHT, max(MIN_HOST_WEIGHT, value / mid)) if mid else 1.0
+            for host, value in yields.items()
+        }
+
+    def summary(self):
+        return f"{len(self.stats)} hosts with history, overall success rate {self.success_rate:.0%}"
+
+
+def interleave_with_history(
+    items, hosts, history, exploration=DEFAULT_EXPLORATION, weights=None, rng=None, costs=None
+):
+    """
+    interleave_by_host, ranked by `history`: rows of hosts with history are
+    interleaved with their history weights (times `weights`, e.g. this
+    run's speeds), rows of other hosts with `weights` alone. The two
+    orders are then blended so that `exploration` (0-1) of the positions
+    go to hosts without history while both have rows left. Many hosts
+    only have a row or two, so the share is kept per group rather than
+    per host.
+    Returns a new list.
+    """
+
+    items = list(items)
+    hosts = list(hosts)
+    known = [i for i, host in enumerate(hosts) if host in history]
+    unknown = [i for i, host in enumerate(hosts) if host not in history]
+    known_weights = combine_weights(history.weights(hosts[i] for i in known), weights)
+
+    def _interleave(positions, group_weights):
+        return interleave_by_host(
+            positions, [hosts[i] for i in positions], weights=group_weights, rng=rng,
+            costs=[costs[i] for i in positions] if costs is not None else None
+        )
+
+    order = _blend(_interleave(known, known_weights), _interleave(unknown, weights), exploration)
+    return [items[i] for i in order]
+
+
+def _blend(main, extra, share):
+    # Takes from `extra` whenever `share` credit has built up to one position
+    ordered = []
+    i = j = 0
+    credit = 0.0
+    while i < len(main) or j < len(extra):
+        credit += share
+        if j < len(extra) and (credit >= 1 or i >= len(main)):
+            ordered.append(extra[j])
+            j += 1
+            credit = max(0.0, credit - 1)
+        else:
+            ordered.append(main[i])
+            i += 1
+    return ordered
+
+
+def combine_weights(*weight_maps):
+    """
+    Multiplies host weights from several sources ({host: weight}; missing
+    hosts count as 1.0), e.g. history and the speed seen in this run.
+    """
+    combined = {}
+    for weights in weight_maps:
+        for host, weight in (weights or {}).items():
+            combined[host] = combined.get(host, 1.0) * weight
+    return combined
+
+
+def _is_number(value):
+    try:
+        return value is not None and float(value) == float(value)  # NaN is not a number here
+    except (TypeError, ValueError):
+        return False
+
+
+# ---------------------
+# Host Interleaving
+# ---------------------
+def interleave_by_host(items, hosts, weights=None, rng=None, costs=None):
+    """
+    Reorders `items` so consecutive items come from different hosts.
+
+    Items are bucketed by their host (the parallel sequence `hosts`, where a
+    missing host counts as its own bucket) and emitted round-robin across
+    hosts. A host with weight 2.0 is emitted twice as often as one with 1.0,
+    so faster hosts drain sooner instead of being left for the end.
+
+    With `costs` (expected seconds per item, parallel to `items`), each
+    host's items come most expensive first, and hosts start in the order
+    of their most expensive item, so long downloads do not straggle at the
+    end of a window.
+
+    With the same `rng` seed and weights the result is always the same.
+    Returns a new list.
+    """
+
+    if rng is None:
+        rng = random.Random()
+    weights = weights or {}
+
+    # Buckets hold positions in `items`, so equal items stay distinct
+    items = list(items)
+    buckets = {}
+    for i, host in zip(range(len(items)), hosts):
+        key = host if isinstance(host, str) and host else None
+        buckets.setdefault(key, []).append(i)
+
+    # Stable host order first (so only the seed decides), then shuffle
+    host_order = sorted(buckets, key=lambda h: (h is None, h or ""))
+    rng.shuffle(host_order)
+    for host in host_order:
+        rng.shuffle(buckets[host])
+
+    # Most expensive first; the shuffle above breaks ties
+    if costs is not None:
+        for host in host_order:
+            buckets[host].sort(key=lambda i: -costs[i])
+        host_order.sort(key=lambda h: -costs[buckets[h][0]])
+
+    # Stride scheduling: each host advances its pass by 1/weight per item,
+    # and the host with the lowest pass is emitted next.
+    heap = []
+    for rank, host in enumerate(host_order):
+        stride = 1.0 / max(weights.get(host, 1.0), 1e-6)
+        heap.append((stride, rank, stride, host))
+    heapq.heapify(heap)
+
+    ordered = []
+    positions = dict.fromkeys(host_order, 0)
+    while heap:
+        pass_value, rank, stride, host = heapq.heappop(heap)
+        bucket = buckets[host]
+        ordered.append(items[bucket[positions[host]]])
+        positions[host] += 1
+        if positions[host] < len(bucket):
+            heapq.heappush(heap, (pass_value + stride, rank, stride, host))
+
+    return ordered
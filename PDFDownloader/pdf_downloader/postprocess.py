@@ -0,0 +1,239 @@
+# postprocess.py
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# ---------------------
+# Constants
+# ---------------------
+# Processors run when none are given, by result name
+DEFAULT_PROCESSORS = ("pages", "metadata", "text")
+
+
+# ---------------------
+# Processors
+# ---------------------
+# A processor is a top-level function taking the path of a PDF and
+# returning a JSON-serializable result. They run in worker processes,
+# so they must be importable (no lambdas or closures).
+def extract_page_count(path):
+    import PyPDF2
+    with open(path, "rb") as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def extract_metadata(path):
+    """
+    Returns the document information dictionary (title, author, producer,
+    dates, ...) with the leading '/' removed from the keys, plus 'Encrypted'.
+    """
+    import PyPDF2
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        info = reader.metadata or {}
+        metadata = {str(key).lstrip("/"): str(value) for key, value in info.items()}
+        metadata["Encrypted"] = reader.is_encrypted
+    return metadata
+
+
+def extract_text(path):
+    """
+    Returns the text of all pages, separated by form feeds.
+    """
+    import PyPDF2
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        return "\f".join(page.extract_text() or "" for page in reader.pages)
+
+
+PROCESSORS = {
+    "pages": extract_page_count,
+    "metadata": extract_metadata,
+    "text": extract_text,
+}
+
+
+def _run_processors(path, processors):
+    """
+    Worker process: runs each of `processors` ({name: function}) on `path`.
+    Returns {name: {"result": value} or {"error": message}}; one failing
+    processor does not stop the others.
+    """
+    results = {}
+    for name, processor in processors.items():
+        try:
+            results[name] = {"result": processor(path)}
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+# ---------------------
+# Post-Download Stage
+# ---------------------
+class PostProcessor:
+    """
+    Runs processors (page count, metadata, text extraction; see PROCESSORS)
+    on downloaded PDFs in a process pool, so parsing does not slow down the
+    download workers.
+
+    Results are cached under `cache_dir` per content hash, in
+    cache_dir/ab/cd/{sha256}.json ({name: {"result": ...} or {"error": ...}}).
+    A PDF is only processed if its content is new, or a processor has no
+    result for it yet, so repeated runs and duplicate PDFs cost nothing.
+    Errors are cached too: the same bytes fail the same way.
+
+    `processors` is a list of names from PROCESSORS, or a dict of
+    {name: function} for custom processors (top-level functions taking a
+    PDF path and returning something JSON-serializable).
+
+    Example usage:
+        post = PostProcessor("data/PostProcessed", processors=["pages", "text"])
+        post.submit("BR123", "data/PDFs/BR123.pdf")
+        post.close()
+        pages = post.results(file_sha256("data/PDFs/BR123.pdf"))["pages"]["result"]
+    """
+
+    def __init__(self, cache_dir, processors=DEFAULT_PROCESSORS, workers=None):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.cache_dir = Path(cache_dir)
+        if isinstance(processors, dict):
+            self.processors = dict(processors)
+        else:
+            unknown = [name for name in processors if name not in PROCESSORS]
+            if unknown:
+                raise ValueError(f"Unknown processors {unknown}. Expected some of {list(PROCESSORS)}.")
+            self.processors = {name: PROCESSORS[name] for name in processors}
+        self.workers = workers or os.cpu_count() or 1
+        self.submitted = 0
+        self.cached = 0
+        self.processed = 0
+        self.failed = 0
+
+        self._lock = threading.Lock()
+        self._in_flight = set()           # sha256 of PDFs being processed
+        self._executor = None
+
+    def cache_path(self, sha256):
+        return self.cache_dir / sha256[:2] / sha256[2:4] / f"{sha256}.json"
+
+    def results(self, sha256):
+        """
+        Returns the cached {name: {"result"|"error": ...}} for `sha256`
+        ({} if it was never processed).
+        """
+        try:
+            with open(self.cache_path(sha256), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def submit(self, brnum, path, sha256=None):
+        """
+        Queues `path` for the processors that have no cached result for
+        its content. `sha256` is computed from the file if not given.
+        Returns False if everything was cached (nothing to do).
+        """
+        sha256 = sha256 or file_sha256(path)
+        with self._lock:
+            if sha256 in self._in_flight:
+                self.cached += 1
+                return False
+        missing = {
+            name: processor for name, processor in self.processors.items()
+            if name not in self.results(sha256)
+        }
+        if not missing:
+            self.cached += 1
+            return False
+
+        with self._lock:
+            if sha256 in self._in_flight:
+                self.cached += 1
+                return False
+            self._in_flight.add(sha256)
+            if self._executor is None:
+                # Spawned workers: the parent runs threads a fork would copy mid-lock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            future = self._executor.submit(_run_processors, str(path), missing)
+            self.submitted += 1
+        future.add_done_callback(lambda f: self._finish(f, brnum, sha256))
+        return True
+
+    def scan_folder(self, folder):
+        """
+        Submits every PDF under `folder` whose content has missing results,
+        e.g. to backfill files downloaded before the stage was enabled.
+        Returns the number of PDFs submitted.
+        """
+        submitted = 0
+        for path in sorted(Path(folder).rglob("*.pdf")):
+            if self.submit(path.stem, path):
+                submitted += 1
+        return submitted
+
+    def _finish(self, future, brnum, sha256):
+        try:
+            if future.cancelled():
+                return
+            try:
+                new_results = future.result()
+            except Exception as e:
+                self.logger.warning(f"[BR{brnum}] Post-processing failed: {e}")
+                with self._lock:
+                    self.failed += 1
+                return
+
+            errors = [name for name, entry in new_results.items() if "error" in entry]
+            for name in errors:
+                self.logger.warning(f"[BR{brnum}] Processor '{name}' failed: {new_results[name]['error']}")
+            self._save(sha256, {**self.results(sha256), **new_results})
+            with self._lock:
+                self.processed += 1
+                self.failed += bool(errors)
+        finally:
+            with self._lock:
+                self._in_flight.discard(sha256)
+
+    def _save(self, sha256, results):
+        path = self.cache_path(sha256)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"Failed to save post-processing results {path}: {e}")
+
+    def close(self, wait=True):
+        """
+        Waits for queued PDFs (or, with wait=False, drops those not
+        started yet) and stops the worker processes.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def summary(self):
+        return (
+            f"{self.processed} PDFs processed, {self.cached} already cached, "
+            f"{self.failed} with errors"
+        )
@@ -0,0 +1,257 @@
+# storage.py
+
+import csv
+import hashlib
+import logging
+import os
+import tarfile
+import threading
+import zipfile
+from pathlib import Path
+
+# ---------------------
+# Constants
+# ---------------------
+OUTPUT_LAYOUTS = ("flat", "hash", "prefix", "zip", "tar")
+ARCHIVE_INDEX_FILE = "index.csv"
+ARCHIVE_STAGING_DIR = ".staging"
+DEFAULT_ARCHIVE_MAX_MB = 1024
+
+
+# ---------------------
+# Public Factory
+# ---------------------
+def make_output_layout(
+    output_folder,
+    layout="flat",
+    shard_depth=2,
+    shard_width=2,
+    archive_max_mb=DEFAULT_ARCHIVE_MAX_MB
+):
+    """
+    Creates the output layout deciding where each BRnum's PDF is stored:
+      - 'flat':   output_folder/{brnum}.pdf
+      - 'hash':   output_folder/ab/cd/{brnum}.pdf, from the SHA-1 of the BRnum
+      - 'prefix': output_folder/BR/12/{brnum}.pdf, from the BRnum itself
+      - 'zip'/'tar': PDFs are appended to rolling archives of at most
+                     `archive_max_mb` MB, listed in output_folder/index.csv
+    Returns a layout object (FlatLayout, ShardedLayout or ArchiveLayout).
+    """
+
+    if layout == "flat":
+        return FlatLayout(output_folder)
+    if layout in ("hash", "prefix"):
+        return ShardedLayout(output_folder, layout, shard_depth, shard_width)
+    if layout in ("zip", "tar"):
+        return ArchiveLayout(output_folder, layout, archive_max_mb)
+    raise ValueError(f"Unknown output layout '{layout}'. Expected one of {OUTPUT_LAYOUTS}.")
+
+
+# ---------------------
+# Layouts
+# ---------------------
+class FlatLayout:
+    """
+    All PDFs directly in the output folder, named {brnum}.pdf.
+
+    Every layout offers:
+      - path_for(brnum): where attempt_download should write the file
+      - store(brnum, path): moves a validated file to its final place and
+                            returns its location (relative to the output folder)
+      - locate(brnum): location of an already stored PDF, or None
+      - close(): releases any open resources
+    and `keeps_files`, True if the stored PDF stays a file at path_for(brnum).
+    """
+
+    keeps_files = True
+
+    def __init__(self, output_folder):
+        self.output_folder = Path(output_folder)
+
+    def _relative_path(self, brnum):
+        return Path(f"{brnum}.pdf")
+
+    def path_for(self, brnum):
+        path = self.output_folder / self._relative_path(brnum)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def store(self, brnum, path):
+        return self._relative_path(brnum).as_posix()
+
+    def locate(self, brnum):
+        relative = self._relative_path(brnum)
+        try:
+            with open(self.output_folder / relative, "rb") as f:
+                if f.read(5) == b"%PDF-":
+                    return relative.as_posix()
+        except OSError:
+            pass
+        return None
+
+    def close(self):
+        pass
+
+
+class ShardedLayout(FlatLayout):
+    """
+    PDFs spread over `depth` levels of subdirectories, each named by
+    `width` characters of either the SHA-1 hex digest of the BRnum ('hash')
+    or of the BRnum itself ('prefix').
+    """
+
+    def __init__(self, output_folder, mode="hash", depth=2, width=2):
+        super().__init__(output_folder)
+        self.mode = mode
+        self.depth = depth
+        self.width = width
+
+    def _relative_path(self, brnum):
+        if self.mode == "hash":
+            key = hashlib.sha1(str(brnum).encode("utf-8")).hexdigest()
+        else:
+            key = "".join(c if c.isalnum() else "_" for c in str(brnum))
+            key = key.ljust(self.depth * self.width, "_")
+
+        parts = [key[i * self.width:(i + 1) * self.width] for i in range(self.depth)]
+        return Path(*parts, f"{brnum}.pdf")
+
+
+class ArchiveLayout:
+    """
+    Validated PDFs are appended to rolling archives (pdfs-00001.zip, ...)
+    in the output folder. Files are first written to a staging folder, and
+    every stored file gets a line in index.csv (BRnum, Archive, Member, Size).
+
+    The current archive and the index stay open until the archive rolls
+    over or close() is called; reopening a zip per file re-reads its whole
+    central directory, which makes filling an archive quadratic. A zip left
+    without its central directory by a killed run cannot be appended to,
+    so the next run starts a new archive after it. After close(), store()
+    refuses new files, so a download abandoned at shutdown cannot write
+    into an archive that is no longer managed.
+    """
+
+    keeps_files = False
+
+    def __init__(self, output_folder, fmt="zip", archive_max_mb=DEFAULT_ARCHIVE_MAX_MB):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.output_folder = Path(output_folder)
+        self.fmt = fmt
+        self.max_bytes = archive_max_mb * 1024 * 1024
+        self.staging_folder = self.output_folder / ARCHIVE_STAGING_DIR
+        self.index_path = self.output_folder / ARCHIVE_INDEX_FILE
+        self._lock = threading.Lock()
+        self._closed = False
+        self._archive = None              # open ZipFile/TarFile of the current archive
+        self._archive_bytes = 0
+        self._index_file = None
+        self._index_writer = None
+
+        self.staging_folder.mkdir(parents=True, exist_ok=True)
+        self._index = self._load_index()
+        self._archive_num = self._last_archive_num()
+
+    def _archive_name(self, num):
+        return f"pdfs-{num:05d}.{self.fmt}"
+
+    def _load_index(self):
+        index = {}
+        if self.index_path.is_file():
+            with open(self.index_path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    index[row["BRnum"]] = f"{row['Archive']}:{row['Member']}"
+        return index
+
+    def _last_archive_num(self):
+        nums = []
+        for path in self.output_folder.glob(f"pdfs-*.{self.fmt}"):
+            try:
+                nums.append(int(path.stem.split("-")[-1]))
+            except ValueError:
+                continue
+        return max(nums, default=1)
+
+    def _open_archive(self):
+        # Opens the current archive for appending; a damaged one is skipped
+        while True:
+            archive_path = self.output_folder / self._archive_name(self._archive_num)
+            try:
+                if self.fmt == "zip":
+                    # ZipFile would append a second archive after a damaged one
+                    if archive_path.exists() and not zipfile.is_zipfile(archive_path):
+                        raise zipfile.BadZipFile("no central directory")
+                    self._archive = zipfile.ZipFile(archive_path, "a", compression=zipfile.ZIP_STORED)
+                else:
+                    self._archive = tarfile.open(archive_path, "a")
+            except (zipfile.BadZipFile, tarfile.TarError) as e:
+                self.logger.warning(f"Cannot append to {archive_path.name} ({e}); starting a new archive.")
+                self._archive_num += 1
+                continue
+            self._archive_bytes = archive_path.stat().st_size if archive_path.exists() else 0
+            return archive_path
+
+    def _close_archive(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def _write_index(self, row):
+        if self._index_file is None:
+            write_header = not self.index_path.exists()
+            self._index_file = open(self.index_path, "a", newline="", encoding="utf-8")
+            self._index_writer = csv.writer(self._index_file)
+            if write_header:
+                self._index_writer.writerow(["BRnum", "Archive", "Member", "Size"])
+        self._index_writer.writerow(row)
+        self._index_file.flush()
+
+    def path_for(self, brnum):
+        return self.staging_folder / f"{brnum}.pdf"
+
+    def store(self, brnum, path):
+        path = Path(path)
+        member = f"{brnum}.pdf"
+        size = path.stat().st_size
+
+        with self._lock:
+            if self._closed:
+                os.remove(path)
+                raise RuntimeError(f"Archive layout is closed; {member} was not stored.")
+            if self._archive is None:
+                self._open_archive()
+            if self._archive_bytes and self._archive_bytes + size > self.max_bytes:
+                self._close_archive()
+                self._archive_num += 1
+                self._open_archive()
+                self.logger.info(f"Starting new archive: {self._archive_name(self._archive_num)}")
+            archive_name = self._archive_name(self._archive_num)
+
+            if self.fmt == "zip":
+                self._archive.write(path, arcname=member)
+            else:
+                self._archive.add(path, arcname=member)
+            self._archive_bytes += size
+            self._write_index([brnum, archive_name, member, size])
+
+            location = f"{archive_name}:{member}"
+            self._index[str(brnum)] = location
+
+        os.remove(path)
+        return location
+
+    def locate(self, brnum):
+        with self._lock:
+            return self._index.get(str(brnum))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._close_archive()
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
+        try:
+            self.staging_folder.rmdir()
+        except OSError:
+            pass
@@ -0,0 +1,141 @@
+# trace.py
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# ---------------------
+# Constants
+# ---------------------
+# Response headers kept in a trace (never cookies or other private data)
+TRACE_HEADERS = [
+    "Content-Type",
+    "Content-Length",
+    "Content-Encoding",
+    "Content-Disposition",
+    "ETag",
+    "Last-Modified",
+    "Accept-Ranges",
+    "Cache-Control",
+    "Server",
+]
+
+
+# ---------------------
+# Recorder
+# ---------------------
+class TraceRecorder:
+    """
+    Append-only JSON-lines log of the HTTP requests made by attempt_download,
+    for replaying a run offline (see tests/replay_server.py). Each line holds
+    one request's timing profile, status, redirect hops, selected headers and
+    body size, but never the body itself.
+
+    Entry fields:
+        time        wall-clock start (ISO 8601)
+        brnum, method, url
+        status      final status code (None if no response)
+        redirects   [[status, url], ...] for every hop before the final URL
+        final_url   URL that answered after the redirects
+        headers     TRACE_HEADERS present in the final response
+        ttfb        seconds until the response headers arrived
+        elapsed     seconds until the body was read (or the request failed)
+        bytes       body bytes received
+        pdf         whether the body started with %PDF- (None if not read)
+        error       exception text, or None
+
+    Example usage:
+        run_downloader(..., trace_file="traces/run.jsonl")
+    """
+
+    def __init__(self, path):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        if self.path.parent != Path(""):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def start(self, brnum, method, url):
+        """
+        Returns a TraceEntry to fill in while the request runs.
+        """
+        return TraceEntry(self, brnum, method, url)
+
+    def write(self, entry):
+        """
+        Appends one finished entry (a dict).
+        """
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                self.logger.warning(f"Failed to write trace {self.path}: {e}")
+
+
+class TraceEntry:
+    """
+    One request being traced. Call response() when the headers arrive,
+    add_bytes() while the body streams, and finish() exactly once.
+    """
+
+    __slots__ = ("recorder", "data", "_started")
+
+    def __init__(self, recorder, brnum, method, url):
+        self.recorder = recorder
+        self._started = time.monotonic()
+        self.data = {
+            "time": datetime.now().isoformat(timespec="milliseconds"),
+            "brnum": brnum,
+            "method": method,
+            "url": url,
+            "status": None,
+            "redirects": [],
+            "final_url": url,
+            "headers": {},
+            "ttfb": None,
+            "elapsed": None,
+            "bytes": 0,
+            "pdf": None,
+            "error": None,
+        }
+
+    def response(self, resp):
+        """
+        Records status, redirect hops and headers of a requests.Response.
+        """
+        self.data["ttfb"] = round(time.monotonic() - self._started, 4)
+        self.data["status"] = resp.status_code
+        self.data["redirects"] = [[hop.status_code, hop.url] for hop in resp.history]
+        self.data["final_url"] = resp.url
+        self.data["headers"] = {name: resp.headers[name] for name in TRACE_HEADERS if name in resp.headers}
+
+    def add_bytes(self, count):
+        self.data["bytes"] += count
+
+    def finish(self, error=None):
+        if error is not None:
+            self.data["error"] = f"{type(error).__name__}: {error}" if isinstance(error, Exception) else str(error)
+        self.data["elapsed"] = round(time.monotonic() - self._started, 4)
+        self.recorder.write(self.data)
+
+
+def read_trace(path):
+    """
+    Reads a trace file into a list of dicts (empty if the file is missing).
+    Lines that cannot be parsed (e.g. cut off by a crash) are skipped.
+    """
+    entries = []
+    if not Path(path).is_file():
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return entries
@@ -0,0 +1,291 @@
+# transport.py
+
+import io
+import socket
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+# requests is imported inside the functions that use it, so importing this
+# module stays cheap.
+
+# ---------------------
+# Constants
+# ---------------------
+MAX_REDIRECTS = 30
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def default_transport():
+    """
+    Returns the process-wide RequestsTransport used by attempt_download
+    when no transport is passed in (created on first use).
+    """
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = RequestsTransport()
+        return _default_transport
+
+
+# ---------------------
+# Production Transport
+# ---------------------
+class RequestsTransport:
+    """
+    HTTP transport backed by one pooled requests.Session, shared by all
+    download workers: connections (and TLS sessions) to a host are reused
+    across downloads, and cookies set by a server are sent on later requests.
+
+    Every transport offers:
+      - head(url, timeout, headers=None): HEAD request following redirects
+      - get(url, timeout, headers=None): streamed GET following redirects
+      - abort(resp): unblocks a thread reading `resp` (called on cancellation)
+      - close(): releases pooled connections
+    The responses behave like requests.Response (status_code, headers, url,
+    history, raise_for_status, iter_content, close), and failures raise
+    requests.exceptions.RequestException.
+
+    Example usage:
+        transport = RequestsTransport(pool_size=16)
+        run_downloader(..., transport=transport)
+    """
+
+    def __init__(self, pool_size=10, headers=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def head(self, url, timeout, headers=None):
+        return self.session.head(url, timeout=timeout, allow_redirects=True, headers=headers)
+
+    def get(self, url, timeout, headers=None):
+        return self.session.get(url, timeout=timeout, stream=True, headers=headers)
+
+    def abort(self, resp):
+        # Shutting the socket down wakes a blocked reader; closing it from
+        # another thread would not
+        connection = getattr(resp.raw, "_connection", None)
+        sock = getattr(connection, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        self.session.close()
+
+
+# ---------------------
+# In-Memory Transport
+# ---------------------
+class FakeRoute:
+    """
+    Scripted answer of a FakeTransport for one URL:
+      - status, headers, body: the response (Content-Length is added)
+      - redirect: URL (absolute or relative) to send a 302 to;
+                  use status=301/307/... for another redirect code
+      - set_cookies: {name: value} set for the URL's host
+      - require_cookies: cookie names that must have been set, else 403
+      - require_headers: {name: substring} the request must contain, else 403
+      - etag, last_modified: validators; a matching conditional GET gets a 304
+      - latency: seconds until the response headers arrive
+      - rate: body bytes per second (None streams instantly)
+      - error: exception raised (after `latency`) instead of answering
+    """
+
+    __slots__ = (
+        "status", "headers", "body", "redirect", "set_cookies", "require_cookies",
+        "require_headers", "etag", "last_modified", "latency", "rate", "error"
+    )
+
+    def __init__(
+        self, body=b"", status=200, headers=None, redirect=None,
+        set_cookies=None, require_cookies=(), require_headers=None,
+        etag=None, last_modified=None, latency=0.0, rate=None, error=None
+    ):
+        self.body = body
+        self.status = 302 if redirect and status == 200 else status
+        self.headers = dict(headers or {})
+        self.redirect = redirect
+        self.set_cookies = dict(set_cookies or {})
+        self.require_cookies = tuple(require_cookies)
+        self.require_headers = dict(require_headers or {})
+        self.etag = etag
+        self.last_modified = last_modified
+        self.latency = latency
+        self.rate = rate
+        self.error = error
+
+
+class FakeTransport:
+    """
+    In-process transport for tests and benchmarks: answers from FakeRoutes
+    registered per URL, without sockets. Redirects, cookies (kept per host,
+    like a session), conditional requests, latency, timeouts and slow
+    streamed bodies are simulated, and cancellation aborts a simulated
+    read at once. Offers the same interface as RequestsTransport.
+
+    URLs without a route get `default` (a FakeRoute), or a 404.
+    Every request is logged in `requests` as (method, url, headers).
+
+    Example usage:
+        transport = FakeTransport()
+        transport.add("http://reports.test/a.pdf", body=pdf_bytes, latency=0.05)
+        transport.add("http://reports.test/old", redirect="/a.pdf", set_cookies={"sid": "1"})
+        attempt_download(path, "http://reports.test/old", "BR1", transport=transport)
+    """
+
+    def __init__(self, default=None, headers=None):
+        self.routes = {}
+        self.default = default
+        self.headers = {"User-Agent": "python-requests", **(headers or {})}
+        self.requests = []
+        self.cookies = {}                 # host -> {name: value}
+        self._lock = threading.Lock()
+
+    def add(self, url, body=b"", **route_options):
+        """
+        Registers the answer for `url` (see FakeRoute for the options).
+        Returns the FakeRoute.
+        """
+        route = FakeRoute(body, **route_options)
+        self.routes[url] = route
+        return route
+
+    def head(self, url, timeout, headers=None):
+        return self._request("HEAD", url, timeout, headers)
+
+    def get(self, url, timeout, headers=None):
+        return self._request("GET", url, timeout, headers)
+
+    def abort(self, resp):
+        resp.raw.abort()
+
+    def close(self):
+        pass
+
+    def _request(self, method, url, timeout, headers):
+        import requests
+
+        history = []
+        request_headers = {**self.headers, **(headers or {})}
+        for _ in range(MAX_REDIRECTS + 1):
+            route = self.routes.get(url) or self.default or FakeRoute(b"Not found", status=404)
+            host = urlsplit(url).hostname
+            with self._lock:
+                self.requests.append((method, url, request_headers))
+                jar = self.cookies.setdefault(host, {})
+
+            _simulate_latency(route, timeout)
+            if route.error is not None:
+                raise route.error
+
+            status, body, response_headers = self._answer(route, method, request_headers, jar)
+            with self._lock:
+                jar.update(route.set_cookies)
+
+            resp = _make_response(status, response_headers, url, body if method == "GET" else b"", route.rate, timeout)
+            if status in REDIRECT_CODES and route.redirect:
+                history.append(resp)
+                url = urljoin(url, route.redirect)
+                continue
+            resp.history = history
+            return resp
+        raise requests.exceptions.TooManyRedirects(f"Exceeded {MAX_REDIRECTS} redirects.")
+
+    @staticmethod
+    def _answer(route, method, request_headers, jar):
+        # Returns (status, body, headers) for one hop
+        headers = dict(route.headers)
+        if route.etag:
+            headers["ETag"] = route.etag
+        if route.last_modified:
+            headers["Last-Modified"] = route.last_modified
+        if route.redirect:
+            headers["Location"] = route.redirect
+
+        missing_cookie = any(name not in jar for name in route.require_cookies)
+        missing_header = any(
+            value not in request_headers.get(name, "") for name, value in route.require_headers.items()
+        )
+        if missing_cookie or missing_header:
+            return 403, b"Forbidden", {}
+
+        if method == "GET" and route.status == 200 and (
+            (route.etag and request_headers.get("If-None-Match") == route.etag)
+            or (route.last_modified and request_headers.get("If-Modified-Since") == route.last_modified)
+        ):
+            return 304, b"", headers
+
+        headers["Content-Length"] = str(len(route.body))
+        return route.status, route.body, headers
+
+
+def _simulate_latency(route, timeout):
+    import requests
+
+    if route.latency <= 0:
+        return
+    if timeout is not None and route.latency > timeout:
+        time.sleep(timeout)
+        raise requests.exceptions.ConnectTimeout(f"Fake connect timed out after {timeout} s.")
+    time.sleep(route.latency)
+
+
+def _make_response(status, headers, url, body, rate, timeout):
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers = CaseInsensitiveDict(headers)
+    resp.url = url
+    resp.reason = "Fake"
+    resp.encoding = None
+    resp.raw = _FakeBody(body, rate, timeout)
+    return resp
+
+
+class _FakeBody:
+    """
+    Response body read by requests' iter_content, at `rate` bytes/s.
+    abort() makes a blocked read fail at once, like a shut down socket.
+    """
+
+    def __init__(self, body, rate, timeout):
+        self._buffer = io.BytesIO(body)
+        self._rate = rate
+        self._timeout = timeout
+        self._aborted = threading.Event()
+
+    def read(self, amount=-1):
+        import requests
+
+        if self._aborted.is_set():
+            raise requests.exceptions.ConnectionError("Fake connection aborted.")
+        chunk = self._buffer.read(amount)
+        if chunk and self._rate:
+            delay = len(chunk) / self._rate
+            if self._timeout is not None and delay > self._timeout:
+                self._aborted.wait(self._timeout)
+                raise requests.exceptions.ConnectionError("Fake read timed out.")
+            if self._aborted.wait(delay):
+                raise requests.exceptions.ConnectionError("Fake connection aborted.")
+        return chunk
+
+    def abort(self):
+        self._aborted.set()
+
+    def close(self):
+        pass
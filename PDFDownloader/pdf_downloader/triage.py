@@ -0,0 +1,217 @@
+# triage.py
+
+import csv
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# ---------------------
+# Constants
+# ---------------------
+TRIAGE_COLUMNS = [
+    "BRnum", "URL", "Class", "Status", "Content-Type", "Size",
+    "Latency", "Redirects", "Final URL", "Error", "Probed"
+]
+
+# Link classes
+PDF = "pdf"
+HTML = "html"
+OTHER = "other"
+OVERSIZED = "oversized"
+DEAD = "dead"
+UNKNOWN = "unknown"
+
+# Statuses that mean the link is gone; other errors (timeouts, 429, 503,
+# HEAD answered 405, ...) may pass on a normal download
+DEAD_STATUSES = (404, 410)
+# Resolver errors for a host name that does not exist
+_NAME_ERRORS = {socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)}
+
+# Bytes requested by a range probe
+PROBE_RANGE_BYTES = 1024
+# Links above this size are classed as oversized
+DEFAULT_MAX_SIZE_MB = 200
+# Transfer rate assumed when estimating the cost of a download (bytes/s)
+ASSUMED_RATE = 1024 * 1024
+# Size assumed for a PDF whose size is unknown
+ASSUMED_SIZE = 2 * 1024 * 1024
+
+
+# ---------------------
+# Probing
+# ---------------------
+def probe_url(url, transport, timeout=10, method="range", max_size_mb=DEFAULT_MAX_SIZE_MB):
+    """
+    Classifies one link with a single lightweight request: a GET for the
+    first PROBE_RANGE_BYTES (method='range'; the connection is closed after
+    the first chunk, even if the server ignores the Range header) or a HEAD
+    (method='head', content type only).
+
+    Returns a dict with the TRIAGE_COLUMNS values except BRnum and Probed.
+    The class is one of PDF, HTML, OTHER, OVERSIZED, DEAD (only for a
+    status in DEAD_STATUSES or a host name that does not resolve) or
+    UNKNOWN (any other error or HTTP status of 400 and above; such links
+    are still tried by the full run).
+    """
+
+    import requests
+
+    result = {
+        "URL": url, "Class": UNKNOWN, "Status": None, "Content-Type": None, "Size": None,
+        "Latency": None, "Redirects": 0, "Final URL": None, "Error": None,
+    }
+    started = time.monotonic()
+    resp = None
+    try:
+        if method == "head":
+            resp = transport.head(url, timeout=timeout)
+        else:
+            resp = transport.get(url, timeout=timeout, headers={"Range": f"bytes=0-{PROBE_RANGE_BYTES - 1}"})
+        result["Latency"] = round(time.monotonic() - started, 4)
+        result["Status"] = resp.status_code
+        result["Redirects"] = len(resp.history)
+        result["Final URL"] = resp.url
+        content_type = resp.headers.get("Content-Type", "")
+        result["Content-Type"] = content_type or None
+        result["Size"] = _response_size(resp)
+
+        if resp.status_code >= 400:
+            if resp.status_code in DEAD_STATUSES:
+                result["Class"] = DEAD
+            return result
+
+        first_chunk = b""
+        if method != "head":
+            first_chunk = next(resp.iter_content(chunk_size=PROBE_RANGE_BYTES), b"")
+        if b"%PDF-" in first_chunk[:20] or (method == "head" and "pdf" in content_type.lower()):
+            result["Class"] = PDF
+        elif "html" in content_type.lower() or first_chunk.lstrip()[:1] == b"<":
+            result["Class"] = HTML
+        else:
+            result["Class"] = OTHER
+        if result["Size"] and result["Size"] > max_size_mb * 1024 * 1024:
+            result["Class"] = OVERSIZED
+    except requests.exceptions.RequestException as e:
+        result["Latency"] = round(time.monotonic() - started, 4)
+        result["Error"] = f"{type(e).__name__}: {e}"
+        if _is_name_error(e):
+            result["Class"] = DEAD
+    finally:
+        if resp is not None:
+            resp.close()
+    return result
+
+
+def _is_name_error(error):
+    # True if a socket.gaierror for an unknown host is somewhere in the
+    # chain (requests wraps it in urllib3's MaxRetryError/NameResolutionError)
+    seen = set()
+    pending = [error]
+    while pending:
+        error = pending.pop()
+        if not isinstance(error, BaseException) or id(error) in seen:
+            continue
+        seen.add(id(error))
+        if isinstance(error, socket.gaierror) and error.errno in _NAME_ERRORS:
+            return True
+        pending.extend(error.args)
+        pending.extend((getattr(error, "reason", None), error.__cause__, error.__context__))
+    return False
+
+
+def _response_size(resp):
+    # Full size from Content-Range ("bytes 0-1023/52341") or Content-Length
+    content_range = resp.headers.get("Content-Range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1].strip()
+        return int(total) if total.isdigit() else None
+    if resp.status_code == 200 and resp.headers.get("Content-Length", "").isdigit():
+        return int(resp.headers["Content-Length"])
+    return None
+
+
+# ---------------------
+# Triage Table
+# ---------------------
+class TriageTable:
+    """
+    Probe results per URL, kept in a CSV file (see TRIAGE_COLUMNS).
+    Written by run_downloader(probe=True); a later full run reads it to
+    skip dead links and to schedule expensive downloads first.
+    Entries are appended and flushed one by one, so an interrupted probe
+    resumes where it stopped.
+    """
+
+    def __init__(self, path):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.path = Path(path)
+        self.entries = {}                 # url -> row dict
+        self._lock = threading.Lock()
+        if self.path.is_file():
+            with open(self.path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    self.entries[row["URL"]] = row
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def get(self, url):
+        return self.entries.get(url) if url else None
+
+    def add(self, brnum, result):
+        """
+        Appends one probe result (from probe_url).
+        """
+        row = {**dict.fromkeys(TRIAGE_COLUMNS), **result, "BRnum": brnum, "Probed": datetime.now().isoformat(timespec="seconds")}
+        with self._lock:
+            self.entries[row["URL"]] = {k: "" if v is None else str(v) for k, v in row.items()}
+            try:
+                write_header = not self.path.exists()
+                if self.path.parent != Path(""):
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=TRIAGE_COLUMNS)
+                    if write_header:
+                        writer.writeheader()
+                    writer.writerow(row)
+            except OSError as e:
+                self.logger.warning(f"Failed to write triage table {self.path}: {e}")
+
+    def is_dead(self, url):
+        entry = self.get(url)
+        return entry is not None and entry["Class"] == DEAD
+
+    def cost(self, url):
+        """
+        Expected seconds to download `url`: probe latency plus size at
+        ASSUMED_RATE. Unprobed links count as an average PDF.
+        """
+        entry = self.get(url)
+        if entry is None:
+            return ASSUMED_SIZE / ASSUMED_RATE
+        latency = float(entry["Latency"] or 0)
+        size = int(entry["Size"]) if entry["Size"] else ASSUMED_SIZE
+        return latency + size / ASSUMED_RATE
+
+    def counts(self):
+        """
+        Returns {class: number of URLs}.
+        """
+        counts = {}
+        for entry in self.entries.values():
+            counts[entry["Class"]] = counts.get(entry["Class"], 0) + 1
+        return counts
+
+
+def read_triage(path):
+    """
+    Reads a triage table into a list of dicts (empty if the file is missing).
+    """
+    if not os.path.isfile(path):
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
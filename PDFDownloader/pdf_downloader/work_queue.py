@@ -0,0 +1,157 @@
+# work_queue.py
+
+import sys
+from array import array
+
+# ---------------------
+# Constants
+# ---------------------
+# Host id of rows without a host
+NO_HOST = -1
+
+
+class StringColumn:
+    """
+    Append-only column of strings packed into one UTF-8 buffer, with the
+    end offset of each value in an array. About the string's length in
+    bytes plus 8 per value, instead of a str object (49+ bytes) and a
+    pointer per value. Empty strings and None are both stored as empty
+    and read back as None.
+    """
+
+    __slots__ = ("_data", "_ends")
+
+    def __init__(self):
+        self._data = bytearray()
+        self._ends = array("Q")
+
+    def append(self, value):
+        if value:
+            self._data += value.encode("utf-8")
+        self._ends.append(len(self._data))
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __getitem__(self, i):
+        start = self._ends[i - 1] if i > 0 else 0
+        end = self._ends[i]
+        return self._data[start:end].decode("utf-8") if end > start else None
+
+    def nbytes(self):
+        return len(self._data) + self._ends.itemsize * len(self._ends)
+
+
+class WorkQueue:
+    """
+    Compact store of the pending rows of a lookahead window: BRnum,
+    primary and secondary URL in StringColumns, and the host as an index
+    into a table of interned host names. The schedule is an array of row
+    indices set by reorder(), so ordering moves 4 bytes per row instead of
+    copying a DataFrame.
+
+    Iterating yields (brnum, primary_url, secondary_url, host) tuples in
+    schedule order, built one at a time as rows are submitted. BRnums that
+    are not strings (e.g. numbers read from Excel) keep their type.
+
+    Example usage:
+        queue = WorkQueue.from_columns(brnums, primary_urls, secondary_urls, hosts)
+        queue.reorder(interleave_by_host(range(len(queue)), queue.hosts()))
+        for brnum, primary_url, secondary_url, host in queue:
+            submit(...)
+    """
+
+    __slots__ = (
+        "brnums", "primary", "secondary", "_other_brnums",
+        "_host_ids", "_host_names", "_host_index", "_order"
+    )
+
+    def __init__(self):
+        self.brnums = StringColumn()
+        self.primary = StringColumn()
+        self.secondary = StringColumn()
+        self._other_brnums = {}           # row -> BRnum that is not a str
+        self._host_ids = array("i")
+        self._host_names = []             # host id -> name
+        self._host_index = {}             # name -> host id
+        self._order = None                # schedule position -> row index
+
+    @classmethod
+    def from_columns(cls, brnums, primary_urls, secondary_urls, hosts):
+        """
+        Builds a queue from parallel sequences (e.g. _column_values of a
+        normalized chunk). Missing values are None.
+        """
+        queue = cls()
+        for row in zip(brnums, primary_urls, secondary_urls, hosts):
+            queue.append(*row)
+        return queue
+
+    def append(self, brnum, primary_url, secondary_url, host):
+        if brnum is not None and not isinstance(brnum, str):
+            self._other_brnums[len(self)] = brnum
+            brnum = None
+        self.brnums.append(brnum)
+        self.primary.append(primary_url)
+        self.secondary.append(secondary_url)
+        if not host:
+            self._host_ids.append(NO_HOST)
+            return
+        host_id = self._host_index.get(host)
+        if host_id is None:
+            host_id = self._host_index[host] = len(self._host_names)
+            self._host_names.append(host)
+        self._host_ids.append(host_id)
+
+    def __len__(self):
+        return len(self._host_ids)
+
+    def host(self, row):
+        host_id = self._host_ids[row]
+        return self._host_names[host_id] if host_id != NO_HOST else None
+
+    def hosts(self):
+        """
+        Returns the host of every row (in row order, not schedule order);
+        equal hosts are the same str object.
+        """
+        names = self._host_names
+        return [names[i] if i != NO_HOST else None for i in self._host_ids]
+
+    def brnum(self, row):
+        if row in self._other_brnums:
+            return self._other_brnums[row]
+        return self.brnums[row]
+
+    def row(self, row):
+        return self.brnum(row), self.primary[row], self.secondary[row], self.host(row)
+
+    def reorder(self, order):
+        """
+        Sets the schedule: `order` lists the row indices in the order they
+        are to be handed out.
+        """
+        self._order = array("I", order)
+        if len(self._order) != len(self):
+            raise ValueError(f"Order has {len(self._order)} rows, queue has {len(self)}.")
+
+    def scheduled(self, position):
+        """
+        Returns the row index handed out at schedule `position`.
+        """
+        return self._order[position] if self._order is not None else position
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self.row(self.scheduled(position))
+
+    def nbytes(self):
+        """
+        Approximate memory held by the queue, in bytes.
+        """
+        total = self.brnums.nbytes() + self.primary.nbytes() + self.secondary.nbytes()
+        total += self._host_ids.itemsize * len(self._host_ids)
+        total += sum(sys.getsizeof(name) for name in self._host_names)
+        if self._order is not None:
+            total += self._order.itemsize * len(self._order)
+        return total
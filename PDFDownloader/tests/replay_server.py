@@ -0,0 +1,186 @@
+import argparse
+import os
+import sys
+import time
+from collections import OrderedDict
+from flask import Flask, Response, redirect, request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_downloader.trace import read_trace  # noqa: E402
+
+# Replays a trace recorded with run_downloader(trace_file=...) / cli.py --trace:
+# every recorded URL gets a local endpoint that answers with the same redirect
+# hops, status code, headers, time-to-first-byte, body size and transfer time,
+# with a synthetic PDF (or filler for non-PDF bodies) instead of the content.
+#
+#   python tests/replay_server.py trace.jsonl --workbook replay.xlsx
+#   python cli.py replay.xlsx --output-folder /tmp/replay_pdfs
+
+REPLAY_PORT = 12340
+STREAM_CHUNK = 16 * 1024
+# Headers recreated by the replay server itself
+_SKIP_HEADERS = {"Content-Length", "Content-Encoding"}
+
+
+def synthetic_pdf(size):
+    """
+    Returns a valid one-page PDF of exactly `size` bytes (or the smallest
+    possible PDF, if `size` is smaller), padded with a stream object.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>",
+    ]
+
+    def build(pad):
+        out = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        offsets.append(len(out))
+        out += b"4 0 obj\n<< /Length %d >>\nstream\n" % pad + b"0" * pad + b"\nendstream\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 5\n0000000000 65535 f \n"
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size 5 /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % xref
+        return bytes(out)
+
+    pad = max(0, size - len(build(0)))
+    pdf = build(pad)
+    while len(pdf) > size and pad > 0:
+        pad = max(0, pad - (len(pdf) - size))
+        pdf = build(pad)
+    # Whitespace after %%EOF is ignored by PDF readers
+    return pdf + b"\n" * max(0, size - len(pdf))
+
+
+def filler_body(size, content_type):
+    """
+    Returns `size` bytes of filler for a non-PDF body.
+    """
+    prefix = b"<html><body>" if "html" in (content_type or "") else b""
+    return (prefix + b" " * size)[:size]
+
+
+def build_plan(entries):
+    """
+    Groups trace entries by (brnum, url): one replay endpoint per recorded
+    URL, with its last GET and HEAD entries. Returns a list of dicts with
+    'brnum', 'url', 'get' and 'head', in the order they were first seen.
+    """
+    plan = OrderedDict()
+    for entry in entries:
+        key = (entry.get("brnum"), entry.get("url"))
+        item = plan.setdefault(key, {"brnum": key[0], "url": key[1], "get": None, "head": None})
+        if entry.get("method") == "HEAD":
+            item["head"] = entry
+        else:
+            item["get"] = entry
+    return list(plan.values())
+
+
+def create_replay_app(plan, speed=1.0):
+    """
+    Creates a Flask app serving /replay/<index> for every item of `plan`.
+    `speed` divides all recorded delays (2.0 replays twice as fast).
+    """
+    app = Flask("replay")
+
+    def delay(seconds):
+        if seconds and seconds > 0:
+            time.sleep(seconds / speed)
+
+    def respond(index, hop):
+        item = plan[index]
+        entry = (item["head"] if request.method == "HEAD" else None) or item["get"] or item["head"]
+        if entry is None:
+            return Response("Nothing recorded", status=404)
+
+        # Spread the time to the first byte over the redirect hops
+        redirects = entry.get("redirects") or []
+        ttfb = entry.get("ttfb") if entry.get("ttfb") is not None else entry.get("elapsed") or 0
+        delay(ttfb / (len(redirects) + 1))
+        if hop < len(redirects):
+            return redirect(f"/replay/{index}/hop/{hop + 1}", code=redirects[hop][0])
+
+        # Requests that got no response (DNS, connect or read errors)
+        status = entry.get("status")
+        if status is None:
+            return Response(entry.get("error") or "No response recorded", status=502)
+
+        headers = {k: v for k, v in (entry.get("headers") or {}).items() if k not in _SKIP_HEADERS}
+        content_type = headers.get("Content-Type", "application/pdf")
+        size = entry.get("bytes") or 0
+        if request.method == "HEAD" or status == 304:
+            recorded_length = (entry.get("headers") or {}).get("Content-Length")
+            if recorded_length is not None:
+                headers["Content-Length"] = recorded_length
+            return Response(status=status, headers=headers)
+
+        if entry.get("pdf") is False or (entry.get("pdf") is None and status >= 400):
+            body = filler_body(size, content_type)
+        else:
+            body = synthetic_pdf(size)
+        transfer_time = max(0.0, (entry.get("elapsed") or 0) - ttfb)
+
+        def stream():
+            for start in range(0, len(body), STREAM_CHUNK):
+                chunk = body[start:start + STREAM_CHUNK]
+                delay(transfer_time * len(chunk) / len(body))
+                yield chunk
+
+        headers["Content-Length"] = str(len(body))
+        return Response(stream(), status=status, headers=headers, content_type=content_type)
+
+    @app.route("/replay/<int:index>", methods=["GET", "HEAD"])
+    def replay(index):
+        return respond(index, 0)
+
+    @app.route("/replay/<int:index>/hop/<int:hop>", methods=["GET", "HEAD"])
+    def replay_hop(index, hop):
+        return respond(index, hop)
+
+    @app.route("/api/is_live")
+    def is_live():
+        return "OK", 200
+
+    return app
+
+
+def write_replay_workbook(plan, base_url, path):
+    """
+    Writes an input workbook with one row per recorded BRnum, whose
+    Pdf_URL (and Report Html Address, if a second URL was tried) point
+    at the replay endpoints.
+    """
+    import pandas as pd
+
+    rows = OrderedDict()
+    for index, item in enumerate(plan):
+        links = rows.setdefault(item["brnum"], [])
+        if len(links) < 2:
+            links.append(f"{base_url}/replay/{index}")
+
+    pd.DataFrame({
+        "BRnum": list(rows),
+        "Pdf_URL": [links[0] for links in rows.values()],
+        "Report Html Address": [links[1] if len(links) > 1 else None for links in rows.values()],
+    }).to_excel(path, index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded download trace locally.")
+    parser.add_argument("trace", help="Trace file written with cli.py --trace")
+    parser.add_argument("--port", type=int, default=REPLAY_PORT)
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay this many times faster")
+    parser.add_argument("--workbook", default=None, help="Write an input .xlsx pointing at the replay server")
+    args = parser.parse_args()
+
+    replay_plan = build_plan(read_trace(args.trace))
+    if args.workbook:
+        write_replay_workbook(replay_plan, f"http://127.0.0.1:{args.port}", args.workbook)
+        print(f"Wrote {args.workbook} for {len(replay_plan)} recorded URLs")
+
+    create_replay_app(replay_plan, speed=args.speed).run(debug=False, port=args.port, threaded=True, use_reloader=False)
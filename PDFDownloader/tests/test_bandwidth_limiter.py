@@ -0,0 +1,66 @@
+import os
+import time
+from pdf_downloader.downloader import attempt_download
+from pdf_downloader.transport import FakeTransport
+from utils.bandwidth_limiter import BandwidthLimiter, TokenBucket
+
+script_directory = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(script_directory, "empty.pdf"), "rb") as f:
+    pdf_valid_empty = f.read()
+
+
+def test_token_bucket_debt():
+    """
+    A burst passes at once; beyond it, waits follow the rate.
+    """
+    bucket = TokenBucket(rate=1000, burst=500, now=0.0)
+    assert bucket.take(500, now=0.0) == 0.0
+    assert bucket.take(250, now=0.0) == 0.25
+    assert bucket.take(250, now=0.0) == 0.5
+    # Half a second later the debt is paid back
+    assert bucket.take(0, now=0.5) == 0.0
+    # Tokens never exceed the burst
+    assert bucket.take(600, now=100.0) == 0.1
+
+
+def test_limiter_rates_and_report():
+    """
+    The slower of the global and host buckets decides, limits can be
+    changed at runtime, and the throttled time is summed.
+    """
+    limiter = BandwidthLimiter(rate=10_000_000, host_rate=1000, host_burst=1000)
+    assert limiter.throttle(1000, host="a.test") == 0.0
+    assert limiter.throttle(1000, host="b.test") == 0.0
+    assert 0.09 < limiter.throttle(100, host="b.test") <= 0.1
+
+    limiter.set_host_rate(1_000_000, host="a.test")
+    assert limiter.throttle(1000, host="a.test") < 0.01
+
+    limiter.set_rate(None)
+    limiter.set_host_rate(None)
+    limiter.set_host_rate(None, host="a.test")
+    assert not limiter.limited
+    assert limiter.throttle(10_000_000, host="a.test") == 0.0
+    assert limiter.throttled_seconds > 0
+    assert set(limiter.throttled_by_host) == {"b.test"}
+
+
+def test_download_is_shaped(tmp_path):
+    """
+    A download through the limiter takes at least size / rate seconds
+    beyond the burst, and the wait is reported.
+    """
+    transport = FakeTransport()
+    transport.add("http://fast.test/a.pdf", pdf_valid_empty)
+    limiter = BandwidthLimiter(rate=20_000, burst=1_000)
+
+    started = time.monotonic()
+    status, _ = attempt_download(
+        tmp_path / "a.pdf", "http://fast.test/a.pdf", "BRa", transport=transport, limiter=limiter
+    )
+    elapsed = time.monotonic() - started
+
+    assert status == "Success"
+    assert elapsed >= 0.14
+    assert 0.14 <= limiter.throttled_seconds <= elapsed
+    assert limiter.bytes == len(pdf_valid_empty)
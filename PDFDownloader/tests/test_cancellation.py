@@ -0,0 +1,96 @@
+import socket
+import threading
+import time
+from pathlib import Path
+from pdf_downloader.cancellation import CancelToken
+from pdf_downloader.downloader import attempt_download, download_single_pdf
+
+
+def _stalling_server():
+    """
+    Serves one PDF response that sends a first chunk and then stalls.
+    Returns (url, stop_event).
+    """
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    stop = threading.Event()
+
+    def serve():
+        while not stop.is_set():
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            conn.recv(65536)
+            body = b"%PDF-1.4\n" + b"x" * 4096
+            conn.sendall(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/pdf\r\n"
+                b"Content-Length: 1000000\r\n\r\n" + body
+            )
+            stop.wait(30)
+            conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+
+    def close():
+        stop.set()
+        listener.close()
+
+    return f"http://127.0.0.1:{listener.getsockname()[1]}/slow.pdf", close
+
+
+def test_cancel_token_callbacks():
+    """
+    Ensure callbacks run once on cancel, and at once when registered late.
+    """
+    token = CancelToken()
+    calls = []
+    with token.on_cancel(lambda: calls.append("a")):
+        token.cancel("stop")
+        token.cancel("again")
+    with token.on_cancel(lambda: calls.append("b")):
+        pass
+
+    assert calls == ["a", "b"]
+    assert token.cancelled
+    assert token.reason == "stop"
+
+
+def test_cancel_aborts_stalled_read(tmp_path):
+    """
+    A download stuck in a slow read stops within a second of the
+    cancellation, and leaves no partial file behind.
+    """
+    url, close = _stalling_server()
+    token = CancelToken()
+    result = {}
+
+    def run():
+        result["value"] = attempt_download(
+            tmp_path / "BRslow.pdf", url, "BRslow", validators={}, get_timeout=30, cancel_token=token
+        )
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    time.sleep(0.5)
+
+    started = time.monotonic()
+    token.cancel("test")
+    worker.join(timeout=5)
+    close()
+
+    assert not worker.is_alive()
+    assert time.monotonic() - started < 1.0
+    assert result["value"] == ("Cancelled", "test")
+    assert list(Path(tmp_path).iterdir()) == []
+
+
+def test_cancelled_token_skips_download(tmp_path):
+    """
+    Nothing is requested once the token is cancelled.
+    """
+    token = CancelToken()
+    token.cancel("stop")
+    status, info = download_single_pdf("BRx", "http://invalid.invalid/a.pdf", "http://invalid.invalid/b.pdf", tmp_path, cancel_token=token)
+    assert (status, info) == ("Cancelled", "stop")
@@ -0,0 +1,77 @@
+import io
+import subprocess
+import sys
+from queue import Queue
+from cli import build_parser
+from utils.terminal_progress import TerminalProgress
+
+
+def test_cli_does_not_import_tkinter():
+    """
+    The headless entry point must work on machines without a display,
+    so it may never pull in tkinter.
+    """
+    code = "import sys, cli; assert 'tkinter' not in sys.modules"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_startup_is_lazy():
+    """
+    Heavy dependencies are imported on first use, not at startup.
+    """
+    code = (
+        "import sys, cli, main; "
+        "loaded = [m for m in ('pandas', 'requests', 'PyPDF2', 'openpyxl') if m in sys.modules]; "
+        "assert not loaded, loaded"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_cli_options():
+    """
+    Ensure the performance knobs are parsed.
+    """
+    args = build_parser().parse_args([
+        "a.xlsx", "--workers", "16", "--chunk-size", "500", "--get-timeout", "5",
+        "--layout", "hash", "--max-success", "3", "--no-dns-cache", "--dns-prefetch-rows", "50",
+        "--no-parallel-read"
+    ])
+    assert args.xlsx_paths == ["a.xlsx"]
+    assert args.workers == 16
+    assert args.chunk_size == 500
+    assert args.get_timeout == 5.0
+    assert args.layout == "hash"
+    assert args.max_success == 3
+    assert args.no_dns_cache
+    assert args.dns_prefetch_rows == 50
+    assert args.parallel_read is False
+    assert build_parser().parse_args([]).parallel_read is None
+
+
+def test_max_success_must_be_positive(capsys):
+    """
+    --max-success 0 would stop before the first download, so it is rejected.
+    """
+    import pytest
+    for value in ("0", "-2"):
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(["--max-success", value])
+    assert "must be at least 1" in capsys.readouterr().err
+
+
+def test_terminal_progress_line():
+    """
+    Ensure queue messages are reflected in the progress line.
+    """
+    stream = io.StringIO()
+    progress = TerminalProgress(Queue(), stream=stream, max_success=10)
+    progress.handle(("thread_update", 1, "Downloading 42", 50))
+    progress.handle(("thread_update", 2, "Idle", 0))
+    progress.handle(("counters", 3, 1))
+
+    line = progress.format_line()
+    assert "ok 3/10" in line
+    assert "fail 1" in line
+    assert "active 1" in line
@@ -0,0 +1,127 @@
+import os
+import pandas as pd
+from pdf_downloader.downloader import diff_against_status, normalize_link_columns, run_downloader
+from pdf_downloader.transport import FakeTransport
+
+script_directory = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(script_directory, "empty.pdf"), "rb") as f:
+    pdf_valid_empty = f.read()
+
+
+def write_edition(path, rows):
+    pd.DataFrame(rows, columns=["BRnum", "Pdf_URL", "Report Html Address"]).to_excel(path, index=False)
+
+
+def test_only_new_and_changed_rows_are_scheduled(tmp_path):
+    """
+    A newer edition of the workbook only costs requests for new rows and
+    rows whose links changed; a stored PDF is kept if its new link fails.
+    """
+    transport = FakeTransport()
+    for name in ("a", "c", "c2", "d"):
+        transport.add(f"http://reports.test/{name}.pdf", pdf_valid_empty)
+    transport.add("http://reports.test/b2.pdf", pdf_valid_empty)
+    transport.add("http://reports.test/e2.pdf", b"", status=404)
+    options = dict(
+        output_folder=str(tmp_path / "pdfs"),
+        status_file=str(tmp_path / "status.xlsx"),
+        dev_mode=False,
+        transport=transport,
+        dns_cache=False,
+    )
+
+    write_edition(tmp_path / "v1.xlsx", [
+        ("BR_A", "http://reports.test/a.pdf", None),
+        ("BR_B", "http://reports.test/b.pdf", None),
+        ("BR_C", "http://reports.test/c.pdf", None),
+        ("BR_E", "http://reports.test/a.pdf", None),
+    ])
+    run_downloader([str(tmp_path / "v1.xlsx")], **options)
+    status = pd.read_excel(tmp_path / "status.xlsx").set_index("BRnum")
+    assert status.loc["BR_B", "Status"] == "Failure"
+    assert status.loc["BR_A", "Primary Link"] == "http://reports.test/a.pdf"
+    assert status.loc["BR_A", "Secondary Link"] == "-"
+
+    transport.requests.clear()
+    write_edition(tmp_path / "v2.xlsx", [
+        ("BR_A", "http://reports.test/a.pdf", None),
+        ("BR_B", "http://reports.test/b2.pdf", None),
+        ("BR_C", "http://reports.test/c.pdf", "http://reports.test/c2.pdf"),
+        ("BR_D", "http://reports.test/d.pdf", None),
+        ("BR_E", "http://reports.test/e2.pdf", None),
+    ])
+    run_downloader([str(tmp_path / "v2.xlsx")], **options)
+
+    requested = {url for _, url, _ in transport.requests}
+    assert "http://reports.test/a.pdf" not in requested
+    assert {"http://reports.test/b2.pdf", "http://reports.test/c.pdf", "http://reports.test/d.pdf"} <= requested
+    status = pd.read_excel(tmp_path / "status.xlsx").set_index("BRnum")
+    assert (status["Status"] == "Success").all()
+    assert status.loc["BR_C", "Secondary Link"] == "http://reports.test/c2.pdf"
+    assert "kept stored copy" in status.loc["BR_E", "Info"]
+    assert os.path.exists(tmp_path / "pdfs" / "BR_E.pdf")
+
+
+def test_rows_without_recorded_links_are_unchanged():
+    """
+    Status rows from before the links were recorded are not re-attempted.
+    """
+    df_status = pd.DataFrame({
+        "BRnum": ["BR1", "BR2"],
+        "Status": ["Success", "Failure"],
+        "Info": ["", ""],
+        "Primary Link": ["http://x.test/1.pdf", None],
+        "Secondary Link": ["-", None],
+    })
+    chunk = normalize_link_columns(pd.DataFrame({
+        "BRnum": ["BR1", "BR2", "BR3"],
+        "Pdf_URL": ["http://x.test/1b.pdf", "http://x.test/2b.pdf", "http://x.test/3.pdf"],
+    }))
+    pending, changed = diff_against_status(chunk, df_status)
+    assert list(pending["BRnum"]) == ["BR1", "BR3"]
+    assert changed == {"BR1"}
+
+
+def test_archive_layout_keeps_stored_members(tmp_path):
+    """
+    With an archive layout, changed rows already stored are not downloaded
+    again, so refreshes do not add duplicate members; changed rows that
+    failed before are still retried.
+    """
+    import csv
+    import zipfile
+
+    transport = FakeTransport()
+    for name in ("a", "a2", "b2"):
+        transport.add(f"http://reports.test/{name}.pdf", pdf_valid_empty)
+    options = dict(
+        output_folder=str(tmp_path / "pdfs"),
+        status_file=str(tmp_path / "status.csv"),
+        dev_mode=False,
+        transport=transport,
+        dns_cache=False,
+        output_layout="zip",
+    )
+
+    write_edition(tmp_path / "v1.xlsx", [
+        ("BR_A", "http://reports.test/a.pdf", None),
+        ("BR_B", "http://reports.test/b.pdf", None),
+    ])
+    run_downloader([str(tmp_path / "v1.xlsx")], **options)
+
+    transport.requests.clear()
+    write_edition(tmp_path / "v2.xlsx", [
+        ("BR_A", "http://reports.test/a2.pdf", None),
+        ("BR_B", "http://reports.test/b2.pdf", None),
+    ])
+    run_downloader([str(tmp_path / "v2.xlsx")], **options)
+
+    requested = {url for _, url, _ in transport.requests}
+    assert "http://reports.test/a2.pdf" not in requested
+    assert "http://reports.test/b2.pdf" in requested
+    with zipfile.ZipFile(tmp_path / "pdfs" / "pdfs-00001.zip") as zf:
+        assert sorted(zf.namelist()) == ["BR_A.pdf", "BR_B.pdf"]
+    with open(tmp_path / "pdfs" / "index.csv", newline="", encoding="utf-8") as f:
+        assert sorted(row["BRnum"] for row in csv.DictReader(f)) == ["BR_A", "BR_B"]
+    status = pd.read_csv(tmp_path / "status.csv").set_index("BRnum")
+    assert (status["Status"] == "Success").all()
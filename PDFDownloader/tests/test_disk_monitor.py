@@ -0,0 +1,44 @@
+import shutil
+from collections import namedtuple
+from utils.disk_monitor import DiskSpaceMonitor
+
+Usage = namedtuple("Usage", ["total", "used", "free"])
+MB = 1024 * 1024
+
+
+def test_disk_monitor_pauses_and_resumes(monkeypatch):
+    """
+    Ensure the monitor pauses below the threshold, and only resumes
+    once the free space is back above the resume threshold.
+    """
+    free = {"mb": 500}
+    monkeypatch.setattr(shutil, "disk_usage", lambda path: Usage(0, 0, free["mb"] * MB))
+
+    monitor = DiskSpaceMonitor(".", min_free_mb=100, resume_free_mb=200)
+    monitor.check()
+    assert not monitor.paused
+
+    free["mb"] = 50
+    monitor.check()
+    assert monitor.paused
+    assert not monitor.wait_for_space(timeout=0.01)
+
+    free["mb"] = 150
+    monitor.check()
+    assert monitor.paused
+
+    free["mb"] = 250
+    monitor.check()
+    assert not monitor.paused
+    assert monitor.wait_for_space(timeout=0.01)
+
+
+def test_disk_monitor_thread(monkeypatch):
+    """
+    Ensure the background thread starts and stops cleanly.
+    """
+    monkeypatch.setattr(shutil, "disk_usage", lambda path: Usage(0, 0, 10 * MB))
+
+    monitor = DiskSpaceMonitor(".", min_free_mb=100, interval=0.01).start()
+    assert monitor.paused
+    monitor.stop()
@@ -0,0 +1,158 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+import requests
+from pdf_downloader.dns_cache import DNSCache, DNSPrefetcher
+
+
+class StubResolver:
+    """
+    Offline stand-in for the system resolver: maps names to IPv4
+    addresses with a TTL, and counts lookups.
+    """
+
+    def __init__(self, records, delay=0.0):
+        self.records = records            # host -> (ip, ttl)
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, host):
+        self.calls.append(host)
+        time.sleep(self.delay)
+        if host not in self.records:
+            raise socket.gaierror(socket.EAI_NONAME, f"Name or service not known: {host}")
+        ip, ttl = self.records[host]
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (ip, 0))], ttl
+
+
+def test_ttl_and_negative_caching():
+    """
+    Addresses live for their TTL, failures for the negative TTL.
+    """
+    now = [0.0]
+    stub = StubResolver({"short.test": ("10.0.0.1", 5), "long.test": ("10.0.0.2", None)})
+    cache = DNSCache(lookup=stub, ttl=100, negative_ttl=30, clock=lambda: now[0])
+
+    for _ in range(3):
+        cache.resolve("short.test")
+        cache.resolve("long.test")
+        with pytest.raises(socket.gaierror):
+            cache.resolve("dead.test")
+    assert stub.calls == ["short.test", "long.test", "dead.test"]
+    assert cache.known("dead.test") is False
+
+    now[0] = 10.0
+    cache.resolve("short.test")
+    cache.resolve("long.test")
+    assert stub.calls.count("short.test") == 2
+    assert stub.calls.count("long.test") == 1
+
+    now[0] = 40.0
+    assert cache.known("dead.test") is None
+
+
+def test_concurrent_lookups_are_shared():
+    """
+    Threads asking for the same host wait for one lookup.
+    """
+    stub = StubResolver({"slow.test": ("10.0.0.3", 60)}, delay=0.1)
+    cache = DNSCache(lookup=stub)
+    threads = [threading.Thread(target=cache.resolve, args=("slow.test",)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stub.calls == ["slow.test"]
+
+
+def test_prefetch_fills_the_cache():
+    """
+    Prefetched hosts are known before anyone asks for them.
+    """
+    stub = StubResolver({"a.test": ("10.0.0.1", 60), "b.test": ("10.0.0.2", 60)})
+    cache = DNSCache(lookup=stub)
+    prefetcher = DNSPrefetcher(cache, workers=2)
+    prefetcher.prefetch(["a.test", "b.test", "a.test", "dead.test", None, "127.0.0.1"])
+
+    deadline = time.monotonic() + 2
+    while any(cache.known(h) is None for h in ("a.test", "b.test", "dead.test")) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    prefetcher.close()
+
+    assert sorted(stub.calls) == ["a.test", "b.test", "dead.test"]
+    assert cache.known("a.test") and cache.known("dead.test") is False
+
+
+def test_installed_cache_serves_requests():
+    """
+    Once installed, requests connects to the address from the cache.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"OK")
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub = StubResolver({"reports.test": ("127.0.0.1", 60)})
+    cache = DNSCache(lookup=stub).install()
+    try:
+        url = f"http://reports.test:{server.server_port}/"
+        assert requests.get(url, timeout=5).text == "OK"
+        assert requests.get(url, timeout=5).text == "OK"
+        with pytest.raises(requests.exceptions.ConnectionError):
+            requests.get("http://dead.test/", timeout=5)
+    finally:
+        cache.uninstall()
+        server.shutdown()
+
+    assert stub.calls == ["reports.test", "dead.test"]
+    assert socket.getaddrinfo != cache.getaddrinfo
+
+
+def test_failed_run_uninstalls_the_cache(tmp_path):
+    """
+    A run that raises still restores socket.getaddrinfo.
+    """
+    from pdf_downloader.downloader import run_downloader
+
+    def broken_source():
+        raise RuntimeError("unreadable workbook")
+        yield
+
+    cache = DNSCache(lookup=StubResolver({}))
+    with pytest.raises(RuntimeError):
+        run_downloader(
+            [], str(tmp_path / "pdfs"), str(tmp_path / "status.csv"), dev_mode=False,
+            dns_cache=cache, row_source=[broken_source()]
+        )
+    assert socket.getaddrinfo != cache.getaddrinfo
+
+
+def test_installs_are_counted():
+    """
+    Overlapping installs only restore the system resolver after the last
+    uninstall, whatever the order.
+    """
+    system = socket.getaddrinfo
+    first = DNSCache(lookup=StubResolver({}))
+    second = DNSCache(lookup=StubResolver({}))
+
+    first.install()
+    second.install()
+    second.uninstall()
+    assert socket.getaddrinfo == first.getaddrinfo
+    first.install()
+    first.uninstall()
+    assert socket.getaddrinfo == first.getaddrinfo
+    first.uninstall()
+    assert socket.getaddrinfo == system
+    first.uninstall()
+    assert socket.getaddrinfo == system
@@ -133,3 +133,21 @@ class TestDownloader:
         status, err = mock_download_url(url)
         assert status == "Success"
         cleanup()
+
+    def test_revalidate_not_modified(self):
+        """
+        Ensure that revalidating an unchanged file uses a conditional
+        request and keeps the stored copy.
+        """
+        meta = {}
+        status, err = download_single_pdf(test_brnum, mock_url("get_empty"), None, ".", meta=meta)
+        assert status == "Success"
+        assert meta["etag"] or meta["last_modified"]
+
+        validators = {key: meta[key] for key in ("url", "etag", "last_modified", "sha256")}
+        meta = {}
+        status, err = download_single_pdf(test_brnum, mock_url("get_empty"), None, ".", meta=meta, revalidate=validators)
+        assert status == "Success"
+        assert meta["not_modified"]
+        assert 4911 == os.path.getsize(test_filename)
+        cleanup()
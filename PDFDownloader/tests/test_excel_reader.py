@@ -1,5 +1,5 @@
 import os
-from utils.xlsx_chunk_reader import read_xlsx_in_chunks
+from utils.xlsx_chunk_reader import read_xlsx_in_chunks, count_xlsx_rows
 
 def test_excel_reader():
     """
@@ -20,3 +20,45 @@ def test_excel_reader():
         count += len(chunk["BRnum"])
         print(count)
     assert count == 21057
+
+
+def test_excel_reader_stops_after_last_chunk(tmp_path):
+    """
+    Later chunks must not re-read the header row as data,
+    or the generator never runs out of rows.
+    """
+    import pandas as pd
+
+    excel_file = tmp_path / "rows.xlsx"
+    pd.DataFrame({"BRnum": [f"R{i}" for i in range(25)]}).to_excel(excel_file, index=False)
+
+    brnums = []
+    for chunk in read_xlsx_in_chunks(excel_file, chunk_size=10):
+        brnums.extend(chunk["BRnum"])
+    assert brnums == [f"R{i}" for i in range(25)]
+
+
+def test_count_xlsx_rows(tmp_path):
+    """
+    The row count comes from the sheet's dimension element, with a scan of
+    the <row> elements as a fallback when the dimension is missing.
+    """
+    import re
+    import zipfile
+    import pandas as pd
+
+    excel_file = tmp_path / "rows.xlsx"
+    pd.DataFrame({"BRnum": [f"R{i}" for i in range(2500)], "Pdf_URL": "x"}).to_excel(excel_file, index=False)
+    assert count_xlsx_rows(excel_file) == 2500
+
+    # Same workbook without a <dimension> element
+    stripped = tmp_path / "no_dimension.xlsx"
+    with zipfile.ZipFile(excel_file) as src, zipfile.ZipFile(stripped, "w") as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data = re.sub(rb"<dimension [^>]*/>", b"", data)
+            dst.writestr(item, data)
+    assert count_xlsx_rows(stripped) == 2500
+
+    assert count_xlsx_rows(tmp_path / "missing.xlsx") is None
@@ -0,0 +1,121 @@
+import os
+from pdf_downloader.downloader import download_single_pdf
+from pdf_downloader.landing_page import LandingPageResolver, LinkScanner
+from pdf_downloader.transport import FakeTransport
+
+script_directory = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(script_directory, "empty.pdf"), "rb") as f:
+    pdf_valid_empty = f.read()
+
+page_url = "https://corp.test/ir/reports.html"
+landing_page = b"""<!DOCTYPE html><html><head>
+<link rel="canonical" href="https://corp.test/ir/reports.html">
+<meta http-equiv="refresh" content="30; URL='/ir/index.html'">
+</head><body>
+<a href="/files/brochure.pdf">Brochure</a>
+<a download href='/files/AR_2019.pdf'>Annual report 2019</a>
+<a href="/about">About us</a>
+<iframe src="viewer?file=/files/sr.pdf"></iframe>
+</body></html>"""
+
+
+def test_scanner_ranks_split_chunks():
+    """
+    Links are found even when tags are split across chunks, and the
+    report-looking PDF link ranks first.
+    """
+    scanner = LinkScanner(page_url)
+    for start in range(0, len(landing_page), 7):
+        scanner.feed(landing_page[start:start + 7])
+
+    assert scanner.ranked() == [
+        "https://corp.test/files/AR_2019.pdf",
+        "https://corp.test/files/brochure.pdf",
+        "https://corp.test/ir/viewer?file=/files/sr.pdf",
+        "https://corp.test/ir/index.html",
+    ]
+
+
+def test_scan_is_bounded():
+    """
+    Links after the first `scan_bytes` are not seen.
+    """
+    resolver = LandingPageResolver(scan_bytes=4096)
+    padding = b"<p>" + b" " * 8192 + b"</p>"
+    chunks = iter([padding, b'<a href="/late.pdf">late</a>'])
+    assert resolver.scan(page_url, b"<html>", chunks) == []
+    assert next(chunks, None) is not None
+
+
+def test_secondary_landing_page_is_resolved(tmp_path):
+    """
+    A secondary link to an HTML page downloads the best linked PDF,
+    and a rerun goes straight to it from the cache file.
+    """
+    transport = FakeTransport()
+    transport.add(page_url, landing_page, headers={"Content-Type": "text/html"})
+    transport.add("https://corp.test/files/AR_2019.pdf", b"<html>Moved</html>", headers={"Content-Type": "text/html"})
+    transport.add("https://corp.test/files/brochure.pdf", pdf_valid_empty)
+    cache_file = tmp_path / "landing.json"
+
+    resolver = LandingPageResolver(cache_file=cache_file)
+    status, info = download_single_pdf(
+        "BR1", None, page_url, tmp_path, transport=transport, landing_page_resolver=resolver
+    )
+    resolver.save()
+    assert status == "Success"
+    assert os.path.getsize(tmp_path / "BR1.pdf") == len(pdf_valid_empty)
+
+    transport.requests.clear()
+    rerun = LandingPageResolver(cache_file=cache_file)
+    assert rerun.lookup(page_url) == "https://corp.test/files/brochure.pdf"
+    status, info = download_single_pdf(
+        "BR2", None, page_url, tmp_path, transport=transport, landing_page_resolver=rerun
+    )
+    assert status == "Success"
+    assert page_url not in [url for _, url, _ in transport.requests]
+
+
+def test_landing_page_without_links(tmp_path):
+    """
+    A page without candidate links fails as before, and without a
+    resolver HTML still fails the signature check.
+    """
+    transport = FakeTransport()
+    transport.add(page_url, b"<html><body>Nothing here</body></html>", headers={"Content-Type": "text/html"})
+
+    status, info = download_single_pdf(
+        "BR1", None, page_url, tmp_path, transport=transport, landing_page_resolver=LandingPageResolver()
+    )
+    assert status == "Failure" and "without PDF links" in info
+
+    status, info = download_single_pdf("BR1", None, page_url, tmp_path, transport=transport)
+    assert status == "Failure" and "%PDF-" in info
+
+
+def test_cache_is_saved_when_the_run_fails(tmp_path):
+    """
+    Landing pages resolved before a run raises are kept in the cache file.
+    """
+    import pandas as pd
+    import pytest
+    from pdf_downloader.downloader import run_downloader
+
+    class BrokenQueue:
+        def put(self, message):
+            raise RuntimeError("queue closed")
+
+    def resolving_download(brnum, primary_url, secondary_url, output_folder, *args, landing_page_resolver=None,
+                           **kwargs):
+        landing_page_resolver.confirm(secondary_url, "https://corp.test/files/AR_2019.pdf")
+        return "Success", "resolved"
+
+    cache_file = tmp_path / "landing.json"
+    rows = pd.DataFrame({"BRnum": ["BR1"], "Pdf_URL": [None], "Report Html Address": [page_url]})
+    with pytest.raises(RuntimeError):
+        run_downloader(
+            [], str(tmp_path / "pdfs"), str(tmp_path / "status.csv"), dev_mode=False, dns_cache=False,
+            update_queue=BrokenQueue(), landing_page_resolver=LandingPageResolver(cache_file=cache_file),
+            row_source=[iter([rows])], download_fn=resolving_download
+        )
+    assert LandingPageResolver(cache_file=cache_file).lookup(page_url) == "https://corp.test/files/AR_2019.pdf"
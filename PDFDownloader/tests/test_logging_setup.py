@@ -0,0 +1,90 @@
+import gzip
+import json
+import logging
+from utils.logging_setup import FATAL_LEVEL_NUM, JsonLinesFormatter, LogRouter, LogSink
+
+
+def make_logger(name, router):
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.addHandler(router)
+    return logger
+
+
+def test_records_are_routed_once(tmp_path):
+    """
+    Each record lands in its level file and in all.log; levels without
+    a file only in all.log. Unused levels create no file.
+    """
+    router = LogRouter(tmp_path)
+    router.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    logger = make_logger("test_router_levels", router)
+
+    logger.info("hello")
+    logger.warning("careful")
+    logger.error("broken")
+    logger.log(FATAL_LEVEL_NUM, "dead")
+    router.close()
+
+    assert (tmp_path / "info.log").read_text() == "INFO hello\n"
+    assert (tmp_path / "warn.log").read_text() == "WARNING careful\n"
+    assert (tmp_path / "fatal.log").read_text() == "FATAL dead\n"
+    assert (tmp_path / "all.log").read_text().splitlines() == [
+        "INFO hello", "WARNING careful", "ERROR broken", "FATAL dead"
+    ]
+    assert not (tmp_path / "debug.log").exists()
+
+
+def test_rotation_compression_and_retention(tmp_path):
+    """
+    Full files are rotated into gzipped segments, and the oldest segments
+    are deleted beyond the retention cap.
+    """
+    router = LogRouter(tmp_path, max_bytes=1000, retention_bytes=600)
+    router.setFormatter(logging.Formatter("%(message)s"))
+    logger = make_logger("test_router_rotation", router)
+
+    for i in range(200):
+        logger.debug(f"line {i:04d} " + "x" * 40)
+    router.rotate()
+    router.close()
+
+    segments = sorted(p.name for p in tmp_path.iterdir() if p.name.endswith(".gz"))
+    assert segments, "no rotated segments"
+    assert all(p.name.endswith(".gz") or p.name in ("debug.log", "all.log") for p in tmp_path.iterdir())
+    assert sum((tmp_path / name).stat().st_size for name in segments) <= 600
+
+    # The newest segment holds the last lines
+    newest = max((tmp_path / name for name in segments), key=lambda p: p.stat().st_mtime)
+    with gzip.open(newest, "rt") as f:
+        assert f.read().splitlines()[-1].startswith("line 0199")
+
+
+def test_json_lines(tmp_path):
+    """
+    JSON-lines output has one compact object per record.
+    """
+    router = LogRouter(tmp_path, json_lines=True)
+    router.setFormatter(JsonLinesFormatter())
+    logger = make_logger("test_router_json", router)
+
+    logger.info("report %s saved", "BR1")
+    router.close()
+
+    entry = json.loads((tmp_path / "info.jsonl").read_text())
+    assert entry["l"] == "INFO"
+    assert entry["m"] == "report BR1 saved"
+    assert set(entry) == {"t", "l", "th", "m"}
+
+
+def test_rotation_counts_bytes(tmp_path):
+    """
+    Non-ASCII text is rotated by its encoded size, not its length.
+    """
+    path = tmp_path / "info.log"
+    sink = LogSink(str(path), max_bytes=100)
+    sink.write("æøå" * 20 + "\n")        # 121 bytes
+    sink.write("Ørsted A/S\n")
+    sink.flush()
+    assert path.read_text(encoding="utf-8") == "Ørsted A/S\n"
@@ -0,0 +1,41 @@
+import hashlib
+import os
+from pdf_downloader.manifest import ContentStore, Manifest, read_manifest
+
+
+def test_manifest_append_and_read(tmp_path):
+    """
+    Ensure manifest entries are appended with a single header.
+    """
+    path = tmp_path / "manifest.csv"
+    manifest = Manifest(path)
+    manifest.add("1", {"url": "http://a.com/1.pdf", "size": 10, "sha256": "ab", "pages": 2, "location": "1.pdf"})
+    manifest.add("2", {"url": "http://a.com/2.pdf", "size": 20, "sha256": "cd", "pages": 1, "location": "2.pdf"})
+
+    rows = read_manifest(path)
+    assert [r["BRnum"] for r in rows] == ["1", "2"]
+    assert rows[1]["SHA256"] == "cd"
+    assert rows[0]["Pages"] == "2"
+    assert read_manifest(tmp_path / "missing.csv") == []
+
+
+def test_content_store_dedup(tmp_path):
+    """
+    Ensure identical content is hardlinked to one stored object.
+    """
+    content = b"%PDF-1.4 same content"
+    sha = hashlib.sha256(content).hexdigest()
+    first = tmp_path / "1.pdf"
+    second = tmp_path / "2.pdf"
+    first.write_bytes(content)
+    second.write_bytes(content)
+
+    store = ContentStore(tmp_path / "store")
+    assert store.add(first, sha) is False
+    assert store.add(second, sha) is True
+    assert store.add(second, sha) is True
+
+    obj = store.object_path(sha)
+    assert os.path.samefile(obj, first)
+    assert os.path.samefile(obj, second)
+    assert second.read_bytes() == content
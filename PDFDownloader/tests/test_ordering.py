@@ -0,0 +1,121 @@
+import random
+from pdf_downloader.ordering import (
+    HostHistory, HostSpeedTracker, combine_weights, interleave_by_host, interleave_with_history
+)
+
+
+def test_interleave_spreads_hosts():
+    """
+    Ensure that rows from the same host are not scheduled back to back
+    while other hosts still have work.
+    """
+    hosts = ["a.com"] * 4 + ["b.com"] * 4 + ["c.com"] * 4
+    items = list(range(len(hosts)))
+
+    ordered = interleave_by_host(items, hosts, rng=random.Random(1))
+
+    assert sorted(ordered) == items
+    ordered_hosts = [hosts[i] for i in ordered]
+    for i in range(0, len(ordered_hosts), 3):
+        assert len(set(ordered_hosts[i:i + 3])) == 3
+
+
+def test_interleave_is_deterministic_under_seed():
+    """
+    Ensure the same seed always gives the same ordering.
+    """
+    hosts = [f"h{i % 7}.com" for i in range(100)] + [None] * 5
+    items = list(range(len(hosts)))
+
+    first = interleave_by_host(items, hosts, rng=random.Random(42))
+    second = interleave_by_host(items, hosts, rng=random.Random(42))
+    assert first == second
+
+
+def test_interleave_prefers_fast_hosts():
+    """
+    Ensure a host with twice the weight is emitted about twice as often.
+    """
+    hosts = ["fast.com"] * 20 + ["slow.com"] * 20
+    items = list(range(len(hosts)))
+
+    ordered = interleave_by_host(items, hosts, weights={"fast.com": 2.0}, rng=random.Random(0))
+
+    head = [hosts[i] for i in ordered[:15]]
+    assert head.count("fast.com") == 10
+
+
+def test_host_speed_weights():
+    """
+    Ensure weights are relative to the median speed and clamped.
+    """
+    tracker = HostSpeedTracker()
+    tracker.record("a.com", 1000, 1.0)
+    tracker.record("b.com", 4000, 1.0)
+    tracker.record("c.com", 100000, 1.0)
+    tracker.record("dead.com", 0, 30.0)
+
+    weights = tracker.weights()
+    assert weights["b.com"] == 1.0
+    assert weights["a.com"] == 0.25
+    assert weights["c.com"] == 4.0
+    assert weights["dead.com"] == 0.25
+
+
+def test_history_ranks_hosts_by_yield():
+    """
+    Ensure hosts that succeeded quickly in earlier runs outrank slow or
+    failing ones, and failing hosts are still scheduled.
+    """
+    rows = (
+        [("quick.com", "Success", 1.0, 50000)] * 5
+        + [("slow.com", "Success", 20.0, 50000)] * 5
+        + [("broken.com", "Failure", 30.0, 0)] * 5
+        + [("other.com", "Success", 4.0, None), (None, "Success", 1.0, 10), ("nan.com", "Failure", float("nan"), 0)]
+    )
+    history = HostHistory.from_rows(*zip(*rows))
+
+    assert "nan.com" not in history
+    assert history.stats["quick.com"].median_bytes == 50000
+    assert history.expected_yield("quick.com") > history.expected_yield("slow.com") > history.expected_yield("broken.com")
+    assert history.expected_yield("new.com") is None
+
+    weights = history.weights(["quick.com", "slow.com", "broken.com", "other.com"])
+    assert weights["quick.com"] == 4.0
+    assert weights["broken.com"] == 0.25
+
+
+def test_failing_hosts_rank_below_succeeding_ones():
+    """
+    Ensure a host that always fails fast is not preferred over one that
+    always succeeds slowly.
+    """
+    rows = (
+        [("dead.com", "Failure", 0.05, 0)] * 10
+        + [("reliable.com", "Success", 2.0, 1000000)] * 10
+        + [("fresh.com", "Success", 1.0, 500000)]
+    )
+    history = HostHistory.from_rows(*zip(*rows))
+
+    assert history.expected_yield("dead.com") < history.expected_yield("reliable.com")
+    weights = history.weights(["dead.com", "reliable.com", "fresh.com"])
+    assert weights["dead.com"] < weights["reliable.com"] <= weights["fresh.com"]
+
+
+def test_history_exploration_share():
+    """
+    Ensure hosts without history get `exploration` of the schedule, even
+    when each of them has a single row.
+    """
+    history = HostHistory.from_rows(["a.com", "b.com"], ["Success", "Success"], [1.0, 1.0], [1, 1])
+    hosts = ["a.com"] * 50 + ["b.com"] * 50 + [f"new{i}.com" for i in range(50)]
+    items = list(range(len(hosts)))
+
+    ordered = interleave_with_history(items, hosts, history, exploration=0.2, rng=random.Random(3))
+    assert sorted(ordered) == items
+    head = [hosts[i] for i in ordered[:50]]
+    assert sum(h.startswith("new") for h in head) == 10
+
+    ordered = interleave_with_history(items, hosts, history, exploration=0.0, rng=random.Random(3))
+    assert all(hosts[i].startswith("new") for i in ordered[100:])
+    assert combine_weights({"a.com": 2.0}, {"a.com": 0.5, "b.com": 3.0}) == {"a.com": 1.0, "b.com": 3.0}
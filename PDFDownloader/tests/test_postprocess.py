@@ -0,0 +1,88 @@
+import os
+import shutil
+import pandas as pd
+from pdf_downloader.downloader import run_downloader
+from pdf_downloader.postprocess import PostProcessor, extract_page_count, file_sha256
+from pdf_downloader.transport import FakeRoute, FakeTransport
+
+script_directory = os.path.dirname(os.path.abspath(__file__))
+empty_pdf = os.path.join(script_directory, "empty.pdf")
+corrupt_pdf = os.path.join(script_directory, "corrupt.pdf")
+
+
+def file_size(path):
+    return os.path.getsize(path)
+
+
+def test_results_are_cached_by_content(tmp_path):
+    """
+    A PDF is processed once; copies and later runs hit the cache.
+    """
+    copy = tmp_path / "copy.pdf"
+    shutil.copy(empty_pdf, copy)
+
+    post = PostProcessor(tmp_path / "cache", workers=1)
+    assert post.submit("BR1", empty_pdf)
+    post.close()
+    results = post.results(file_sha256(empty_pdf))
+    assert results["pages"] == {"result": 1}
+    assert results["metadata"]["result"]["Encrypted"] is False
+    assert "text" in results
+
+    rerun = PostProcessor(tmp_path / "cache", workers=1)
+    assert not rerun.submit("BR2", copy)
+    rerun.close()
+    assert (rerun.processed, rerun.cached) == (0, 1)
+
+
+def test_errors_and_custom_processors(tmp_path):
+    """
+    A failing processor records its error without hiding the others, and
+    processors added later only run for the results that are missing.
+    """
+    post = PostProcessor(tmp_path / "cache", processors=["pages"], workers=1)
+    post.submit("BRbad", corrupt_pdf)
+    post.close()
+    sha256 = file_sha256(corrupt_pdf)
+    assert "error" in post.results(sha256)["pages"]
+    assert post.failed == 1
+
+    post = PostProcessor(tmp_path / "cache", processors={"pages": extract_page_count, "size": file_size}, workers=1)
+    assert post.submit("BRbad", corrupt_pdf)
+    post.close()
+    results = post.results(sha256)
+    assert results["size"] == {"result": os.path.getsize(corrupt_pdf)}
+    assert "error" in results["pages"]
+
+
+def test_run_downloader_processes_new_downloads(tmp_path):
+    """
+    Fresh downloads are processed during the run; a rerun downloads
+    nothing and processes nothing.
+    """
+    rows = 6
+    pd.DataFrame({
+        "BRnum": [f"BR{i}" for i in range(rows)],
+        "Pdf_URL": [f"http://host.test/{i}.pdf" for i in range(rows)],
+        "Report Html Address": [None] * rows,
+    }).to_excel(tmp_path / "input.xlsx", index=False)
+    with open(empty_pdf, "rb") as f:
+        transport = FakeTransport(default=FakeRoute(f.read()))
+    options = dict(
+        xlsx_paths=[str(tmp_path / "input.xlsx")],
+        output_folder=str(tmp_path / "pdfs"),
+        status_file=str(tmp_path / "status.xlsx"),
+        dev_mode=False,
+        max_concurrent_workers=3,
+        transport=transport,
+        dns_cache=False,
+    )
+
+    post = PostProcessor(tmp_path / "cache", processors=["pages"], workers=1)
+    run_downloader(postprocess=post, **options)
+    assert post.processed == 1 and post.cached == rows - 1
+    assert post.results(file_sha256(empty_pdf))["pages"] == {"result": 1}
+
+    rerun = PostProcessor(tmp_path / "cache", processors=["pages"], workers=1)
+    run_downloader(postprocess=rerun, **options)
+    assert rerun.submitted == 0
@@ -0,0 +1,48 @@
+import io
+import pstats
+import threading
+import time
+from utils.profiler import SamplingProfiler, thread_group
+
+
+def _busy(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_thread_group():
+    """
+    Ensure numbered thread names are grouped together.
+    """
+    assert thread_group("DLWorker_3") == "DLWorker"
+    assert thread_group("Thread-2 (worker)") == "Thread"
+    assert thread_group("MainThread") == "MainThread"
+
+
+def test_profiler_writes_loadable_profiles(tmp_path):
+    """
+    Ensure a busy worker thread is sampled under its group, and that the
+    written pstats files load and collapsed stacks name the busy function.
+    """
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy, args=(stop,), name="DLWorker_0")
+
+    profiler = SamplingProfiler(interval=0.005).start()
+    worker.start()
+    time.sleep(0.3)
+    stop.set()
+    worker.join()
+    profiler.stop()
+
+    assert profiler.samples["DLWorker"] > 0
+
+    written = profiler.write(tmp_path)
+    assert (tmp_path / "DLWorker.wall.pstats").exists()
+    assert (tmp_path / "all.wall.pstats").exists()
+
+    stats = pstats.Stats(str(tmp_path / "DLWorker.wall.pstats"), stream=io.StringIO())
+    assert any(func[2] == "_busy" for func in stats.stats)
+
+    collapsed = (tmp_path / "DLWorker.wall.collapsed").read_text(encoding="utf-8")
+    assert "_busy" in collapsed
+    assert all(path.exists() for path in map(type(tmp_path), written))
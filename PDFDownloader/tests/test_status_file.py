@@ -22,3 +22,65 @@ def test_status_file():
     assert df.size == 3
     os.unlink(test_file_name)
 
+
+
+def test_host_history_from_status_file(tmp_path):
+    """
+    Finished rows keep their host, seconds and bytes, and the next run
+    builds its host history from them.
+    """
+    import pandas as pd
+    from pdf_downloader.downloader import _load_host_history, run_downloader
+    from pdf_downloader.transport import FakeTransport
+
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "empty.pdf"), "rb") as f:
+        pdf = f.read()
+    transport = FakeTransport()
+    transport.add("http://good.test/1.pdf", pdf)
+    transport.add("http://good.test/2.pdf", pdf)
+    transport.add("http://bad.test/3.pdf", b"", status=500)
+    pd.DataFrame({
+        "BRnum": ["BR1", "BR2", "BR3"],
+        "Pdf_URL": ["http://good.test/1.pdf", "http://good.test/2.pdf", "http://bad.test/3.pdf"],
+    }).to_excel(tmp_path / "input.xlsx", index=False)
+
+    run_downloader(
+        [str(tmp_path / "input.xlsx")], str(tmp_path / "pdfs"), str(tmp_path / "status.xlsx"),
+        dev_mode=False, transport=transport, dns_cache=False
+    )
+
+    df = load_or_create_status_file(str(tmp_path / "status.xlsx")).set_index("BRnum")
+    assert df.loc["BR1", "Host"] == "good.test" and df.loc["BR1", "Bytes"] == len(pdf)
+    assert df.loc["BR3", "Host"] == "bad.test" and df.loc["BR3", "Elapsed"] >= 0
+    history = _load_host_history(df.reset_index())
+    assert history.stats["good.test"].successes == 2
+    assert history.expected_yield("good.test") > history.expected_yield("bad.test")
+
+
+def test_csv_status_file_with_row_source(tmp_path):
+    """
+    A '.csv' status file is read and written as CSV, and rows from
+    `row_source` go through `download_fn` instead of the network.
+    """
+    import pandas as pd
+    from pdf_downloader.downloader import run_downloader
+
+    status_file = str(tmp_path / "status.csv")
+    save_status_file(update_status(load_or_create_status_file(status_file), "BR1", "Success", "ok"), status_file)
+    assert pd.read_csv(status_file)["BRnum"].tolist() == ["BR1"]
+
+    calls = []
+
+    def fake_download(brnum, primary_url, secondary_url, output_folder, *args, **kwargs):
+        calls.append(brnum)
+        return "Success", "fake"
+
+    chunks = [pd.DataFrame({"BRnum": ["BR1", "BR2"], "Pdf_URL": ["http://a.test/1.pdf", "http://a.test/2.pdf"]})]
+    run_downloader(
+        [], str(tmp_path / "pdfs"), status_file, dev_mode=False, dns_cache=False,
+        row_source=[iter(chunks)], download_fn=fake_download
+    )
+    assert calls == ["BR2"]
+    df = load_or_create_status_file(status_file).set_index("BRnum")
+    assert df.loc["BR2", "Info"] == "fake"
+    assert not os.path.exists(status_file + ".tmp")
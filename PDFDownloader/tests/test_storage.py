@@ -0,0 +1,164 @@
+import tarfile
+import zipfile
+from pathlib import Path
+import pytest
+from pdf_downloader.downloader import download_single_pdf, update_status, load_or_create_status_file
+from pdf_downloader.storage import make_output_layout
+
+
+def write_pdf(path, content=b"%PDF-1.4 test"):
+    path = Path(path)
+    path.write_bytes(content)
+    return path
+
+
+def test_sharded_layouts(tmp_path):
+    """
+    Ensure hash and prefix layouts place files in nested subdirectories.
+    """
+    hashed = make_output_layout(tmp_path, "hash")
+    path = hashed.path_for("12345")
+    assert path.name == "12345.pdf"
+    assert len(path.relative_to(tmp_path).parts) == 3
+    assert path.parent.is_dir()
+
+    prefixed = make_output_layout(tmp_path, "prefix", shard_depth=2, shard_width=2)
+    assert prefixed.path_for("12345").relative_to(tmp_path).as_posix() == "12/34/12345.pdf"
+    assert prefixed.path_for("7").relative_to(tmp_path).as_posix() == "7_/__/7.pdf"
+
+    write_pdf(prefixed.path_for("12345"))
+    assert prefixed.store("12345", prefixed.path_for("12345")) == "12/34/12345.pdf"
+    assert prefixed.locate("12345") == "12/34/12345.pdf"
+    assert prefixed.locate("99999") is None
+
+
+@pytest.mark.parametrize("fmt", ["zip", "tar"])
+def test_archive_layout(tmp_path, fmt):
+    """
+    Ensure archive layouts append files, roll over, and can be resumed from the index.
+    """
+    layout = make_output_layout(tmp_path, fmt, archive_max_mb=0)
+    for brnum in ["A", "B"]:
+        staged = write_pdf(layout.path_for(brnum))
+        location = layout.store(brnum, staged)
+        assert not staged.exists()
+        assert location.endswith(f":{brnum}.pdf")
+    layout.close()
+
+    archives = sorted(p.name for p in tmp_path.glob(f"pdfs-*.{fmt}"))
+    assert archives == [f"pdfs-00001.{fmt}", f"pdfs-00002.{fmt}"]
+
+    if fmt == "zip":
+        with zipfile.ZipFile(tmp_path / archives[0]) as zf:
+            assert zf.read("A.pdf").startswith(b"%PDF-")
+    else:
+        with tarfile.open(tmp_path / archives[0]) as tf:
+            assert tf.getnames() == ["A.pdf"]
+
+    resumed = make_output_layout(tmp_path, fmt)
+    assert resumed.locate("B") == f"pdfs-00002.{fmt}:B.pdf"
+    assert resumed.locate("C") is None
+
+
+def test_already_stored_is_skipped(tmp_path):
+    """
+    Ensure a PDF present in the layout is not downloaded again.
+    """
+    layout = make_output_layout(tmp_path, "hash")
+    write_pdf(layout.path_for("BRtest"))
+
+    meta = {}
+    status, info = download_single_pdf("BRtest", "http://invalid.invalid/x.pdf", None, tmp_path, meta=meta, layout=layout)
+    assert status == "Success"
+    assert meta["location"] == layout.locate("BRtest")
+
+
+def test_status_extra_fields(tmp_path):
+    """
+    Ensure extra status fields are added as columns, for new and existing rows.
+    """
+    df = load_or_create_status_file(str(tmp_path / "status.xlsx"))
+    df = update_status(df, "1", "Failure", "x")
+    df = update_status(df, "2", "Success", "", Location="2.pdf")
+    df = update_status(df, "1", "Success", "", Location="1.pdf")
+
+    assert list(df["Location"]) == ["1.pdf", "2.pdf"]
+
+
+def test_archive_layout_is_not_revalidated(tmp_path):
+    """
+    Ensure revalidating with an archive layout keeps the archived copy
+    instead of appending a second member.
+    """
+    from pdf_downloader.transport import FakeTransport
+
+    layout = make_output_layout(tmp_path, "zip")
+    layout.store("BR1", write_pdf(layout.path_for("BR1")))
+    transport = FakeTransport()
+    transport.add("http://reports.test/1.pdf", b"%PDF-1.4 changed")
+
+    validators = {"url": "http://reports.test/1.pdf", "etag": '"old"', "last_modified": None}
+    status, info = download_single_pdf(
+        "BR1", "http://reports.test/1.pdf", None, tmp_path, layout=layout,
+        revalidate=validators, transport=transport
+    )
+    layout.close()
+
+    assert status == "Success"
+    assert transport.requests == []
+    with zipfile.ZipFile(tmp_path / "pdfs-00001.zip") as zf:
+        assert zf.namelist() == ["BR1.pdf"]
+    assert (tmp_path / "index.csv").read_text(encoding="utf-8").count("BR1,") == 1
+
+
+def test_closed_archive_layout_refuses_files(tmp_path):
+    """
+    Ensure a download finishing after the run closed the layout does not
+    touch the archive.
+    """
+    layout = make_output_layout(tmp_path, "zip")
+    layout.store("A", write_pdf(layout.path_for("A")))
+    late = write_pdf(layout.path_for("B"))
+    layout.close()
+
+    with pytest.raises(RuntimeError):
+        layout.store("B", late)
+    assert not late.exists()
+    with zipfile.ZipFile(tmp_path / "pdfs-00001.zip") as zf:
+        assert zf.namelist() == ["A.pdf"]
+
+
+def test_damaged_archive_is_not_appended_to(tmp_path):
+    """
+    Ensure a zip left without its central directory (a killed run) is
+    followed by a new archive instead of being appended to.
+    """
+    layout = make_output_layout(tmp_path, "zip")
+    for brnum in ["A", "B"]:
+        layout.store(brnum, write_pdf(layout.path_for(brnum), b"%PDF-1.4 " + b"x" * 1000))
+    layout.close()
+    damaged = tmp_path / "pdfs-00001.zip"
+    damaged.write_bytes(damaged.read_bytes()[:1500])
+
+    resumed = make_output_layout(tmp_path, "zip")
+    assert resumed.store("C", write_pdf(resumed.path_for("C"))) == "pdfs-00002.zip:C.pdf"
+    resumed.close()
+    with zipfile.ZipFile(tmp_path / "pdfs-00002.zip") as zf:
+        assert zf.namelist() == ["C.pdf"]
+
+
+def test_stale_part_files_are_removed(tmp_path):
+    """
+    Ensure temp files left by an interrupted run are deleted, and PDFs kept.
+    """
+    from pdf_downloader.downloader import remove_stale_parts
+
+    layout = make_output_layout(tmp_path, "hash")
+    stored = write_pdf(layout.path_for("A"))
+    stale = [tmp_path / ".B.pdf.1a2b3c4d.part", layout.path_for("C").with_name(".C.pdf.5e6f7a8b.part")]
+    for path in stale:
+        path.write_bytes(b"%PDF-1.4 partial")
+
+    assert remove_stale_parts(tmp_path) == 2
+    assert stored.exists()
+    assert not any(path.exists() for path in stale)
@@ -0,0 +1,75 @@
+import io
+import threading
+import PyPDF2
+import pytest
+from werkzeug.serving import make_server
+from pdf_downloader.downloader import attempt_download
+from pdf_downloader.trace import TraceRecorder, read_trace
+from tests.replay_server import build_plan, create_replay_app, synthetic_pdf
+
+
+def recorded(brnum, url, status=200, size=5000, redirects=(), pdf=True, ttfb=0.05, elapsed=0.1):
+    return {
+        "brnum": brnum, "method": "GET", "url": url, "status": status,
+        "redirects": [list(hop) for hop in redirects], "headers": {"Content-Type": "application/pdf", "ETag": '"abc"'},
+        "ttfb": ttfb, "elapsed": elapsed, "bytes": size, "pdf": pdf, "error": None,
+    }
+
+
+@pytest.fixture
+def replay_server():
+    """
+    Serves a small recorded run: a plain PDF, a PDF behind two redirects,
+    an HTML page and a 404.
+    """
+    plan = build_plan([
+        recorded("BR1", "https://a.example/1.pdf", size=20000),
+        recorded("BR2", "https://b.example/2", redirects=[(301, "https://b.example/2"), (302, "https://c.example/x")]),
+        recorded("BR3", "https://d.example/page", pdf=False, size=800),
+        recorded("BR4", "https://e.example/gone.pdf", status=404, pdf=None, size=0),
+    ])
+    server = make_server("127.0.0.1", 0, create_replay_app(plan, speed=2.0), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_synthetic_pdf_size():
+    """
+    Synthetic PDFs have the requested size and are valid.
+    """
+    for size in (10, 700, 4096, 100000):
+        pdf = synthetic_pdf(size)
+        assert len(pdf) == max(size, len(synthetic_pdf(0)))
+        assert len(PyPDF2.PdfReader(io.BytesIO(pdf)).pages) == 1
+
+
+def test_record_and_replay(tmp_path, replay_server):
+    """
+    Downloading from the replay server with a recorder reproduces the
+    status, redirect hops, body size and PDF/non-PDF profile of the trace.
+    """
+    trace_file = tmp_path / "trace.jsonl"
+    recorder = TraceRecorder(trace_file)
+
+    results = {}
+    for index, brnum in enumerate(["BR1", "BR2", "BR3", "BR4"]):
+        results[brnum] = attempt_download(tmp_path / f"{brnum}.pdf", f"{replay_server}/replay/{index}", brnum, trace=recorder)
+
+    assert results["BR1"] == ("Success", "")
+    assert results["BR2"] == ("Success", "")
+    assert results["BR3"][0] == "Failure"
+    assert results["BR4"][0] == "Failure"
+
+    gets = {e["brnum"]: e for e in read_trace(trace_file) if e["method"] == "GET"}
+    heads = [e for e in read_trace(trace_file) if e["method"] == "HEAD"]
+    assert len(heads) == 4
+
+    assert gets["BR1"]["bytes"] == 20000 and gets["BR1"]["pdf"] is True
+    assert gets["BR1"]["headers"]["ETag"] == '"abc"'
+    assert [hop[0] for hop in gets["BR2"]["redirects"]] == [301, 302]
+    assert gets["BR3"]["pdf"] is False
+    assert gets["BR4"]["status"] == 404
+    assert gets["BR1"]["ttfb"] >= 0.02
+    assert all(e["elapsed"] >= e["ttfb"] for e in gets.values())
@@ -0,0 +1,107 @@
+from pdf_downloader.downloader import parse_thread_name_to_id
+from utils.transfer_stats import EWMARate, TransferStats
+
+
+def _update(stats, worker_id, now, text="Downloading", progress=0, **details):
+    stats.handle(("thread_update", worker_id, text, progress, details), now=now)
+
+
+def test_worker_ids_are_not_clamped():
+    """
+    Every worker of a large pool keeps its own ID.
+    """
+    assert parse_thread_name_to_id("DLWorker_0") == 1
+    assert parse_thread_name_to_id("DLWorker_249") == 250
+    assert parse_thread_name_to_id("MainThread") == 1
+
+
+def test_transfer_stats_summary():
+    """
+    Ensure active/retrying/queued counts, throughput and the host
+    histogram follow the queue messages.
+    """
+    stats = TransferStats(max_success=10)
+    stats.started = 0.0
+    stats._last_sample = (0.0, 0, 0)
+
+    for worker_id in range(1, 301):
+        host = "fast.example" if worker_id % 3 else "slow.example"
+        _update(stats, worker_id, 0.0, brnum=f"BR{worker_id}", host=host, phase="connecting")
+    _update(stats, 7, 1.0, brnum="BR7", host="other.example", phase="retrying")
+    stats.handle(("queue", 42))
+
+    assert stats.active == 300
+    assert stats.retrying == 1
+    assert stats.queued == 42
+    assert stats.host_histogram(2)[0] == ("fast.example", 199, 0)
+
+    # Worker 1 downloads 1000 bytes, then finishes
+    _update(stats, 1, 2.0, phase="downloading", bytes=600, total=1000)
+    _update(stats, 1, 3.0, phase="downloading", bytes=1000, total=1000)
+    stats.handle(("thread_update", 1, "Idle", 0), now=4.0)
+    stats.handle(("counters", 1, 0), now=4.0)
+
+    summary = stats.summary(now=10.0)
+    assert summary["active"] == 299
+    # Smoothed rates, weighted toward the idle last seconds
+    assert 90.0 < summary["bytes_per_s"] < 100.0
+    assert 0.09 < summary["files_per_s"] < 0.1
+    assert abs(summary["eta"] - 9 / summary["files_per_s"]) < 1e-6
+    assert summary["remaining"] is None
+    assert ("fast.example", 198, 1) in stats.host_histogram(10)
+
+    # Worker 7's retry ends
+    stats.handle(("thread_update", 7, "Idle", 0), now=11.0)
+    assert stats.retrying == 0
+
+
+def test_slowest_transfers():
+    """
+    Ensure only the N slowest running transfers are returned.
+    """
+    stats = TransferStats()
+    for worker_id in range(1, 101):
+        _update(stats, worker_id, 0.0, brnum=worker_id, host="h", phase="downloading", bytes=worker_id * 100)
+    stats.handle(("thread_update", 1, "Idle", 0), now=1.0)
+
+    slowest = stats.slowest(3, now=10.0)
+    assert [worker_id for worker_id, _ in slowest] == [2, 3, 4]
+
+    # Redraws without new messages reuse the ranking; an update refreshes it
+    assert stats.slowest(3, now=11.0) is slowest
+    stats.handle(("thread_update", 2, "Idle", 0), now=12.0)
+    assert [worker_id for worker_id, _ in stats.slowest(3, now=12.0)] == [3, 4, 5]
+
+
+def test_eta_from_total():
+    """
+    Ensure the pre-scanned total gives the remaining rows and an ETA
+    from the smoothed throughput.
+    """
+    stats = TransferStats()
+    stats.started = 0.0
+    stats._last_sample = (0.0, 0, 0)
+    stats.handle(("total", 100))
+    assert stats.eta(now=0.0) is None
+
+    for second in range(1, 21):
+        stats.handle(("counters", 2 * second, 0), now=float(second))
+
+    summary = stats.summary(now=20.0)
+    assert summary["remaining"] == 60
+    assert abs(summary["files_per_s"] - 2.0) < 1e-9
+    assert abs(summary["eta"] - 30.0) < 1e-6
+
+
+def test_ewma_rate_follows_changes():
+    """
+    Ensure the EWMA starts at the plain average and then moves toward
+    the recent rate.
+    """
+    rate = EWMARate(half_life=10.0)
+    rate.update(50, 10.0)
+    assert abs(rate.value - 5.0) < 1e-9
+
+    for _ in range(10):
+        rate.update(10, 10.0)
+    assert 1.0 < rate.value < 1.01
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+import pandas as pd
+import requests
+from pdf_downloader.cancellation import CancelToken
+from pdf_downloader.downloader import attempt_download, download_single_pdf, run_downloader
+from pdf_downloader.transport import FakeRoute, FakeTransport
+
+script_directory = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(script_directory, "empty.pdf"), "rb") as f:
+    pdf_valid_empty = f.read()
+with open(os.path.join(script_directory, "corrupt.pdf"), "rb") as f:
+    pdf_corrupt = f.read()
+
+base_url = "http://reports.test/api/"
+
+
+def fake_download(transport, tmp_path, endpoint, **options):
+    return download_single_pdf("BRtest", base_url + endpoint, None, tmp_path, transport=transport, **options)
+
+
+def test_simple_download(tmp_path):
+    """
+    Ensure that a download through the fake transport is stored.
+    """
+    transport = FakeTransport()
+    transport.add(base_url + "get_empty", pdf_valid_empty)
+
+    status, err = fake_download(transport, tmp_path, "get_empty")
+    assert status == "Success"
+    assert 4911 == os.path.getsize(tmp_path / "BRtest.pdf")
+    assert [method for method, _, _ in transport.requests] == ["HEAD", "GET"]
+
+
+def test_invalid_bodies_are_deleted(tmp_path):
+    """
+    Ensure that corrupted, empty and HTML bodies fail and leave no file.
+    """
+    transport = FakeTransport()
+    transport.add(base_url + "get_corrupted", pdf_corrupt)
+    transport.add(base_url + "get_zerosize", b"")
+    transport.add(base_url + "get_html", b"<html></html>", headers={"Content-Type": "text/html"})
+
+    for endpoint in ("get_corrupted", "get_zerosize", "get_html"):
+        status, err = fake_download(transport, tmp_path, endpoint)
+        assert status == "Failure"
+        assert list(tmp_path.iterdir()) == []
+
+
+def test_redirect_with_cookie(tmp_path):
+    """
+    Ensure that cookies set on a redirect are sent to its target.
+    """
+    transport = FakeTransport()
+    transport.add(base_url + "redir_with_cookie_set", redirect="get_empty_needs_cookie", set_cookies={"test_cookie": "1"})
+    transport.add(base_url + "get_empty_needs_cookie", pdf_valid_empty, require_cookies=["test_cookie"])
+
+    meta = {}
+    status, err = fake_download(transport, tmp_path, "redir_with_cookie_set", meta=meta)
+    assert status == "Success"
+    assert meta["url"] == base_url + "redir_with_cookie_set"
+
+    other = FakeTransport(default=transport.routes[base_url + "get_empty_needs_cookie"])
+    status, err = download_single_pdf("BRother", base_url + "get_empty_needs_cookie", None, tmp_path, transport=other)
+    assert status == "Failure"
+    assert "403" in err
+
+
+def test_secondary_link_after_error(tmp_path):
+    """
+    Ensure that a connection error on the primary link falls back to the secondary.
+    """
+    transport = FakeTransport()
+    transport.add(base_url + "down", error=requests.exceptions.ConnectionError("refused"))
+    transport.add(base_url + "get_empty", pdf_valid_empty)
+
+    status, err = download_single_pdf(
+        "BRtest", base_url + "down", base_url + "get_empty", tmp_path, transport=transport
+    )
+    assert status == "Success"
+    assert "refused" in err
+
+
+def test_timeouts(tmp_path):
+    """
+    Ensure that slow headers and stalled bodies hit the request timeouts.
+    """
+    transport = FakeTransport()
+    transport.add(base_url + "slow_headers", pdf_valid_empty, latency=5.0)
+    transport.add(base_url + "slow_body", pdf_valid_empty, rate=10)
+
+    started = time.monotonic()
+    status, err = attempt_download(tmp_path / "a.pdf", base_url + "slow_headers", "BRa", transport=transport, head_timeout=0.05, get_timeout=0.05)
+    assert status == "Failure" and "timed out" in err
+    status, err = attempt_download(tmp_path / "b.pdf", base_url + "slow_body", "BRb", transport=transport, validators={}, get_timeout=0.05)
+    assert status == "Failure"
+    assert time.monotonic() - started < 1.0
+
+
+def test_revalidate_not_modified(tmp_path):
+    """
+    Ensure that a conditional request for an unchanged file gets a 304.
+    """
+    transport = FakeTransport()
+    transport.add(base_url + "get_empty", pdf_valid_empty, etag='"v1"')
+
+    meta = {}
+    status, err = fake_download(transport, tmp_path, "get_empty", meta=meta)
+    assert status == "Success" and meta["etag"] == '"v1"'
+
+    validators = {key: meta[key] for key in ("url", "etag", "last_modified", "sha256")}
+    meta = {}
+    status, err = fake_download(transport, tmp_path, "get_empty", meta=meta, revalidate=validators)
+    assert status == "Success" and meta["not_modified"]
+    assert transport.requests[-1][2]["If-None-Match"] == '"v1"'
+
+
+def test_cancel_aborts_slow_body(tmp_path):
+    """
+    Ensure that a cancellation interrupts a slowly streamed body.
+    """
+    transport = FakeTransport()
+    transport.add(base_url + "slow", pdf_valid_empty, rate=2000)
+    token = CancelToken()
+    result = {}
+
+    worker = threading.Thread(target=lambda: result.update(value=attempt_download(
+        tmp_path / "slow.pdf", base_url + "slow", "BRslow", transport=transport, cancel_token=token
+    )))
+    worker.start()
+    time.sleep(0.1)
+    token.cancel("test")
+    worker.join(timeout=2)
+
+    assert result["value"] == ("Cancelled", "test")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_run_downloader_without_network(tmp_path):
+    """
+    Ensure that a whole run can be simulated in memory.
+    """
+    rows = 40
+    pd.DataFrame({
+        "BRnum": [f"BR{i}" for i in range(rows)],
+        "Pdf_URL": [f"http://host{i % 7}.test/{i}.pdf" for i in range(rows)],
+        "Report Html Address": [None] * rows,
+    }).to_excel(tmp_path / "input.xlsx", index=False)
+    transport = FakeTransport(default=FakeRoute(pdf_valid_empty, latency=0.001))
+
+    run_downloader(
+        xlsx_paths=[str(tmp_path / "input.xlsx")],
+        output_folder=str(tmp_path / "pdfs"),
+        status_file=str(tmp_path / "status.xlsx"),
+        dev_mode=False,
+        max_concurrent_workers=8,
+        transport=transport
+    )
+
+    status = pd.read_excel(tmp_path / "status.xlsx")
+    assert (status["Status"] == "Success").sum() == rows
+    assert len(list((tmp_path / "pdfs").iterdir())) == rows
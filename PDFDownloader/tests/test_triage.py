@@ -0,0 +1,142 @@
+import os
+import socket
+import pandas as pd
+import requests
+from pdf_downloader.downloader import run_downloader
+from pdf_downloader.ordering import interleave_by_host
+from pdf_downloader.transport import FakeTransport
+from pdf_downloader.triage import TriageTable, probe_url, read_triage
+
+script_directory = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(script_directory, "empty.pdf"), "rb") as f:
+    pdf_valid_empty = f.read()
+
+
+def make_transport():
+    transport = FakeTransport()
+    transport.add("http://a.test/report.pdf", pdf_valid_empty, headers={"Content-Type": "application/pdf"})
+    transport.add("http://a.test/big.pdf", b"%PDF-1.4" + b"\0" * 4 * 1024 * 1024)
+    transport.add("http://b.test/page.html", b"<html></html>", headers={"Content-Type": "text/html"})
+    transport.add("http://b.test/gone.pdf", b"", status=404)
+    transport.add("http://c.test/down.pdf", error=requests.exceptions.ConnectionError("refused"))
+    transport.add("http://c.test/busy.pdf", b"", status=503)
+    transport.add(
+        "http://nx.test/report.pdf",
+        error=requests.exceptions.ConnectionError(socket.gaierror(socket.EAI_NONAME, "Name or service not known"))
+    )
+    return transport
+
+
+def test_probe_classifies_links():
+    """
+    Each link gets one request and a class; oversized applies to PDFs
+    above the size limit.
+    """
+    transport = make_transport()
+    classes = {
+        url: probe_url(url, transport, max_size_mb=1)["Class"]
+        for url in ("http://a.test/report.pdf", "http://a.test/big.pdf", "http://b.test/page.html",
+                    "http://b.test/gone.pdf", "http://c.test/down.pdf", "http://c.test/busy.pdf",
+                    "http://nx.test/report.pdf")
+    }
+    assert classes == {
+        "http://a.test/report.pdf": "pdf",
+        "http://a.test/big.pdf": "oversized",
+        "http://b.test/page.html": "html",
+        "http://b.test/gone.pdf": "dead",
+        "http://c.test/down.pdf": "unknown",
+        "http://c.test/busy.pdf": "unknown",
+        "http://nx.test/report.pdf": "dead",
+    }
+    assert len(transport.requests) == 7
+    assert probe_url("http://a.test/report.pdf", transport, method="head")["Class"] == "pdf"
+    assert transport.requests[-1][0] == "HEAD"
+
+
+def test_table_round_trip_and_costs(tmp_path):
+    """
+    Results survive a reload, and bigger links cost more.
+    """
+    transport = make_transport()
+    table = TriageTable(tmp_path / "triage.csv")
+    table.add("BR1", probe_url("http://a.test/report.pdf", transport))
+    table.add("BR2", probe_url("http://a.test/big.pdf", transport))
+    table.add("BR3", probe_url("http://b.test/gone.pdf", transport))
+
+    reloaded = TriageTable(tmp_path / "triage.csv")
+    assert reloaded.counts() == {"pdf": 2, "dead": 1}
+    assert reloaded.is_dead("http://b.test/gone.pdf")
+    assert not reloaded.is_dead("http://a.test/report.pdf")
+    assert reloaded.cost("http://a.test/big.pdf") > reloaded.cost("http://a.test/report.pdf")
+    assert [row["BRnum"] for row in read_triage(tmp_path / "triage.csv")] == ["BR1", "BR2", "BR3"]
+
+
+def test_costs_put_expensive_rows_first():
+    """
+    With costs, each host's rows and the hosts themselves start with the
+    most expensive.
+    """
+    hosts = ["a.com", "a.com", "b.com", "b.com"]
+    costs = [1, 5, 2, 9]
+    ordered = interleave_by_host(range(4), hosts, costs=costs)
+    assert ordered == [3, 1, 2, 0]
+
+
+def test_probe_then_full_run(tmp_path):
+    """
+    A probe run writes the triage table without downloading; the full
+    run then skips rows whose links are all dead, and still tries links
+    whose probe failed for another reason.
+    """
+    pd.DataFrame({
+        "BRnum": ["BR1", "BR2", "BR3"],
+        "Pdf_URL": ["http://a.test/report.pdf", "http://b.test/gone.pdf", "http://c.test/down.pdf"],
+        "Report Html Address": [None, "http://a.test/report.pdf", None],
+    }).to_excel(tmp_path / "input.xlsx", index=False)
+    transport = make_transport()
+    options = dict(
+        xlsx_paths=[str(tmp_path / "input.xlsx")],
+        output_folder=str(tmp_path / "pdfs"),
+        status_file=str(tmp_path / "status.xlsx"),
+        dev_mode=False,
+        transport=transport,
+        triage_file=str(tmp_path / "triage.csv"),
+        dns_cache=False,
+    )
+
+    counts = run_downloader(probe=True, **options)
+    assert counts == {"pdf": 1, "dead": 1, "unknown": 1}
+    assert not os.path.exists(tmp_path / "pdfs")
+    assert {method for method, _, _ in transport.requests} == {"GET"}
+
+    transport.requests.clear()
+    run_downloader(**options)
+    status = pd.read_excel(tmp_path / "status.xlsx").set_index("BRnum")
+    assert status.loc["BR1", "Status"] == "Success"
+    assert status.loc["BR2", "Status"] == "Success"
+    assert status.loc["BR3", "Status"] == "Failure"
+    assert "Dead link (probe)" not in status.loc["BR3", "Info"]
+    requested = {url for _, url, _ in transport.requests}
+    assert "http://b.test/gone.pdf" not in requested
+    assert "http://c.test/down.pdf" in requested
+
+
+def test_probe_survives_unexpected_errors(tmp_path):
+    """
+    An error other than a RequestException marks that link unknown
+    instead of aborting the probe.
+    """
+    pd.DataFrame({
+        "BRnum": ["BR1", "BR2"],
+        "Pdf_URL": ["http://a.test/report.pdf", "http://d.test/odd.pdf"],
+    }).to_excel(tmp_path / "input.xlsx", index=False)
+    transport = make_transport()
+    transport.add("http://d.test/odd.pdf", error=ValueError("bad header"))
+
+    counts = run_downloader(
+        xlsx_paths=[str(tmp_path / "input.xlsx")], output_folder=str(tmp_path / "pdfs"),
+        status_file=str(tmp_path / "status.xlsx"), transport=transport,
+        triage_file=str(tmp_path / "triage.csv"), probe=True
+    )
+    assert counts == {"pdf": 1, "unknown": 1}
+    assert "ValueError" in TriageTable(tmp_path / "triage.csv").get("http://d.test/odd.pdf")["Error"]
@@ -0,0 +1,53 @@
+import pandas as pd
+from pdf_downloader.downloader import (
+    normalize_link_columns,
+    normalize_url,
+    PRIMARY_LINK_COL,
+    SECONDARY_LINK_COL,
+    HOST_COL,
+)
+
+
+def test_normalize_url():
+    """
+    Ensure single urls are cleaned the same way as the chunk columns.
+    """
+    assert normalize_url(" https://a.com/x.pdf\u200b ") == "https://a.com/x.pdf"
+    assert normalize_url("www.a.com/x.pdf") == "http://www.a.com/x.pdf"
+    assert normalize_url("127.0.0.1:12333/api/get_empty") == "http://127.0.0.1:12333/api/get_empty"
+    assert normalize_url("//a.com/my report.pdf") == "http://a.com/my%20report.pdf"
+    assert normalize_url("nan") is None
+    assert normalize_url("ftp://a.com/x.pdf") is None
+    assert normalize_url("not a link") is None
+    assert normalize_url(float("nan")) is None
+
+
+def test_normalize_link_columns():
+    """
+    Ensure a chunk is normalized in one pass, and the host is extracted
+    from the primary link with the secondary link as fallback.
+    """
+    df = pd.DataFrame({
+        "BRnum": ["1", "2", "3", "4"],
+        PRIMARY_LINK_COL: ["HTTPS://A.com/x.pdf", "nan", "b.org/y.pdf", None],
+        SECONDARY_LINK_COL: [None, "http://C.net:8080/z", "garbage", "\ufeff"],
+    })
+
+    out = normalize_link_columns(df)
+
+    primary = out[PRIMARY_LINK_COL].tolist()
+    assert primary[0] == "HTTPS://A.com/x.pdf"
+    assert pd.isna(primary[1])
+    assert primary[2] == "http://b.org/y.pdf"
+    assert pd.isna(primary[3])
+
+    assert pd.isna(out[SECONDARY_LINK_COL][2])
+    assert pd.isna(out[SECONDARY_LINK_COL][3])
+
+    hosts = out[HOST_COL].tolist()
+    assert hosts[:3] == ["a.com", "c.net", "b.org"]
+    assert pd.isna(hosts[3])
+
+    for url, raw in zip(out[PRIMARY_LINK_COL], df[PRIMARY_LINK_COL]):
+        expected = normalize_url(raw)
+        assert (pd.isna(url) and expected is None) or url == expected
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from pdf_downloader.work_queue import StringColumn, WorkQueue
+
+
+def test_string_column_round_trip():
+    """
+    Ensure values come back unchanged, with empty strings and None as None.
+    """
+    column = StringColumn()
+    values = ["BR1", None, "", "https://hôst.example/rapport é.pdf", "x"]
+    for value in values:
+        column.append(value)
+    assert [column[i] for i in range(len(column))] == ["BR1", None, None, values[3], "x"]
+    assert column.nbytes() == len("BR1x".encode()) + len(values[3].encode()) + 8 * len(values)
+
+
+def test_queue_interns_hosts_and_follows_order():
+    """
+    Ensure rows are handed out in schedule order, hosts are shared objects
+    and non-string BRnums keep their type.
+    """
+    rows = [
+        ("BR1", "http://a.test/1.pdf", None, "a.test"),
+        (np.int64(2), None, "http://b.test/2.html", "b.test"),
+        ("BR3", "http://a.test/3.pdf", "http://a.test/3.html", "a.test"),
+        (None, None, None, None),
+    ]
+    queue = WorkQueue.from_columns(*zip(*rows))
+    assert len(queue) == 4
+    assert list(queue) == rows
+    hosts = queue.hosts()
+    assert hosts[0] is hosts[2] and hosts[3] is None
+    assert queue.brnum(1) == 2 and not isinstance(queue.brnum(1), str)
+
+    queue.reorder([2, 0, 3, 1])
+    assert [row[0] for row in queue] == ["BR3", "BR1", None, 2]
+    assert queue.scheduled(0) == 2
+    with pytest.raises(ValueError):
+        queue.reorder([0, 1])
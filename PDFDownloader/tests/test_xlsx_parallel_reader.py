@@ -0,0 +1,83 @@
+import os
+import pandas as pd
+import pytest
+from pdf_downloader.downloader import HOST_COL, _read_lookahead, normalize_link_columns, run_downloader
+from pdf_downloader.transport import FakeRoute, FakeTransport
+from utils.xlsx_chunk_reader import read_xlsx_in_chunks
+from utils.xlsx_parallel_reader import ParallelXlsxReader
+
+script_directory = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(script_directory, "empty.pdf"), "rb") as f:
+    pdf_valid_empty = f.read()
+
+
+def write_workbooks(tmp_path, rows=(25, 12)):
+    paths = []
+    for n, count in enumerate(rows):
+        path = tmp_path / f"input{n}.xlsx"
+        pd.DataFrame({
+            "BRnum": [f"BR{n}-{i}" for i in range(count)],
+            "Pdf_URL": [f" host{i % 3}.test/{n}/{i}.pdf " for i in range(count)],
+            "Report Html Address": [None] * count,
+        }).to_excel(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def test_parallel_chunks_match_sequential(tmp_path):
+    """
+    Each generator yields the same normalized chunks as reading its file
+    in this process.
+    """
+    paths = write_workbooks(tmp_path)
+    with ParallelXlsxReader(paths, chunk_size=10, transform=normalize_link_columns) as reader:
+        parallel = [list(gen) for gen in reader.readers()]
+
+    for path, chunks in zip(paths, parallel):
+        expected = [normalize_link_columns(df) for df in read_xlsx_in_chunks(path, chunk_size=10)]
+        assert len(chunks) == len(expected)
+        for got, want in zip(chunks, expected):
+            pd.testing.assert_frame_equal(got, want)
+    assert parallel[0][0][HOST_COL].tolist()[:3] == ["host0.test", "host1.test", "host2.test"]
+
+
+def test_lookahead_combines_parallel_readers(tmp_path):
+    """
+    Reading round-robin from the parsers returns every row once.
+    """
+    paths = write_workbooks(tmp_path)
+    with ParallelXlsxReader(paths, chunk_size=5) as reader:
+        readers = reader.readers()
+        first = _read_lookahead(readers, 20)
+        rest = _read_lookahead(readers, 1000)
+    assert len(first) == 20
+    assert len(first) + len(rest) == 37
+    assert _read_lookahead([], 10).empty
+
+
+def test_parser_errors_are_raised(tmp_path):
+    """
+    A workbook that cannot be read fails its generator, not silently.
+    """
+    with ParallelXlsxReader([str(tmp_path / "missing.xlsx")]) as reader:
+        with pytest.raises(FileNotFoundError):
+            list(reader.readers()[0])
+
+
+def test_run_downloader_reads_workbooks_in_parallel(tmp_path):
+    """
+    A multi-file run downloads every row of every workbook.
+    """
+    paths = write_workbooks(tmp_path)
+    run_downloader(
+        xlsx_paths=paths,
+        output_folder=str(tmp_path / "pdfs"),
+        status_file=str(tmp_path / "status.xlsx"),
+        dev_mode=False,
+        max_concurrent_workers=4,
+        chunk_size=10,
+        transport=FakeTransport(default=FakeRoute(pdf_valid_empty)),
+        dns_cache=False
+    )
+    status = pd.read_excel(tmp_path / "status.xlsx")
+    assert (status["Status"] == "Success").sum() == 37
@@ -3,18 +3,36 @@
 import tkinter as tk
 from tkinter import ttk
 import logging
+import time
 from queue import Queue
 
+from utils.transfer_stats import TransferStats, format_duration, format_rate
+
+# Layout of the host histogram canvas
+HOST_ROW_HEIGHT = 18
+HOST_NAME_WIDTH = 200
+
 
 class DownloadApp(tk.Tk):
     """
     Tkinter GUI featuring:
       - Success/fail counters
-      - A row for each worker (thread) with progress bars & status text
+      - A job-wide progress bar (when the row total is known)
+      - A summary line: throughput, remaining rows, ETA, and the active,
+        queued and retrying transfers
+      - The `slowest_rows` slowest running transfers with progress bars
+      - A histogram of running/finished transfers for the top `host_rows` hosts
       - Black background and white text
+
+    Queue messages are folded into a TransferStats and the window is redrawn
+    at most every `refresh_ms`, with a fixed number of widgets, so it stays
+    responsive with hundreds of concurrent transfers.
     """
 
-    def __init__(self, update_queue, max_workers=3, max_success=10, dev_mode=True):
+    def __init__(
+        self, update_queue, max_workers=3, max_success=10, dev_mode=True,
+        slowest_rows=10, host_rows=8, refresh_ms=500
+    ):
         super().__init__()
         self.logger = logging.getLogger("DownloadApp")
 
@@ -23,11 +41,16 @@ class DownloadApp(tk.Tk):
         self.max_workers = max_workers
         self.max_success = max_success
         self.dev_mode = dev_mode
+        self.slowest_rows = slowest_rows
+        self.host_rows = host_rows
+        self.refresh_ms = refresh_ms
+        self.stats = TransferStats(max_success=max_success if dev_mode else None)
+        self._last_redraw = 0.0
         self._stopped = False
 
         # Basic window settings
         self.title("PDF Downloader - UI")
-        self.geometry("700x400")
+        self.geometry("800x600")
         self.configure(bg="black")
 
         # Counters for successes and failures
@@ -65,61 +88,151 @@ class DownloadApp(tk.Tk):
         )
         self.fail_label.pack(side=tk.LEFT, padx=10)
 
-        # Frame for worker rows
+        # Job-wide progress (rows processed out of the pre-scanned total)
+        self.job_progress_var = tk.DoubleVar(value=0)
+        ttk.Progressbar(
+            self,
+            orient="horizontal",
+            mode="determinate",
+            maximum=100,
+            variable=self.job_progress_var
+        ).pack(side=tk.TOP, fill=tk.X, padx=10, pady=2)
+
+        # Summary line: throughput, ETA and where the work is
+        self.summary_label = tk.Label(
+            self,
+            text="",
+            fg="white",
+            bg="black",
+            font=("Arial", 10),
+            anchor="w"
+        )
+        self.summary_label.pack(side=tk.TOP, fill=tk.X, padx=10)
+
+        # A fixed number of rows for the slowest running transfers, reused
+        # on every redraw, so the window does not grow with the worker count
         self.threads_frame = tk.Frame(self, bg="black")
         self.threads_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self._create_section_label(self.threads_frame, f"Slowest {self.slowest_rows} transfers")
 
-        # Dictionary to store UI elements for each worker
-        # Example: { 1: {"label": <tk.Label>, "progress_var": <IntVar>}, ... }
-        self.worker_rows = {}
+        # Example: [{"label": <tk.Label>, "progress_var": <IntVar>}, ...]
+        self.transfer_rows = [self._create_transfer_row(i) for i in range(self.slowest_rows)]
 
-        # Create rows for each potential worker
-        for w_id in range(1, self.max_workers + 1):
-            self._create_worker_row(w_id)
+        # Per-host histogram (running / finished transfers) on one canvas
+        hosts_frame = tk.Frame(self, bg="black")
+        hosts_frame.pack(fill=tk.X, padx=5, pady=5)
+        self._create_section_label(hosts_frame, f"Top {self.host_rows} hosts (running / finished)")
+        self.host_canvas = tk.Canvas(
+            hosts_frame,
+            height=(self.host_rows + 1) * HOST_ROW_HEIGHT + 4,
+            bg="black",
+            highlightthickness=0
+        )
+        self.host_canvas.pack(fill=tk.X, padx=5)
+        self.host_items = [self._create_host_row(i) for i in range(self.host_rows + 1)]
 
         # Start checking the queue periodically
         self.after(200, self.process_queue)
 
-    def _create_worker_row(self, worker_id):
+    def _create_section_label(self, parent, text):
+        label = tk.Label(parent, text=text, fg="gray70", bg="black", font=("Arial", 10, "bold"), anchor="w")
+        label.pack(fill=tk.X, padx=5)
+
+    def _create_transfer_row(self, index):
         """
-        Create a row in the UI for a given worker ID, with a label and progress bar.
+        Create one reusable row with a label and progress bar.
         """
         frame = tk.Frame(self.threads_frame, bg="black")
-        frame.pack(fill=tk.X, pady=2)
-
-        label = tk.Label(
-            frame,
-            text=f"Thread #{worker_id}: Idle",
-            fg="white",
-            bg="black",
-            font=("Arial", 10)
-        )
-        label.pack(side=tk.LEFT, padx=5)
+        frame.pack(fill=tk.X, pady=1)
 
         prog_var = tk.IntVar(value=0)
         prog_bar = ttk.Progressbar(
             frame,
             orient="horizontal",
-            length=200,
+            length=150,
             mode="determinate",
             maximum=100,
             variable=prog_var
         )
-        prog_bar.pack(side=tk.LEFT, padx=10)
+        prog_bar.pack(side=tk.LEFT, padx=5)
 
-        self.worker_rows[worker_id] = {
-            "label": label,
-            "progress_var": prog_var
-        }
+        label = tk.Label(
+            frame,
+            text="",
+            fg="white",
+            bg="black",
+            font=("Arial", 10),
+            anchor="w"
+        )
+        label.pack(side=tk.LEFT, fill=tk.X, padx=5)
 
-    def _update_thread(self, worker_id, status_text, progress):
+        return {"label": label, "progress_var": prog_var}
+
+    def _create_host_row(self, index):
         """
-        Update the status label and progress bar for a given worker.
+        Create the canvas items (name, running bar, finished bar) for one host.
         """
-        if worker_id in self.worker_rows:
-            row = self.worker_rows[worker_id]
-            row["label"].config(text=f"Thread #{worker_id}: {status_text}")
-            row["progress_var"].set(progress)
+        y = index * HOST_ROW_HEIGHT + 2
+        name = self.host_canvas.create_text(5, y + HOST_ROW_HEIGHT / 2, text="", fill="white", anchor="w", font=("Arial", 9))
+        running = self.host_canvas.create_rectangle(0, 0, 0, 0, fill="deep sky blue", width=0)
+        finished = self.host_canvas.create_rectangle(0, 0, 0, 0, fill="gray40", width=0)
+        count = self.host_canvas.create_text(0, y + HOST_ROW_HEIGHT / 2, text="", fill="white", anchor="w", font=("Arial", 9))
+        return name, running, finished, count
+
+    def _redraw(self):
+        """
+        Redraws the summary, the slowest transfers and the host histogram.
+        The amount of work does not depend on the number of workers.
+        """
+        now = time.monotonic()
+        summary = self.stats.summary(now)
+        self._update_counters(summary["success"], summary["fail"])
+
+        remaining = "?" if summary["remaining"] is None else summary["remaining"]
+        if summary["total"]:
+            self.job_progress_var.set(100 * (summary["total"] - summary["remaining"]) / summary["total"])
+        self.summary_label.config(text=(
+            f"Throughput: {format_rate(summary['bytes_per_s'])} ({summary['files_per_s']:.2f} files/s)   "
+            f"Remaining: {remaining}   "
+            f"ETA: {format_duration(summary['eta'])}   "
+            f"Active: {summary['active']}/{self.max_workers}   "
+            f"Queued: {summary['queued']}   "
+            f"Retrying: {summary['retrying']}"
+        ))
+
+        slowest = self.stats.slowest(self.slowest_rows, now)
+        for i, row in enumerate(self.transfer_rows):
+            if i < len(slowest):
+                worker_id, transfer = slowest[i]
+                row["label"].config(text=(
+                    f"#{worker_id} {transfer.status_text} "
+                    f"[{transfer.host or '?'}] {format_rate(transfer.rate(now))}"
+                ))
+                row["progress_var"].set(transfer.progress)
+            else:
+                row["label"].config(text="")
+                row["progress_var"].set(0)
+
+        hosts = self.stats.host_histogram(self.host_rows)
+        peak = max((running + finished for _, running, finished in hosts), default=0) or 1
+        bar_left = HOST_NAME_WIDTH
+        bar_width = max(50, self.host_canvas.winfo_width() - bar_left - 80)
+        for i, (name, running_bar, finished_bar, count) in enumerate(self.host_items):
+            y = i * HOST_ROW_HEIGHT + 2
+            if i < len(hosts):
+                host, running, finished = hosts[i]
+                running_right = bar_left + bar_width * running / peak
+                finished_right = running_right + bar_width * finished / peak
+                self.host_canvas.itemconfig(name, text=host[:30])
+                self.host_canvas.coords(running_bar, bar_left, y + 2, running_right, y + HOST_ROW_HEIGHT - 2)
+                self.host_canvas.coords(finished_bar, running_right, y + 2, finished_right, y + HOST_ROW_HEIGHT - 2)
+                self.host_canvas.coords(count, finished_right + 5, y + HOST_ROW_HEIGHT / 2)
+                self.host_canvas.itemconfig(count, text=f"{running} / {finished}")
+            else:
+                self.host_canvas.itemconfig(name, text="")
+                self.host_canvas.itemconfig(count, text="")
+                self.host_canvas.coords(running_bar, 0, 0, 0, 0)
+                self.host_canvas.coords(finished_bar, 0, 0, 0, 0)
 
     def _update_counters(self, success, fail):
         """
@@ -136,9 +249,13 @@ class DownloadApp(tk.Tk):
         """
         Periodically checks the update_queue for new messages and updates the UI.
         Message formats can be:
-            ("thread_update", worker_id, status_text, progress_val)
+            ("thread_update", worker_id, status_text, progress_val[, details])
             ("counters", success_count, fail_count)
+            ("queue", queued_rows)
+            ("total", rows_to_process)
             ("quit_ui", )
+        Messages only update the TransferStats; the widgets are redrawn at
+        most every `refresh_ms`.
         """
         if self._stopped:
             self.logger.debug("UI is stopped; no further queue processing.")
@@ -149,24 +266,13 @@ class DownloadApp(tk.Tk):
                 msg = self.update_queue.get_nowait()
                 mtype = msg[0]
 
-                if mtype == "thread_update":
-                    # Example: ("thread_update", worker_id, status, progress)
-                    _, worker_id, status_text, progress_val = msg
-                    self.logger.debug(f"Thread {worker_id} update: {status_text}, {progress_val}%")
-                    self._update_thread(worker_id, status_text, progress_val)
-
-                elif mtype == "counters":
-                    # Example: ("counters", success_count, fail_count)
-                    _, success, fail = msg
-                    self.logger.debug(f"Counter update: success={success}, fail={fail}")
-                    self._update_counters(success, fail)
-
-                elif mtype == "quit_ui":
+                if mtype == "quit_ui":
                     # Example: ("quit_ui", )
                     self.logger.info("Quit request received; closing the UI.")
                     self._on_close()
+                    return
 
-                else:
+                if not self.stats.handle(msg):
                     self.logger.warning(f"Unknown message type: {mtype}")
 
         except Exception as e:
@@ -174,6 +280,10 @@ class DownloadApp(tk.Tk):
             if not isinstance(e, queue.Empty):
                 self.logger.exception(f"Error processing queue: {e}")
 
+        if (time.monotonic() - self._last_redraw) * 1000 >= self.refresh_ms:
+            self._last_redraw = time.monotonic()
+            self._redraw()
+
         if not self._stopped:
             self.after(200, self.process_queue)
 
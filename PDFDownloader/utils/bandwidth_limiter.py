@@ -0,0 +1,153 @@
+# utils/bandwidth_limiter.py
+
+import logging
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket of `rate` bytes/second holding at most `burst` bytes
+    (default: one second's worth). Taking more than is available puts the
+    bucket in debt, and the caller waits until the debt is paid back, so
+    chunks larger than the burst still pass at the configured rate.
+    Not thread-safe on its own; BandwidthLimiter locks around it.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst=None, now=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.tokens = self.burst
+        self.updated = time.monotonic() if now is None else now
+
+    def take(self, amount, now):
+        """
+        Takes `amount` tokens and returns the seconds to wait for them.
+        """
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+        self.tokens -= amount
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class BandwidthLimiter:
+    """
+    Caps the combined download rate of all workers with a global token
+    bucket, and optionally the rate per host with one bucket per host.
+    Workers call throttle() for every chunk they receive; it sleeps as long
+    as needed to keep every bucket at its rate. Rates are in bytes/second,
+    None means unlimited, and both can be changed while downloads run.
+
+    The time workers spent waiting is summed in `throttled_seconds`
+    (and per host in `throttled_by_host`).
+
+    Example usage:
+        limiter = BandwidthLimiter(rate=5 * 1024 * 1024, host_rate=1024 * 1024)
+        limiter.throttle(len(chunk), host="example.com")
+        limiter.set_rate(10 * 1024 * 1024)
+    """
+
+    def __init__(self, rate=None, burst=None, host_rate=None, host_burst=None):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.throttled_seconds = 0.0
+        self.throttled_by_host = {}
+        self.bytes = 0
+
+        self._lock = threading.Lock()
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._host_buckets = {}           # host -> TokenBucket
+        self._host_overrides = {}         # host -> (rate, burst)
+
+    @property
+    def rate(self):
+        return self._bucket.rate if self._bucket else None
+
+    @property
+    def limited(self):
+        """True if any limit is set."""
+        return self._bucket is not None or self.host_rate is not None or bool(self._host_overrides)
+
+    def set_rate(self, rate, burst=None):
+        """
+        Changes the global limit (None removes it).
+        """
+        with self._lock:
+            if not rate:
+                self._bucket = None
+            elif self._bucket is None:
+                self._bucket = TokenBucket(rate, burst)
+            else:
+                self._bucket.rate = rate
+                self._bucket.burst = burst if burst is not None else rate
+                self._bucket.tokens = min(self._bucket.tokens, self._bucket.burst)
+        self.logger.info(f"Bandwidth limit set to {_describe(rate)}.")
+
+    def set_host_rate(self, rate, burst=None, host=None):
+        """
+        Changes the limit of one `host`, or the default for every host
+        without its own limit (None removes it).
+        """
+        with self._lock:
+            if host is None:
+                self.host_rate, self.host_burst = rate, burst
+                self._host_buckets = {h: b for h, b in self._host_buckets.items() if h in self._host_overrides}
+            elif rate:
+                self._host_overrides[host] = (rate, burst)
+                self._host_buckets.pop(host, None)
+            else:
+                self._host_overrides.pop(host, None)
+                self._host_buckets.pop(host, None)
+        self.logger.info(f"Bandwidth limit per host {host or '(default)'} set to {_describe(rate)}.")
+
+    def throttle(self, amount, host=None, cancel_token=None):
+        """
+        Accounts `amount` received bytes and waits until they fit the
+        global and per-host rates. With a `cancel_token`, the wait ends
+        early when it is cancelled. Returns the seconds waited.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.bytes += amount
+            delay = self._bucket.take(amount, now) if self._bucket else 0.0
+            bucket = self._host_bucket(host, now) if host else None
+            if bucket is not None:
+                delay = max(delay, bucket.take(amount, now))
+            if delay > 0:
+                self.throttled_seconds += delay
+                if host:
+                    self.throttled_by_host[host] = self.throttled_by_host.get(host, 0.0) + delay
+
+        if delay > 0:
+            if cancel_token is not None:
+                cancel_token.wait(delay)
+            else:
+                time.sleep(delay)
+        return delay
+
+    def _host_bucket(self, host, now):
+        bucket = self._host_buckets.get(host)
+        if bucket is None:
+            rate, burst = self._host_overrides.get(host, (self.host_rate, self.host_burst))
+            if not rate:
+                return None
+            bucket = self._host_buckets[host] = TokenBucket(rate, burst, now)
+        return bucket
+
+    def summary(self):
+        """
+        Returns a one-line description of the bytes and throttled time.
+        """
+        return (
+            f"{self.bytes / (1024 * 1024):.1f} MB received, "
+            f"{self.throttled_seconds:.1f} s throttled (summed over workers)"
+        )
+
+
+def _describe(rate):
+    return f"{rate / (1024 * 1024):.2f} MB/s" if rate else "unlimited"
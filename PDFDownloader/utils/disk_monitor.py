@@ -0,0 +1,88 @@
+# utils/disk_monitor.py
+
+import logging
+import shutil
+import threading
+
+
+class DiskSpaceMonitor:
+    """
+    Background thread that checks the free space of the disk holding `path`
+    every `interval` seconds.
+
+    Below `min_free_mb` the monitor is paused; it resumes once the free space
+    is back above `resume_free_mb` (default: twice `min_free_mb`), so the
+    scheduler does not flap around a single threshold.
+
+    Example usage:
+        monitor = DiskSpaceMonitor("data/PDFs", min_free_mb=500).start()
+        if monitor.wait_for_space(timeout=1.0):
+            submit_more_work()
+        monitor.stop()
+    """
+
+    def __init__(self, path, min_free_mb=100, resume_free_mb=None, interval=5.0):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.path = path
+        self.min_free_mb = min_free_mb
+        self.resume_free_mb = resume_free_mb if resume_free_mb is not None else 2 * min_free_mb
+        self.interval = interval
+        self.free_mb = None
+
+        self._space_ok = threading.Event()
+        self._space_ok.set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def paused(self):
+        """True while free space is too low for new downloads."""
+        return not self._space_ok.is_set()
+
+    def check(self):
+        """
+        Reads the free space once and updates the paused state.
+        """
+        try:
+            self.free_mb = shutil.disk_usage(self.path).free / (1024 * 1024)
+        except OSError as e:
+            self.logger.warning(f"Could not check disk space of '{self.path}': {e}")
+            return
+
+        if not self.paused and self.free_mb < self.min_free_mb:
+            self.logger.warning(
+                f"Low disk space ({self.free_mb:.2f} MB < {self.min_free_mb} MB). "
+                f"Pausing new downloads."
+            )
+            self._space_ok.clear()
+        elif self.paused and self.free_mb >= self.resume_free_mb:
+            self.logger.info(f"Disk space recovered ({self.free_mb:.2f} MB). Resuming downloads.")
+            self._space_ok.set()
+
+    def wait_for_space(self, timeout=None):
+        """
+        Blocks while paused. Returns True if there is space, False on timeout.
+        """
+        return self._space_ok.wait(timeout)
+
+    def start(self):
+        """
+        Checks once, then keeps checking in a daemon thread. Returns self.
+        """
+        self.check()
+        self._thread = threading.Thread(target=self._run, name="DiskSpaceMonitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the background thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
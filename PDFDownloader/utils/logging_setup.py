@@ -1,5 +1,12 @@
+import gzip
+import json
 import logging
 import os
+import queue
+import re
+import shutil
+import threading
+import time
 
 # ---------------------------
 # 1. Define Custom Log Levels
@@ -27,21 +34,256 @@ def fatal(self, message, *args, **kwargs):
 logging.Logger.trace = trace
 logging.Logger.fatal = fatal
 
-# ---------------------------------------------------------
-# 3. SingleLevelFilter to ensure each file logs only one level
-# ---------------------------------------------------------
-class SingleLevelFilter(logging.Filter):
-    def __init__(self, level):
-        super().__init__()
-        self.level = level
+# ---------------------------
+# 3. Routing Handler and Sinks
+# ---------------------------
+# Level -> file stem; every record also goes to the 'all' sink
+LEVEL_FILES = {
+    TRACE_LEVEL_NUM: "trace",
+    logging.DEBUG: "debug",
+    logging.INFO: "info",
+    logging.WARNING: "warn",
+    FATAL_LEVEL_NUM: "fatal",
+}
+ALL_FILE = "all"
+
+DEFAULT_MAX_MB = 50
+DEFAULT_RETENTION_MB = 500
+
+# Rotated segments look like info.20261019-153000.log(.gz) or info.20261019-153000-1.jsonl.gz
+_SEGMENT_RE = re.compile(r"^[a-z]+\.\d{8}-\d{6}(?:-\d+)?\.(?:log|jsonl)(?:\.gz)?$")
+
+
+class LogSink:
+    """
+    One log file, opened on its first write. When it exceeds `max_bytes`
+    or is older than `rotate_interval` seconds, it is renamed to a
+    timestamped segment and handed to `on_rotate` (e.g. for compression).
+    Not thread-safe on its own; LogRouter writes under its handler lock.
+    """
+
+    def __init__(self, path, max_bytes=None, rotate_interval=None, on_rotate=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.on_rotate = on_rotate
+        self._stream = None
+        self._size = 0
+        self._rollover_at = None
+
+    def write(self, text):
+        nbytes = len(text.encode("utf-8"))  # sizes are in bytes, not characters
+        if self._stream is None:
+            self._open()
+        elif self._should_rotate(nbytes):
+            self.rotate()
+            self._open()
+        self._stream.write(text)
+        self._size += nbytes
+
+    def flush(self):
+        if self._stream is not None:
+            self._stream.flush()
+
+    def _open(self):
+        self._stream = open(self.path, "a", encoding="utf-8")
+        self._size = self._stream.tell()
+        if self.rotate_interval:
+            self._rollover_at = time.time() + self.rotate_interval
+
+    def _should_rotate(self, incoming):
+        if self.max_bytes and self._size and self._size + incoming > self.max_bytes:
+            return True
+        return self._rollover_at is not None and time.time() >= self._rollover_at
+
+    def rotate(self):
+        """
+        Closes the current file and renames it to a timestamped segment.
+        """
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if not os.path.exists(self.path):
+            return
+        stem, ext = os.path.splitext(self.path)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        segment = f"{stem}.{stamp}{ext}"
+        n = 0
+        while os.path.exists(segment) or os.path.exists(segment + ".gz"):
+            n += 1
+            segment = f"{stem}.{stamp}-{n}{ext}"
+        os.replace(self.path, segment)
+        if self.on_rotate is not None:
+            self.on_rotate(segment)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+class SegmentJanitor:
+    """
+    Background thread that gzips rotated segments and then deletes the
+    oldest segments of `log_dir` until they take at most `retention_bytes`.
+    Logging threads only enqueue the segment path, so they never wait on
+    compression.
+    """
+
+    def __init__(self, log_dir, compress=True, retention_bytes=None):
+        self.log_dir = log_dir
+        self.compress = compress
+        self.retention_bytes = retention_bytes
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, segment):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="LogJanitor", daemon=True)
+                self._thread.start()
+        self._queue.put(segment)
+
+    def join(self):
+        """
+        Waits until every submitted segment is processed.
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            segment = self._queue.get()
+            try:
+                if self.compress:
+                    self._gzip(segment)
+                if self.retention_bytes is not None:
+                    self.enforce_retention()
+            except OSError:
+                pass  # logging about logging would recurse; the segment stays as it is
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _gzip(segment):
+        with open(segment, "rb") as src, gzip.open(segment + ".gz.tmp", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        # Keep the segment's mtime, so retention still deletes by age of the content
+        written = os.stat(segment)
+        os.utime(segment + ".gz.tmp", ns=(written.st_atime_ns, written.st_mtime_ns))
+        os.replace(segment + ".gz.tmp", segment + ".gz")
+        os.unlink(segment)
+
+    def enforce_retention(self):
+        """
+        Deletes the oldest rotated segments beyond `retention_bytes`.
+        Active log files are never deleted.
+        """
+        segments = []
+        for entry in os.scandir(self.log_dir):
+            if entry.is_file() and _SEGMENT_RE.match(entry.name):
+                info = entry.stat()
+                segments.append((info.st_mtime, entry.name, entry.path, info.st_size))
+        total = sum(size for _, _, _, size in segments)
+        for _, _, path, size in sorted(segments):
+            if total <= self.retention_bytes:
+                break
+            os.unlink(path)
+            total -= size
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Compact one-object-per-line format: t (epoch seconds), l (level),
+    th (thread), m (message) and exc (traceback, if any).
+    """
+
+    def format(self, record):
+        entry = {
+            "t": round(record.created, 3),
+            "l": record.levelname,
+            "th": record.threadName,
+            "m": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LogRouter(logging.Handler):
+    """
+    Single handler that writes every record to the sink of its level (see
+    LEVEL_FILES) and to the 'all' sink. The record is formatted once, and
+    levels without their own file (ERROR, CRITICAL) only go to 'all'.
+    Rotated segments are compressed and pruned by a SegmentJanitor.
+    """
+
+    def __init__(
+        self, log_dir, max_bytes=None, rotate_interval=None,
+        compress=True, retention_bytes=None, json_lines=False
+    ):
+        super().__init__(level=TRACE_LEVEL_NUM)
+        self.janitor = SegmentJanitor(log_dir, compress=compress, retention_bytes=retention_bytes)
+        ext = ".jsonl" if json_lines else ".log"
+
+        def sink(stem):
+            return LogSink(
+                os.path.join(log_dir, stem + ext),
+                max_bytes=max_bytes,
+                rotate_interval=rotate_interval,
+                on_rotate=self.janitor.submit
+            )
+
+        self.sinks = {level: sink(stem) for level, stem in LEVEL_FILES.items()}
+        self.all_sink = sink(ALL_FILE)
+
+    def emit(self, record):
+        try:
+            text = self.format(record) + "\n"
+            level_sink = self.sinks.get(record.levelno)
+            if level_sink is not None:
+                level_sink.write(text)
+            self.all_sink.write(text)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            for level_sink in self._all_sinks():
+                level_sink.flush()
+
+    def rotate(self):
+        """
+        Rotates every sink that has been written to.
+        """
+        with self.lock:
+            for level_sink in self._all_sinks():
+                if level_sink._stream is not None:
+                    level_sink.rotate()
+
+    def close(self):
+        with self.lock:
+            for level_sink in self._all_sinks():
+                level_sink.close()
+        self.janitor.join()
+        super().close()
+
+    def _all_sinks(self):
+        return [*self.sinks.values(), self.all_sink]
 
-    def filter(self, record):
-        return (record.levelno == self.level)
 
 # ---------------------------
 # 4. Logger Setup Function
 # ---------------------------
-def setup_logger(log_dir="logs"):
+def setup_logger(
+    log_dir="logs",
+    max_mb=DEFAULT_MAX_MB,
+    rotate_interval=None,
+    retention_mb=DEFAULT_RETENTION_MB,
+    compress=True,
+    json_lines=False
+):
     """
     Creates and configures a logger that writes:
       - trace.log   (only TRACE messages)
@@ -51,6 +293,17 @@ def setup_logger(log_dir="logs"):
       - fatal.log   (only FATAL messages)
       - all.log     (all messages, all levels)
 
+    All files are written by one LogRouter handler, which formats each
+    record once. Each file is only opened when its first record is written,
+    so setup is cheap and levels that never log leave no empty file behind.
+
+    A file is rotated once it exceeds `max_mb` MB, or is older than
+    `rotate_interval` seconds (None or 0 disables either check). Rotated
+    segments are gzipped in the background (unless `compress` is False),
+    and the oldest are deleted once all segments exceed `retention_mb` MB.
+    With `json_lines=True`, the files are *.jsonl with one compact JSON
+    object per record (see JsonLinesFormatter), which parse faster.
+
     :param log_dir: Directory where log files will be stored.
     :return: Configured logger instance.
     """
@@ -63,63 +316,24 @@ def setup_logger(log_dir="logs"):
     os.makedirs(log_dir, exist_ok=True)
 
     # Common log format
-    formatter = logging.Formatter(
-        fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
+    if json_lines:
+        formatter = JsonLinesFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
 
-    # -------------------
-    # 4a. TRACE Handler
-    # -------------------
-    trace_handler = logging.FileHandler(os.path.join(log_dir, "trace.log"))
-    trace_handler.setLevel(TRACE_LEVEL_NUM)
-    trace_handler.addFilter(SingleLevelFilter(TRACE_LEVEL_NUM))
-    trace_handler.setFormatter(formatter)
-    logger.addHandler(trace_handler)
-
-    # -------------------
-    # 4b. DEBUG Handler
-    # -------------------
-    debug_handler = logging.FileHandler(os.path.join(log_dir, "debug.log"))
-    debug_handler.setLevel(logging.DEBUG)
-    debug_handler.addFilter(SingleLevelFilter(logging.DEBUG))
-    debug_handler.setFormatter(formatter)
-    logger.addHandler(debug_handler)
-
-    # -------------------
-    # 4c. INFO Handler
-    # -------------------
-    info_handler = logging.FileHandler(os.path.join(log_dir, "info.log"))
-    info_handler.setLevel(logging.INFO)
-    info_handler.addFilter(SingleLevelFilter(logging.INFO))
-    info_handler.setFormatter(formatter)
-    logger.addHandler(info_handler)
-
-    # -------------------
-    # 4d. WARN Handler
-    # -------------------
-    warn_handler = logging.FileHandler(os.path.join(log_dir, "warn.log"))
-    warn_handler.setLevel(logging.WARNING)
-    warn_handler.addFilter(SingleLevelFilter(logging.WARNING))
-    warn_handler.setFormatter(formatter)
-    logger.addHandler(warn_handler)
-
-    # -------------------
-    # 4e. FATAL Handler
-    # -------------------
-    fatal_handler = logging.FileHandler(os.path.join(log_dir, "fatal.log"))
-    fatal_handler.setLevel(FATAL_LEVEL_NUM)
-    fatal_handler.addFilter(SingleLevelFilter(FATAL_LEVEL_NUM))
-    fatal_handler.setFormatter(formatter)
-    logger.addHandler(fatal_handler)
-
-    # -------------------
-    # 4f. Combined Handler (All Levels)
-    # -------------------
-    all_handler = logging.FileHandler(os.path.join(log_dir, "all.log"))
-    all_handler.setLevel(logging.DEBUG)  # log everything
-    all_handler.setFormatter(formatter)
-    logger.addHandler(all_handler)
+    router = LogRouter(
+        log_dir,
+        max_bytes=int(max_mb * 1024 * 1024) if max_mb else None,
+        rotate_interval=rotate_interval or None,
+        compress=compress,
+        retention_bytes=int(retention_mb * 1024 * 1024) if retention_mb is not None else None,
+        json_lines=json_lines
+    )
+    router.setFormatter(formatter)
+    logger.addHandler(router)
 
     return logger
 
@@ -0,0 +1,257 @@
+# utils/profiler.py
+
+import logging
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+# Per-thread CPU time, where the OS exposes it (Linux)
+_SCHEDSTAT_PATH = "/proc/self/task/{}/schedstat"
+
+# Thread names like 'DLWorker_3' or 'Thread-2' are grouped as 'DLWorker' / 'Thread'
+_THREAD_SUFFIX_RE = re.compile(r"[_-]\d+(?: \(.*\))?$")
+
+
+def thread_group(thread_name):
+    """
+    Returns the profile group for a thread, e.g. 'DLWorker_3' -> 'DLWorker'.
+    """
+    return _THREAD_SUFFIX_RE.sub("", thread_name) or thread_name
+
+
+def _thread_cpu_seconds(native_id):
+    """
+    Returns the CPU time used so far by a thread, or None if unavailable.
+    """
+    try:
+        with open(_SCHEDSTAT_PATH.format(native_id), "rb") as f:
+            return int(f.read().split()[0]) / 1e9
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for all threads of the process (main loop, download
+    workers, UI thread, ...). A daemon thread samples every thread's stack
+    each `interval` seconds; samples are grouped per thread group.
+
+    Two profiles are kept:
+      - 'wall': every sample counts `interval` seconds, so waiting on the
+                network or a lock shows up as well.
+      - 'cpu':  each sample counts the CPU time the thread used since the
+                previous sample (only where the OS exposes per-thread CPU
+                time, i.e. Linux).
+
+    For each group (and for all threads combined) it can write:
+      - {group}.{kind}.pstats:    loadable with pstats.Stats / snakeviz.
+                                  Call counts are sample counts.
+      - {group}.{kind}.collapsed: 'frame;frame;frame weight' lines for
+                                  flamegraph.pl or speedscope (weights are
+                                  samples for wall, microseconds for cpu).
+
+    Example usage:
+        profiler = SamplingProfiler().start()
+        run_the_work()
+        profiler.stop()
+        profiler.write("profiles/run1")
+        profiler.print_top(20)
+    """
+
+    def __init__(self, interval=0.01):
+        self.logger = logging.getLogger("PDFDownloaderLogger")
+        self.interval = interval
+        self.samples = Counter()                       # group -> number of samples
+        self._stacks = {                               # kind -> group -> {stack: seconds}
+            "wall": defaultdict(Counter),
+            "cpu": defaultdict(Counter),
+        }
+        self._counts = defaultdict(Counter)            # group -> {stack: samples}
+        self._last_cpu = {}                            # thread ident -> CPU seconds
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+        self.wall_time = 0.0
+
+    def start(self):
+        """
+        Starts sampling in a daemon thread. Returns self.
+        """
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops sampling.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.wall_time = time.monotonic() - self._started
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            threads = {t.ident: t for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack = tuple(reversed(stack))  # root first
+
+                thread = threads.get(ident)
+                group = thread_group(thread.name if thread else f"Thread-{ident}")
+                self._counts[group][stack] += 1
+                self._stacks["wall"][group][stack] += self.interval
+                self.samples[group] += 1
+
+                cpu = _thread_cpu_seconds(thread.native_id) if thread else None
+                if cpu is not None:
+                    last = self._last_cpu.get(ident, cpu)
+                    self._last_cpu[ident] = cpu
+                    if cpu > last:
+                        self._stacks["cpu"][group][stack] += cpu - last
+
+    def groups(self):
+        """
+        Returns the sampled thread groups, busiest first.
+        """
+        return [group for group, _ in self.samples.most_common()]
+
+    def has_cpu(self):
+        """
+        True if per-thread CPU time was available while sampling.
+        """
+        return bool(self._stacks["cpu"])
+
+    def _merged(self, table, group=None):
+        if group is not None:
+            return table[group]
+        combined = Counter()
+        for stacks in table.values():
+            combined.update(stacks)
+        return combined
+
+    def stats(self, group=None, kind="wall"):
+        """
+        Returns a pstats-compatible dict for one group (or all threads):
+        {(file, line, func): (cc, nc, tt, ct, {caller: count})}
+        """
+        counts = self._merged(self._counts, group)
+        self_time = Counter()
+        cum_time = Counter()
+        cum_counts = Counter()
+        callers = defaultdict(Counter)
+
+        for stack, seconds in self._merged(self._stacks[kind], group).items():
+            count = counts[stack]
+            self_time[stack[-1]] += seconds
+            for func in set(stack):
+                cum_time[func] += seconds
+                cum_counts[func] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                callers[callee][caller] += count
+
+        return {
+            func: (cum_counts[func], cum_counts[func], self_time[func], cum, dict(callers[func]))
+            for func, cum in cum_time.items()
+        }
+
+    def collapsed(self, group=None, kind="wall"):
+        """
+        Returns the collapsed-stack lines for one group (or all threads).
+        """
+        scale = 1 / self.interval if kind == "wall" else 1e6
+        lines = []
+        for stack, seconds in sorted(self._merged(self._stacks[kind], group).items()):
+            weight = round(seconds * scale)
+            if weight <= 0:
+                continue
+            frames = ";".join(
+                f"{func} ({os.path.basename(filename)}:{line})".replace(";", ":")
+                for filename, line, func in stack
+            )
+            lines.append(f"{frames} {weight}")
+        return lines
+
+    def write(self, out_dir):
+        """
+        Writes {group}.{kind}.pstats and {group}.{kind}.collapsed for every
+        thread group, plus all.{kind}.* for the whole process.
+        Returns the list of written paths.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        kinds = ["wall", "cpu"] if self.has_cpu() else ["wall"]
+        written = []
+        for kind in kinds:
+            for group in self.groups() + [None]:
+                name = re.sub(r"[^\w.-]", "_", group) if group is not None else "all"
+
+                pstats_path = os.path.join(out_dir, f"{name}.{kind}.pstats")
+                with open(pstats_path, "wb") as f:
+                    marshal.dump(self.stats(group, kind), f)
+
+                collapsed_path = os.path.join(out_dir, f"{name}.{kind}.collapsed")
+                with open(collapsed_path, "w", encoding="utf-8") as f:
+                    f.write("\n".join(self.collapsed(group, kind)) + "\n")
+
+                written += [pstats_path, collapsed_path]
+        return written
+
+    def print_top(self, top=20, out_dir=None, stream=None):
+        """
+        Prints the samples (and CPU seconds) per thread group and the `top`
+        hottest functions by self time over all threads, from CPU time if
+        available, else from wall time. Needs the all.*.pstats files written
+        by write(out_dir).
+        """
+        import pstats
+        stream = stream or sys.stdout
+
+        stream.write(f"\nProfile: {self.wall_time:.1f} s wall time, sampled every {self.interval * 1000:.0f} ms\n")
+        for group in self.groups():
+            cpu = sum(self._stacks["cpu"][group].values())
+            stream.write(f"  {group:<20} {self.samples[group]:>8} samples {cpu:>8.2f} s CPU\n")
+
+        if out_dir is not None:
+            kind = "cpu" if self.has_cpu() else "wall"
+            stream.write(f"\nHottest functions ({kind} time):\n")
+            stats = pstats.Stats(os.path.join(out_dir, f"all.{kind}.pstats"), stream=stream)
+            stats.sort_stats("tottime").print_stats(top)
+
+
+def start_profiler(profile_dir, interval=0.01):
+    """
+    Returns a started SamplingProfiler, or None when `profile_dir` is empty.
+    """
+    if not profile_dir:
+        return None
+    return SamplingProfiler(interval=interval).start()
+
+
+def finish_profiler(profiler, profile_dir, top=20):
+    """
+    Stops `profiler` (if any), writes its files to a timestamped folder in
+    `profile_dir` and prints the hottest functions. Returns that folder.
+    """
+    if profiler is None:
+        return None
+    profiler.stop()
+
+    run_dir = os.path.join(profile_dir, datetime.now().strftime("%Y%m%d-%H%M%S"))
+    profiler.write(run_dir)
+    profiler.logger.info(f"Wrote profile for {len(profiler.groups())} thread groups to {run_dir}")
+    profiler.print_top(top, out_dir=run_dir)
+    return run_dir
@@ -0,0 +1,117 @@
+# utils/terminal_progress.py
+
+import queue
+import sys
+import threading
+import time
+
+from utils.transfer_stats import TransferStats, format_duration, format_rate
+
+
+class TerminalProgress:
+    """
+    Headless counterpart of ui.app.DownloadApp: consumes the same
+    update_queue messages and prints one compact progress line, redrawn at
+    most once every `interval` seconds.
+
+    Message formats (see DownloadApp.process_queue):
+        ("thread_update", worker_id, status_text, progress_val[, details])
+        ("counters", success_count, fail_count)
+        ("queue", queued_rows)
+        ("total", rows_to_process)
+        ("quit_ui", )
+
+    Example usage:
+        progress = TerminalProgress(update_queue).start()
+        run_downloader(..., update_queue=update_queue)
+        progress.stop()
+    """
+
+    def __init__(self, update_queue, interval=1.0, stream=None, max_success=None):
+        self.update_queue = update_queue
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.max_success = max_success
+
+        self.stats = TransferStats(max_success=max_success)
+        self._last_draw = 0.0
+        self._last_len = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts consuming the queue in a daemon thread. Returns self.
+        """
+        self.stats.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="TerminalProgress", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Drains the queue, prints the final line and ends it with a newline.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._drain()
+        self._draw()
+        self.stream.write("\n")
+        self.stream.flush()
+
+    def handle(self, msg):
+        """
+        Applies one queue message to the progress state.
+        """
+        if msg[0] == "quit_ui":
+            self._stop.set()
+        else:
+            self.stats.handle(msg)
+
+    def format_line(self):
+        """
+        Returns the current progress line (without carriage return).
+        """
+        summary = self.stats.summary()
+        success = summary["success"]
+        if self.max_success:
+            success = f"{success}/{self.max_success}"
+
+        line = (
+            f"[{format_duration(summary['elapsed'])}] "
+            f"ok {success} | fail {summary['fail']} | "
+            + (f"left {summary['remaining']} | " if summary["remaining"] is not None else "")
+            + f"active {summary['active']} | "
+            f"queued {summary['queued']} | retrying {summary['retrying']} | "
+            f"{summary['files_per_s']:.2f} files/s {format_rate(summary['bytes_per_s'])}"
+        )
+        if summary["eta"] is not None:
+            line += f" | ETA {format_duration(summary['eta'])}"
+        return line
+
+    def _drain(self):
+        try:
+            while True:
+                self.handle(self.update_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+    def _draw(self):
+        line = self.format_line()
+        padding = " " * max(0, self._last_len - len(line))
+        self.stream.write("\r" + line + padding)
+        self.stream.flush()
+        self._last_len = len(line)
+        self._last_draw = time.monotonic()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.handle(self.update_queue.get(timeout=self.interval))
+                self._drain()
+            except queue.Empty:
+                pass
+            if time.monotonic() - self._last_draw >= self.interval:
+                self._draw()
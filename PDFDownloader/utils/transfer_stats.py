@@ -0,0 +1,349 @@
+# utils/transfer_stats.py
+
+import heapq
+import time
+from collections import Counter
+
+# ---------------------
+# Constants
+# ---------------------
+IDLE = "idle"
+CONNECTING = "connecting"
+DOWNLOADING = "downloading"
+RETRYING = "retrying"
+
+
+class Transfer:
+    """
+    State of the transfer a single worker is busy with.
+    """
+
+    __slots__ = ("brnum", "host", "phase", "retry", "bytes", "total", "started", "status_text", "progress")
+
+    def __init__(self):
+        self.brnum = None
+        self.host = None
+        self.phase = IDLE
+        self.retry = False
+        self.bytes = 0
+        self.total = None
+        self.started = 0.0
+        self.status_text = "Idle"
+        self.progress = 0
+
+    def rate(self, now):
+        """
+        Average speed of this transfer in bytes/second.
+        """
+        elapsed = now - self.started
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+
+class EWMARate:
+    """
+    Exponentially weighted moving average of a rate (amount per second).
+    Weights decay with time, not with the number of updates, so frequent
+    and rare updates give the same estimate. Until a few half-lives have
+    passed it equals the plain average since the start (bias correction).
+    """
+
+    __slots__ = ("half_life", "_average", "_weight")
+
+    def __init__(self, half_life=30.0):
+        self.half_life = half_life
+        self._average = 0.0
+        self._weight = 0.0
+
+    def update(self, amount, seconds):
+        """
+        Adds `amount` (e.g. finished files) observed over `seconds`.
+        """
+        if seconds <= 0:
+            return
+        alpha = 1.0 - 0.5 ** (seconds / self.half_life)
+        self._average += alpha * (amount / seconds - self._average)
+        self._weight += alpha * (1.0 - self._weight)
+
+    @property
+    def value(self):
+        return self._average / self._weight if self._weight > 0 else 0.0
+
+
+class TransferStats:
+    """
+    Aggregated view of all running transfers, fed with the update_queue
+    messages of run_downloader. Every message is applied in O(1), so the
+    views built on it (DownloadApp, TerminalProgress) cost the same to
+    redraw with 3 workers as with 300.
+
+    Message formats:
+        ("thread_update", worker_id, status_text, progress_val[, details])
+            `details` is an optional dict with 'brnum', 'host', 'phase'
+            (one of CONNECTING, DOWNLOADING, RETRYING, IDLE), 'bytes' and
+            'total'. Without it, the text 'Idle' marks an idle worker.
+        ("counters", success_count, fail_count)
+        ("queue", queued_rows)
+        ("total", rows_to_process)
+
+    Throughput is an EWMA (see EWMARate) of files/s and bytes/s; with a
+    total from the pre-scan it gives the remaining work and an ETA.
+
+    Example usage:
+        stats = TransferStats(max_success=10)
+        stats.handle(("thread_update", 1, "Downloading 42", 50, {"bytes": 1024}))
+        stats.summary()
+    """
+
+    def __init__(self, max_success=None, half_life=30.0):
+        self.max_success = max_success
+
+        self.success = 0
+        self.fail = 0
+        self.queued = 0
+        self.total = None                 # rows to process in this run, if known
+        self.bytes_total = 0
+        self.started = time.monotonic()
+        self.files_rate = EWMARate(half_life)
+        self.bytes_rate = EWMARate(half_life)
+
+        self.workers = {}                 # worker_id -> Transfer
+        self.phases = Counter()           # phase -> number of workers (excluding idle)
+        self.active_hosts = Counter()     # host -> running transfers
+        self.done_hosts = Counter()       # host -> finished transfers
+        self.retrying = 0                 # running transfers on a fallback link
+        self._last_sample = (self.started, 0, 0)  # (time, bytes_total, finished)
+        self._slowest = None              # (n, result) since the last worker update
+
+    # ---------------------
+    # Updates
+    # ---------------------
+    def handle(self, msg, now=None):
+        """
+        Applies one queue message. Unknown message types are ignored and
+        False is returned.
+        """
+        mtype = msg[0]
+        if mtype == "thread_update":
+            details = msg[4] if len(msg) > 4 else None
+            self._update_worker(msg[1], msg[2], msg[3], details, now)
+        elif mtype == "counters":
+            _, self.success, self.fail = msg
+            self._sample(now)
+        elif mtype == "queue":
+            self.queued = msg[1]
+        elif mtype == "total":
+            self.total = msg[1]
+        else:
+            return False
+        return True
+
+    def _update_worker(self, worker_id, status_text, progress, details, now):
+        now = time.monotonic() if now is None else now
+        self._slowest = None
+        transfer = self.workers.get(worker_id)
+        if transfer is None:
+            transfer = self.workers[worker_id] = Transfer()
+
+        details = details or {}
+        phase = details.get("phase")
+        if phase is None:
+            phase = IDLE if status_text == "Idle" else (transfer.phase if transfer.phase != IDLE else CONNECTING)
+        brnum = details.get("brnum", transfer.brnum)
+
+        # Leaving a transfer: count it for its host
+        if transfer.phase != IDLE and (phase == IDLE or brnum != transfer.brnum):
+            self._leave(transfer)
+            if transfer.host:
+                self.done_hosts[transfer.host] += 1
+
+        # Starting a transfer
+        if phase != IDLE and transfer.phase == IDLE:
+            transfer.brnum = brnum
+            transfer.host = details.get("host")
+            transfer.bytes = 0
+            transfer.total = None
+            transfer.started = now
+            if transfer.host:
+                self.active_hosts[transfer.host] += 1
+        elif phase != IDLE and details.get("host") and details["host"] != transfer.host:
+            if transfer.host:
+                self._discard(self.active_hosts, transfer.host)
+            transfer.host = details["host"]
+            self.active_hosts[transfer.host] += 1
+
+        if phase != IDLE:
+            if transfer.phase != IDLE:
+                self._discard(self.phases, transfer.phase)
+            self.phases[phase] += 1
+        if phase == RETRYING and not transfer.retry:
+            transfer.retry = True
+            self.retrying += 1
+
+        # Received bytes (restarting at 0 for a retry of the same BRnum)
+        if "bytes" in details:
+            received = details["bytes"]
+            delta = received - transfer.bytes if received >= transfer.bytes else received
+            self.bytes_total += delta
+            transfer.bytes = received
+        if details.get("total"):
+            transfer.total = details["total"]
+
+        transfer.phase = phase
+        transfer.status_text = status_text
+        transfer.progress = progress
+
+    def _leave(self, transfer):
+        self._discard(self.phases, transfer.phase)
+        if transfer.host:
+            self._discard(self.active_hosts, transfer.host)
+        if transfer.retry:
+            transfer.retry = False
+            self.retrying -= 1
+        transfer.phase = IDLE
+
+    @staticmethod
+    def _discard(counter, key):
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+    def _sample(self, now=None):
+        # Feeds the progress since the previous sample into the EWMAs
+        now = time.monotonic() if now is None else now
+        then, bytes_then, finished_then = self._last_sample
+        if now <= then:
+            return
+        finished = self.success + self.fail
+        self.files_rate.update(finished - finished_then, now - then)
+        self.bytes_rate.update(self.bytes_total - bytes_then, now - then)
+        self._last_sample = (now, self.bytes_total, finished)
+
+    # ---------------------
+    # Views
+    # ---------------------
+    @property
+    def active(self):
+        return sum(self.phases.values())
+
+    @property
+    def done(self):
+        return self.success + self.fail
+
+    @property
+    def remaining(self):
+        """
+        Rows still to process, or None without a total.
+        """
+        if self.total is None:
+            return None
+        return max(0, self.total - self.done)
+
+    def rates(self, now=None):
+        """
+        Returns the smoothed (bytes_per_second, files_per_second).
+        """
+        self._sample(now)
+        return self.bytes_rate.value, self.files_rate.value
+
+    def eta(self, now=None):
+        """
+        Estimated seconds until the run ends: when all remaining rows are
+        processed, or `max_success` is reached if that comes first.
+        Returns None if neither is known or there is no throughput yet.
+        """
+        candidates = []
+        if self.remaining is not None:
+            candidates.append(self.remaining)
+        if self.max_success:
+            needed = max(0, self.max_success - self.success)
+            if needed == 0:
+                candidates.append(0)
+            elif self.success:
+                candidates.append(needed * self.done / self.success)
+        if not candidates:
+            return None
+
+        files = min(candidates)
+        if files == 0:
+            return 0.0
+        _, files_per_s = self.rates(now)
+        return files / files_per_s if files_per_s > 0 else None
+
+    def slowest(self, n=10, now=None):
+        """
+        Returns the `n` running transfers with the lowest average speed
+        (longest running first on ties), as (worker_id, Transfer) pairs.
+
+        The ranking is computed at most once per worker update: redraws
+        without new messages reuse it. Speeds change with time alone
+        (a stalled transfer gets slower without any message), so there is
+        no fixed key to keep the transfers in a heap by.
+        """
+        if self._slowest is not None and self._slowest[0] == n:
+            return self._slowest[1]
+        now = time.monotonic() if now is None else now
+        running = ((w_id, t) for w_id, t in self.workers.items() if t.phase != IDLE)
+        result = heapq.nsmallest(n, running, key=lambda item: (item[1].rate(now), item[1].started))
+        self._slowest = (n, result)
+        return result
+
+    def host_histogram(self, n=10):
+        """
+        Returns up to `n` (host, running, finished) tuples, busiest first.
+        Remaining hosts are folded into one ('other', ...) entry.
+        """
+        hosts = set(self.active_hosts) | set(self.done_hosts)
+        ranked = sorted(hosts, key=lambda h: (-self.active_hosts[h], -self.done_hosts[h], h))
+        rows = [(h, self.active_hosts[h], self.done_hosts[h]) for h in ranked[:n]]
+        rest = ranked[n:]
+        if rest:
+            rows.append((
+                f"other ({len(rest)})",
+                sum(self.active_hosts[h] for h in rest),
+                sum(self.done_hosts[h] for h in rest)
+            ))
+        return rows
+
+    def summary(self, now=None):
+        """
+        Returns a dict with the headline numbers: success, fail, active,
+        queued, retrying, total, remaining, bytes_per_s, files_per_s, eta
+        and elapsed.
+        """
+        now = time.monotonic() if now is None else now
+        bytes_per_s, files_per_s = self.rates(now)
+        return {
+            "success": self.success,
+            "fail": self.fail,
+            "active": self.active,
+            "queued": self.queued,
+            "retrying": self.retrying,
+            "total": self.total,
+            "remaining": self.remaining,
+            "bytes_per_s": bytes_per_s,
+            "files_per_s": files_per_s,
+            "eta": self.eta(now),
+            "elapsed": now - self.started,
+        }
+
+
+def format_duration(seconds):
+    """
+    Formats seconds as hh:mm:ss ('--:--:--' if unknown).
+    """
+    if seconds is None:
+        return "--:--:--"
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def format_rate(bytes_per_s):
+    """
+    Formats a transfer rate, e.g. '1.5 MB/s'.
+    """
+    for unit in ("B/s", "KB/s", "MB/s"):
+        if bytes_per_s < 1024:
+            return f"{bytes_per_s:.1f} {unit}"
+        bytes_per_s /= 1024
+    return f"{bytes_per_s:.1f} GB/s"
@@ -1,7 +1,18 @@
 # utils/xlsx_chunk_reader.py
 
-import pandas as pd
 import logging
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Spreadsheet XML namespaces and the tags read by count_xlsx_rows
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_DIMENSION_RE = re.compile(rb'<(?:\w+:)?dimension\s+ref="[A-Z]*(\d+)(?::[A-Z]*(\d+))?"')
+_ROW_RE = re.compile(rb'<(?:\w+:)?row\s[^>]*?\br="(\d+)"')
+_DIMENSION_SCAN_BYTES = 64 * 1024
 
 def read_xlsx_in_chunks(
     path, 
@@ -25,6 +36,7 @@ def read_xlsx_in_chunks(
         for df_chunk in read_xlsx_in_chunks("large.xlsx", chunk_size=500):
             process(df_chunk)
     """
+    import pandas as pd
     logger = logging.getLogger("XLSXChunkReader")
 
     start_row = 0
@@ -57,11 +69,11 @@ def read_xlsx_in_chunks(
 
     while True:
         # For subsequent chunks, skip the header row so we set header=None
-        # and skip the same # of rows
+        # and skip the header plus the rows already read
         df_chunk = pd.read_excel(
             path,
             sheet_name=sheet_name,
-            skiprows=range(1, start_row + 1),  
+            skiprows=range(0, start_row + 1),
             nrows=chunk_size,
             header=None,
             usecols=usecols,
@@ -78,3 +90,100 @@ def read_xlsx_in_chunks(
         chunk_num += 1
         logger.debug(f"Yielding chunk #{chunk_num} from '{path}'.")
         yield df_chunk
+
+
+def count_xlsx_rows(path, sheet_name=0, header=0):
+    """
+    Returns the number of data rows (below the header) in a sheet, read
+    from the workbook's metadata instead of parsing the cells:
+      - the sheet's <dimension ref="A1:F21058"> element, found within the
+        first few KB of the sheet XML (milliseconds, even for huge sheets)
+      - or, if the writer left it out or set it to a single cell, the
+        number of the last <row> element, found by scanning the raw XML.
+    Returns None if the file cannot be read as an .xlsx workbook.
+
+    Example usage:
+        total = count_xlsx_rows("large.xlsx")
+    """
+    logger = logging.getLogger("XLSXChunkReader")
+    try:
+        with zipfile.ZipFile(path) as zf:
+            sheet_path = _sheet_xml_path(zf, sheet_name)
+            if sheet_path is None:
+                return None
+
+            with zf.open(sheet_path) as f:
+                first, last = _dimension_rows(f.read(_DIMENSION_SCAN_BYTES))
+            if last is None or last == first:
+                with zf.open(sheet_path) as f:
+                    first, last = _scan_rows(f)
+    except (OSError, zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        logger.warning(f"Could not count rows in '{path}': {e}")
+        return None
+
+    if last is None:
+        return 0
+    return max(0, last - first + 1 - (header + 1 if header is not None else 0))
+
+
+def _sheet_xml_path(zf, sheet_name):
+    """
+    Resolves a sheet name or index to its XML part inside the workbook.
+    """
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    sheets = workbook.findall(f"{_MAIN_NS}sheets/{_MAIN_NS}sheet")
+    if isinstance(sheet_name, int):
+        sheet = sheets[sheet_name] if sheet_name < len(sheets) else None
+    else:
+        sheet = next((s for s in sheets if s.get("name") == sheet_name), None)
+    if sheet is None:
+        return None
+
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    rel_id = sheet.get(f"{_REL_NS}id")
+    for rel in rels.iter(f"{_PKG_REL_NS}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+    return None
+
+
+def _dimension_rows(head):
+    """
+    Returns (first_row, last_row) from the <dimension> element, or (None, None).
+    """
+    match = _DIMENSION_RE.search(head)
+    if match is None:
+        return None, None
+    first = int(match.group(1))
+    last = int(match.group(2)) if match.group(2) else first
+    return first, last
+
+
+def _scan_rows(f, block_size=1024 * 1024):
+    """
+    Returns (first_row, last_row) by scanning the sheet XML for <row r="N">.
+    """
+    first = last = None
+    tail = b""
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        data = tail + block
+        # Keep an unfinished tag for the next block
+        cut = data.rfind(b"<")
+        matches = _ROW_RE.findall(data, 0, cut if cut > 0 else len(data))
+        if matches:
+            if first is None:
+                first = int(matches[0])
+            last = int(matches[-1])
+        tail = data[cut:] if cut > 0 else b""
+    if tail:
+        matches = _ROW_RE.findall(tail)
+        if matches:
+            first = first if first is not None else int(matches[0])
+            last = int(matches[-1])
+    return first, last
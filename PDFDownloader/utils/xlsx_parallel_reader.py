@@ -0,0 +1,135 @@
+# utils/xlsx_parallel_reader.py
+
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+
+from utils.xlsx_chunk_reader import read_xlsx_in_chunks
+
+# ---------------------
+# Constants
+# ---------------------
+# Parsed chunks buffered per workbook before its parser waits
+DEFAULT_PREFETCH_CHUNKS = 4
+# Seconds between checks that a parser process is still alive
+_POLL_INTERVAL = 1.0
+
+_CHUNK = "chunk"
+_ERROR = "error"
+_DONE = "done"
+
+
+def _parse_workbook(path, chunk_size, transform, out_queue):
+    """
+    Parser process: reads `path` with read_xlsx_in_chunks, applies
+    `transform` to each chunk and puts it on `out_queue`. Ends with a
+    _DONE message, or an _ERROR message carrying the exception.
+    """
+    try:
+        for chunk_df in read_xlsx_in_chunks(path, chunk_size=chunk_size):
+            if transform is not None:
+                chunk_df = transform(chunk_df)
+            out_queue.put((_CHUNK, chunk_df))
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        out_queue.put((_ERROR, e))
+        return
+    out_queue.put((_DONE, None))
+
+
+class ParallelXlsxReader:
+    """
+    Parses several workbooks at once, one process per file, so multi-file
+    inputs use all cores and the calling thread only combines the results.
+    (All files parse at the same time: the chunks are consumed round-robin,
+    so a parser waiting for a free slot could stall the others.)
+
+    Each parser applies `transform` (a picklable top-level function, e.g.
+    normalize_link_columns) to its chunks and streams them back, pickled,
+    through a bounded queue of `prefetch` chunks per file. A parser that
+    gets ahead of the consumer waits, so memory stays bounded.
+
+    readers() returns one chunk generator per path, in the same order, as
+    drop-in replacements for read_xlsx_in_chunks. An error in a parser is
+    raised again from its generator. close() stops all parsers.
+
+    Example usage:
+        with ParallelXlsxReader(["a.xlsx", "b.xlsx"], chunk_size=1000) as reader:
+            for gen in reader.readers():
+                for df_chunk in gen:
+                    process(df_chunk)
+    """
+
+    def __init__(self, paths, chunk_size=1000, transform=None, prefetch=DEFAULT_PREFETCH_CHUNKS):
+        self.logger = logging.getLogger("XLSXChunkReader")
+        self.paths = list(paths)
+        self.chunk_size = chunk_size
+        self.transform = transform
+        self.prefetch = prefetch
+        # Spawned (not forked) children: the parent runs logging, download
+        # and monitor threads whose locks a fork could copy while held
+        self._context = multiprocessing.get_context("spawn")
+        self._queues = []
+        self._processes = []
+
+    def start(self):
+        for path in self.paths:
+            out_queue = self._context.Queue(maxsize=self.prefetch)
+            process = self._context.Process(
+                target=_parse_workbook,
+                args=(path, self.chunk_size, self.transform, out_queue),
+                name=f"XLSXParser-{os.path.basename(path)}",
+                daemon=True
+            )
+            process.start()
+            self._queues.append(out_queue)
+            self._processes.append(process)
+        self.logger.debug(f"Started {len(self._processes)} workbook parsers.")
+        return self
+
+    def readers(self):
+        if not self._processes:
+            self.start()
+        return [self._read(i) for i in range(len(self.paths))]
+
+    def _read(self, index):
+        out_queue = self._queues[index]
+        process = self._processes[index]
+        while True:
+            try:
+                kind, payload = out_queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if not process.is_alive() and out_queue.empty():
+                    raise RuntimeError(
+                        f"Workbook parser for '{self.paths[index]}' exited with code {process.exitcode}"
+                    )
+                continue
+            if kind == _CHUNK:
+                yield payload
+            elif kind == _ERROR:
+                raise payload
+            else:
+                return
+
+    def close(self):
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self._processes:
+            process.join(timeout=5)
+        for out_queue in self._queues:
+            out_queue.cancel_join_thread()
+            out_queue.close()
+        self._processes = []
+        self._queues = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()